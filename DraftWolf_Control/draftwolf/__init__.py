@@ -2,57 +2,113 @@
 DraftWolf Control - Version control for Blender with DraftWolf.
 """
 
-import bpy
-
-from .constants import BL_INFO
-from .state import StatusCache, status_worker
-from .operators_commit import object_ot_df_commit, object_ot_df_commit_last_saved
-from .operators_restore import (
-    object_ot_df_retrieve,
-    object_ot_df_restore_quick,
-    object_ot_df_rename_version,
-)
-from .operators_app import (
-    object_ot_df_init,
-    object_ot_df_open_app,
-    object_ot_df_download_app,
-    object_ot_df_login,
-    object_ot_df_refresh_status,
-)
-from .operators_version_ui import object_ot_df_toggle_versions, object_ot_df_refresh_versions
-from .operators_update import object_ot_df_check_for_updates, object_ot_df_open_update_download
-from .panel import df_pt_main_panel
-from .constants import GITHUB_REPO
-from .state import UpdateState
+import os
+
+try:
+    import bpy
+except ImportError:
+    # Plain Python (python -m draftwolf.cli): the API, cache and cli modules work without
+    # Blender; the operators and panel don't, and there is nothing to register
+    bpy = None
+
+from .constants import BL_INFO, GITHUB_REPO, PROFILE_ENV, SEARCH_HELP, STARTUP_DELAY
+from .state import HistoryStore, ProfilingState, UpdateState, ensure_background_started, stop_background
 
 # Expose bl_info at package level for Blender
 bl_info = BL_INFO
 
-classes = (
-    object_ot_df_commit,
-    object_ot_df_commit_last_saved,
-    object_ot_df_retrieve,
-    object_ot_df_init,
-    object_ot_df_open_app,
-    object_ot_df_download_app,
-    object_ot_df_login,
-    object_ot_df_toggle_versions,
-    object_ot_df_refresh_versions,
-    object_ot_df_restore_quick,
-    object_ot_df_rename_version,
-    object_ot_df_refresh_status,
-    object_ot_df_check_for_updates,
-    object_ot_df_open_update_download,
-    df_pt_main_panel,
-)
-
-
-def _deferred_update_check():
-    """Run once after a short delay to avoid blocking startup."""
+if bpy is not None:
+    from .operators_commit import (
+        object_ot_df_commit,
+        object_ot_df_commit_last_saved,
+        object_ot_df_version_last_render,
+    )
+    from .operators_restore import (
+        object_ot_df_retrieve,
+        object_ot_df_restore_quick,
+        object_ot_df_undo_restore,
+        object_ot_df_rename_version,
+        object_ot_df_pull_from_version,
+        object_ot_df_pull_datablocks,
+    )
+    from .operators_app import (
+        object_ot_df_init,
+        object_ot_df_open_app,
+        object_ot_df_download_app,
+        object_ot_df_login,
+        object_ot_df_refresh_status,
+    )
+    from .operators_version_ui import (
+        object_ot_df_toggle_versions,
+        object_ot_df_refresh_versions,
+        object_ot_df_select_version,
+        object_ot_df_select_versions,
+    )
+    from .operators_batch import (
+        object_ot_df_batch_versions,
+        object_ot_df_plan_retention,
+        object_ot_df_apply_retention,
+    )
+    from .operators_update import object_ot_df_check_for_updates, object_ot_df_open_update_download
+    from .operators_profiling import (
+        object_ot_df_toggle_profiling,
+        object_ot_df_profile_capture,
+        object_ot_df_export_profile,
+    )
+    from .panel import df_pt_main_panel, request_redraw
+    from . import handlers
+
+    classes = (
+        object_ot_df_commit,
+        object_ot_df_commit_last_saved,
+        object_ot_df_version_last_render,
+        object_ot_df_retrieve,
+        object_ot_df_init,
+        object_ot_df_open_app,
+        object_ot_df_download_app,
+        object_ot_df_login,
+        object_ot_df_toggle_versions,
+        object_ot_df_refresh_versions,
+        object_ot_df_select_version,
+        object_ot_df_select_versions,
+        object_ot_df_batch_versions,
+        object_ot_df_plan_retention,
+        object_ot_df_apply_retention,
+        object_ot_df_restore_quick,
+        object_ot_df_undo_restore,
+        object_ot_df_rename_version,
+        object_ot_df_pull_from_version,
+        object_ot_df_pull_datablocks,
+        object_ot_df_refresh_status,
+        object_ot_df_check_for_updates,
+        object_ot_df_open_update_download,
+        object_ot_df_toggle_profiling,
+        object_ot_df_profile_capture,
+        object_ot_df_export_profile,
+        df_pt_main_panel,
+    )
+
+
+def _deferred_startup():
+    """Start background work a moment after register (status polling may already run after a panel draw)."""
+    ensure_background_started()
+    from .update import restore_cached_result, run_update_check
+    restore_cached_result()
     from .constants import UPDATE_CHECK_INTERVAL
-    from .update import check_for_updates
     if UPDATE_CHECK_INTERVAL > 0:
-        check_for_updates()
+        from .scheduler import PRIORITY_LOW, scheduler
+        # Runs off the main thread; it returns the delay until the next check is due, which
+        # honours UPDATE_CHECK_INTERVAL across restarts, and publishes results on the main thread
+        scheduler.schedule("update_check", run_update_check, False, priority=PRIORITY_LOW)
+
+
+_startup_timers = (_deferred_startup,)
+
+
+def _register_timer(function, first_interval):
+    """Schedule function once via bpy.app.timers (returning None runs it once)."""
+    if hasattr(bpy.app, "timers") and bpy.app.timers and hasattr(bpy.app.timers, "register"):
+        bpy.app.timers.register(function, first_interval=first_interval)
 
 
 def register():
@@ -64,27 +120,52 @@ def register():
             pass
     for cls in classes:
         bpy.utils.register_class(cls)
+    # Panel search box; TEXTEDIT_UPDATE refilters on every keystroke
+    bpy.types.WindowManager.draftwolf_search = bpy.props.StringProperty(
+        name="Search Versions", description=SEARCH_HELP, options={'TEXTEDIT_UPDATE'})
+    # Saved with the .blend: renders of this scene are versioned when they finish (see render.py)
+    bpy.types.Scene.draftwolf_version_renders = bpy.props.BoolProperty(
+        name="Version Renders", default=False,
+        description="Version the frames of every finished render of this scene, attached to the file's latest version")
     # When update check is disabled (dummy), clear any stale update notice immediately
     if not GITHUB_REPO:
         UpdateState.update_available = False
         UpdateState.latest_version = None
         UpdateState.release_url = None
-    if not StatusCache.thread_running:
-        StatusCache.thread_running = True
-        import threading
-        StatusCache.thread = threading.Thread(target=status_worker, daemon=True)
-        StatusCache.thread.start()
-    # Auto-check for addon updates after 2 seconds (once per session)
-    if hasattr(bpy.app, "timers") and bpy.app.timers:
-        if hasattr(bpy.app.timers, "run_once"):
-            bpy.app.timers.run_once(_deferred_update_check, first_interval=2.0)
-        elif hasattr(bpy.app.timers, "register"):
-            # Older Blender: register with first_interval; returning None runs once
-            bpy.app.timers.register(_deferred_update_check, first_interval=2.0)
+    # Nothing network-related runs during register: the scheduler and its status task start
+    # after STARTUP_DELAY or on the first panel draw, the update check after STARTUP_DELAY
+    _register_timer(_deferred_startup, STARTUP_DELAY)
+    if request_redraw not in HistoryStore.listeners:
+        HistoryStore.listeners.append(request_redraw)
+    # Load/save/edit events invalidate and prefetch the caches (see handlers.py)
+    handlers.register()
+    if os.environ.get(PROFILE_ENV):
+        from .profiling import enable
+        enable()
 
 
 def unregister():
-    StatusCache.thread_running = False
+    handlers.unregister()
+    stop_background()
+    from .integrity import shutdown as stop_integrity_checks
+    stop_integrity_checks()
+    from .render import shutdown as stop_render_hashing
+    stop_render_hashing()
+    from .pull import shutdown as stop_pull_exports
+    stop_pull_exports()
+    if ProfilingState.enabled:
+        from .profiling import disable
+        disable()
+    if request_redraw in HistoryStore.listeners:
+        HistoryStore.listeners.remove(request_redraw)
+    if hasattr(bpy.app, "timers") and bpy.app.timers:
+        for function in _startup_timers:
+            if bpy.app.timers.is_registered(function):
+                bpy.app.timers.unregister(function)
+    if hasattr(bpy.types.WindowManager, "draftwolf_search"):
+        del bpy.types.WindowManager.draftwolf_search
+    if hasattr(bpy.types.Scene, "draftwolf_version_renders"):
+        del bpy.types.Scene.draftwolf_version_renders
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
 
@@ -1,32 +1,104 @@
 """API client for DraftWolf local server."""
 
 import json
-import urllib.request
-import urllib.error
+import time
 
-from .constants import API_URL
+# Statuses that mean the app is up but temporarily can't serve; retried for idempotent endpoints
+RETRYABLE_STATUSES = (502, 503, 504)
+
+
+def _send_once(method, endpoint, body, headers, timeout):
+    """
+    One HTTP exchange. Returns (result, failure) where failure is None,
+    'status' (retryable 5xx) or 'connection' (app unreachable / timed out).
+    """
+    import http.client
+    from .compression import note_server_accepts, read_body
+    from .transport import get_transport
+
+    try:
+        conn, response = get_transport().request(method, endpoint, body, headers, timeout)
+        try:
+            note_server_accepts(response.getheader('Accept-Encoding'))
+            status = response.status
+            if status >= 400:
+                print(f"DraftWolf API Error: {status}")
+                failure = 'status' if status in RETRYABLE_STATUSES else None
+                try:
+                    err_body = read_body(response, response.getheader('Content-Encoding')).decode('utf-8')
+                    return json.loads(err_body), failure
+                except Exception:
+                    return {'success': False, 'error': f"HTTP {status}"}, failure
+            raw = read_body(response, response.getheader('Content-Encoding'))
+        finally:
+            conn.close()
+        return json.loads(raw.decode('utf-8')), None
+    except (OSError, http.client.HTTPException) as e:
+        print(f"DraftWolf Connection Error: {e}")
+        return {'success': False, 'error': str(e) or type(e).__name__}, 'connection'
+    except ValueError as e:
+        print(f"DraftWolf API Error: invalid response: {e}")
+        return {'success': False, 'error': f"Invalid response: {e}"}, None
 
 
 def send_request(endpoint, data=None):
-    url = f"{API_URL}{endpoint}"
-    req = urllib.request.Request(url)
-    req.add_header('Content-Type', 'application/json')
-    req.add_header('User-Agent', 'DraftWolf-Blender/1.0')
+    """
+    Call endpoint (POST with data as JSON, else GET) and return the decoded reply, or an error
+    dict. Identical concurrent reads share one call (singleflight.py).
+    """
+    from .policy import policy_for
+    from .singleflight import single_flight
 
+    if not policy_for(endpoint).idempotent:
+        result = _send_request(endpoint, data)
+        # Reads already in flight may predate this change
+        single_flight.detach()
+        return result
+    if single_flight.coalesces(endpoint):
+        return single_flight.do(endpoint, data, lambda: _send_request(endpoint, data))
+    return _send_request(endpoint, data)
+
+
+def _send_request(endpoint, data):
+    # Deferred: http.client pulls in ssl/email, which is most of the addon's import cost
+    from .compression import accept_encoding_header, compress_body
+    from .discovery import discovery
+    from .policy import backoff_delay, breaker, policy_for
+
+    # The discovery file says the app's process is gone: no need to try connecting
+    unavailable = discovery.unavailable_error()
+    if unavailable is not None:
+        return unavailable
+
+    headers = {
+        'Content-Type': 'application/json',
+        'User-Agent': 'DraftWolf-Blender/1.0',
+        'Accept-Encoding': accept_encoding_header(),
+    }
+    body = None
     if data:
-        jsondata = json.dumps(data).encode('utf-8')
-        req.data = jsondata  # IMPLIES POST
+        body, encoding = compress_body(json.dumps(data).encode('utf-8'))
+        if encoding:
+            headers['Content-Encoding'] = encoding
+    method = 'POST' if body is not None else 'GET'
 
-    try:
-        with urllib.request.urlopen(req, timeout=2.0) as response:
-            return json.loads(response.read().decode('utf-8'))
-    except urllib.error.HTTPError as e:
-        print(f"DraftWolf API Error: {e.code}")
+    policy = policy_for(endpoint)
+    attempts = 1 + (policy.retries if policy.idempotent else 0)
+    result = None
+    for attempt in range(attempts):
+        if attempt:
+            time.sleep(backoff_delay(attempt))
+        if not breaker.allow():
+            # App known to be down: fail now rather than wait for a connect timeout
+            return {'success': False, 'error': breaker.open_error()}
+        failure = 'connection'
         try:
-            err_body = e.read().decode('utf-8')
-            return json.loads(err_body)
-        except Exception:
-            return {'success': False, 'error': f"HTTP {e.code}"}
-    except OSError as e:
-        print(f"DraftWolf Connection Error: {e}")
-        return {'success': False, 'error': str(e)}
+            result, failure = _send_once(method, endpoint, body, headers, policy.timeout)
+        finally:
+            if failure == 'connection':
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        if failure is None:
+            break
+    return result
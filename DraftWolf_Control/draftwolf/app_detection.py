@@ -43,8 +43,37 @@ def _is_app_installed_darwin():
 
 
 def _is_app_installed_linux():
-    """Linux: treat as unknown; assume installed so we show 'App not running' not 'not installed'."""
-    return True
+    """
+    Linux: the app has run here (discovery file), registered its URL scheme or a .desktop
+    entry, or is on PATH.
+    """
+    import shutil
+    from .discovery import discovery_path
+    if os.path.exists(discovery_path()):
+        return True
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    data_dirs = [data_home] + (os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share").split(":")
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    mime_files = [os.path.join(config_home, "mimeapps.list")]
+    for base in data_dirs:
+        apps = os.path.join(base, "applications")
+        try:
+            names = os.listdir(apps)
+        except OSError:
+            continue
+        for name in names:
+            if name.endswith(".desktop") and name.lower().startswith(("draftwolf", "draftflow")):
+                return True
+        mime_files.append(os.path.join(apps, "mimeinfo.cache"))
+    handler = f"x-scheme-handler/{PROTOCOL_SCHEME}="
+    for path in mime_files:
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                if any(line.startswith(handler) for line in f):
+                    return True
+        except OSError:
+            continue
+    return any(shutil.which(name) for name in ("draftwolf", "DraftWolf"))
 
 
 def is_app_installed():
@@ -0,0 +1,98 @@
+"""
+Batch operations on selected versions: relabel, tag, delete, export.
+
+Every operation goes to the app in one /draft/batch request, which answers with
+a result per item; the successful ones are then applied to the cached history
+in a single update (history.record_batch) instead of one round trip and cache
+update per version.
+
+Relabel patterns are format strings over the version: {label}, {n} (version
+number), {i} (1-based position in the selection), {date} (YYYY-MM-DD) and {id}.
+An optional regex find/replace is applied to the label first.
+"""
+
+import re
+
+from .api import send_request
+from .constants import CANNOT_CONNECT_APP, UNKNOWN_ERROR
+from .history import record_batch
+
+ACTIONS = ('RELABEL', 'TAG', 'DELETE', 'EXPORT')
+
+
+class _PatternFields(dict):
+    def __missing__(self, key):
+        raise ValueError(f"Unknown field {{{key}}} (use label, n, i, date or id)")
+
+
+def new_label(version, index, pattern="{label}", find="", replace=""):
+    """Label for version (index-th of the selection) after find/replace and the pattern."""
+    label = version.get('label', '')
+    if find:
+        try:
+            label = re.sub(find, replace, label)
+        except re.error as e:
+            raise ValueError(f"Invalid find pattern: {e}") from None
+    fields = _PatternFields(
+        label=label,
+        n=version.get('versionNumber', ''),
+        i=index + 1,
+        date=version.get('timestamp', '').split('T')[0],
+        id=version.get('id', ''),
+    )
+    try:
+        return (pattern or "{label}").format_map(fields).strip()
+    except (IndexError, KeyError) as e:
+        raise ValueError(f"Invalid label pattern: {e}") from None
+
+
+def build_operations(action, versions, pattern="{label}", find="", replace="", tag="", destination=""):
+    """The /draft/batch operations for applying action to versions (in selection order)."""
+    if action == 'RELABEL':
+        ops = []
+        for i, v in enumerate(versions):
+            label = new_label(v, i, pattern, find, replace)
+            if label and label != v.get('label'):
+                ops.append({'op': 'rename', 'versionId': v.get('id'), 'newLabel': label})
+        return ops
+    if action == 'TAG':
+        tag = tag.strip()
+        if not tag:
+            raise ValueError("Enter a tag")
+        return [{'op': 'tag', 'versionId': v.get('id'), 'tag': tag}
+                for v in versions if tag not in (v.get('tags') or ())]
+    if action == 'DELETE':
+        return [{'op': 'delete', 'versionId': v.get('id')} for v in versions]
+    if action == 'EXPORT':
+        if not destination:
+            raise ValueError("Choose a folder to export to")
+        return [{'op': 'export', 'versionId': v.get('id'), 'destination': destination} for v in versions]
+    raise ValueError(f"Unknown batch action {action!r}")
+
+
+def submit(root, filepath, operations):
+    """
+    Send operations as one /draft/batch request and apply what succeeded to the cached history.
+    Returns (succeeded, failed, error): failed is a list of (operation, error message);
+    error is set (and nothing applied) if the request as a whole failed.
+    """
+    if not operations:
+        return [], [], None
+    res = send_request('/draft/batch', {'projectRoot': root, 'operations': operations})
+    if not res or not res.get('success'):
+        return [], [], res.get('error', UNKNOWN_ERROR) if res else CANNOT_CONNECT_APP
+    results = res.get('results')
+    if not isinstance(results, list) or len(results) != len(operations):
+        return [], [], "Invalid batch response"
+    succeeded, failed = [], []
+    for op, result in zip(operations, results):
+        if isinstance(result, dict) and result.get('success'):
+            succeeded.append(op)
+        else:
+            failed.append((op, result.get('error', UNKNOWN_ERROR) if isinstance(result, dict) else UNKNOWN_ERROR))
+    relabels = {op['versionId']: op['newLabel'] for op in succeeded if op['op'] == 'rename'}
+    tags = {op['versionId']: op['tag'] for op in succeeded if op['op'] == 'tag'}
+    deleted = {op['versionId'] for op in succeeded if op['op'] == 'delete'}
+    if relabels or tags or deleted:
+        record_batch(root, filepath, relabels, tags, deleted)
+    return succeeded, failed, None
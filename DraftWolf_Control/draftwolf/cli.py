@@ -0,0 +1,312 @@
+"""
+Headless command line for pipelines and render farms: commit, history, restore, status, import.
+
+Runs under plain Python or Blender in background mode, with the same api, history
+and path_utils code as the operators (no UI, nothing registered):
+
+    python -m draftwolf.cli commit shots/*.blend -m "Farm render"      (DraftWolf_Control on sys.path)
+    python -m draftwolf.cli import --jobs 8 /projects/old_show          (see legacy_import.py)
+    blender -b --python draftwolf/cli.py -- history --format ndjson scene.blend
+
+Files are processed concurrently by a bounded worker pool (--jobs). Results are
+written to stdout as they complete, as one JSON array (--format json, the default)
+or one JSON object per line (--format ndjson); diagnostics go to stderr. Every
+result carries 'file' and 'ok', plus 'error' when ok is false.
+
+Exit codes: 0 success, 1 at least one file failed, 2 usage error, 3 DraftWolf app
+not reachable, 4 a file is not in a version-controlled project (and nothing failed).
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+if __name__ == "__main__" and not __package__:
+    # Run by path (blender -b --python .../draftwolf/cli.py -- ...): import it as part of the package
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from draftwolf.cli import main
+    sys.exit(main())
+
+from .api import send_request
+from .constants import CANNOT_CONNECT_APP, CLI_DEFAULT_JOBS, UNKNOWN_ERROR
+from .history import get_file_history
+from .path_utils import get_project_root, recover_original_filepath
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_UNAVAILABLE = 3
+EXIT_NOT_VERSIONED = 4
+
+NOT_VERSIONED_ERROR = "Not in a version-controlled project"
+
+
+class NotVersioned(Exception):
+    pass
+
+
+class _Output:
+    """Writes results to stream as they arrive: a streamed JSON array or NDJSON."""
+
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        self.count = 0
+
+    def emit(self, record):
+        text = json.dumps(record, ensure_ascii=False)
+        if self.fmt == 'ndjson':
+            self.stream.write(text + "\n")
+        else:
+            self.stream.write(("[\n" if not self.count else ",\n") + text)
+        self.count += 1
+        self.stream.flush()
+
+    def close(self):
+        if self.fmt == 'json':
+            self.stream.write("\n]\n" if self.count else "[]\n")
+        self.stream.flush()
+
+
+def _error(res):
+    return res.get('error', UNKNOWN_ERROR) if res else CANNOT_CONNECT_APP
+
+
+def _root_for(path):
+    root = get_project_root(path)
+    if not root:
+        raise NotVersioned(path)
+    return root
+
+
+def _resolve_version(history, spec):
+    """Version entry for spec: 'latest', a version number ('12' or 'v12') or a version id."""
+    if not history:
+        return None
+    if spec == 'latest':
+        return history[0]
+    number = spec[1:] if spec[:1] in ('v', 'V') else spec
+    for v in history:
+        if v.get('id') == spec or str(v.get('versionNumber')) == number:
+            return v
+    return None
+
+
+def _history_changed(root):
+    """Have open Blender instances refetch root's history now rather than when their cache expires."""
+    from .shared_status import notify_history_changed
+    notify_history_changed(root)
+
+
+def _verify(path, res, version):
+    """Hash path against the digest in res or the version's manifest: (checked, ok)."""
+    from .integrity import digest_from, file_digest, manifest_digest
+    expected = digest_from(res) or manifest_digest(version, path)
+    if expected is None:
+        return False, True
+    algorithm, expected_hex = expected
+    return True, file_digest(path, algorithm) == expected_hex
+
+
+def do_commit(path, args):
+    root = _root_for(path)
+    res = send_request('/draft/commit', {'projectRoot': root, 'label': args.message, 'files': [path]})
+    if not (res and res.get('success')):
+        return {'ok': False, 'error': _error(res)}
+    _history_changed(root)
+    result = {'ok': True, 'versionId': res.get('versionId'), 'versionNumber': res.get('versionNumber')}
+    if args.verify:
+        result['verified'], result['ok'] = _verify(path, res, res.get('version'))
+        if not result['ok']:
+            result['error'] = "Committed file does not match the digest the app stored"
+    return result
+
+
+def do_history(path, args):
+    _root_for(path)
+    if args.search:
+        from .history import get_history_index
+        index = get_history_index(path)
+        versions = None if index is None else index.search(args.search, limit=args.limit or None)
+    else:
+        versions = get_file_history(path)
+        if versions is not None and args.limit:
+            versions = versions[:args.limit]
+    if versions is None:
+        return {'ok': False, 'error': CANNOT_CONNECT_APP}
+    return {'ok': True, 'versions': versions}
+
+
+def do_restore(path, args):
+    target = recover_original_filepath(path)
+    root = _root_for(target)
+    history = get_file_history(target)
+    if history is None:
+        return {'ok': False, 'error': CANNOT_CONNECT_APP}
+    version = _resolve_version(history, args.version)
+    if version is None:
+        return {'ok': False, 'error': f"No version {args.version!r} of this file"}
+    from .delta import restore_version
+    from .snapshot import take
+    try:
+        snapshot = take(target, version.get('id'))
+    except OSError as e:
+        return {'ok': False, 'error': f"Could not snapshot the current file: {e}"}
+    res = restore_version(root, target, version.get('id'))
+    if not (res and res.get('success')):
+        return {'ok': False, 'error': _error(res)}
+    _history_changed(root)
+    result = {'ok': True, 'restored': target, 'versionId': version.get('id'),
+              'versionNumber': version.get('versionNumber')}
+    if snapshot:
+        result['snapshot'] = snapshot['snapshot']
+    if 'delta' in res:
+        result['delta'] = res['delta']
+    if args.verify:
+        result['verified'], result['ok'] = _verify(target, res, version)
+        if not result['ok']:
+            result['error'] = "Restored file does not match the version's digest"
+    return result
+
+
+def do_status(path, args):
+    root = _root_for(path)
+    history = get_file_history(path)
+    if history is None:
+        return {'ok': False, 'error': CANNOT_CONNECT_APP}
+    latest = history[0] if history else None
+    return {'ok': True, 'projectRoot': root, 'versions': len(history),
+            'latest': {k: latest.get(k) for k in ('id', 'versionNumber', 'label', 'timestamp')} if latest else None}
+
+
+def do_import(path, args):
+    from .legacy_import import import_tree
+    if not os.path.isdir(path):
+        return {'ok': False, 'error': "Not a directory"}
+    report = import_tree(path, label=args.label, jobs=args.jobs, dry_run=args.dry_run)
+    if report.assets and len(report.unversioned) == report.assets:
+        raise NotVersioned(path)
+    return dict(ok=not report.failed, **report.summary())
+
+
+COMMANDS = {'commit': do_commit, 'history': do_history, 'restore': do_restore, 'status': do_status,
+            'import': do_import}
+
+
+def _run_one(command, path, args):
+    try:
+        result = COMMANDS[command](path, args)
+    except NotVersioned:
+        result = {'ok': False, 'error': NOT_VERSIONED_ERROR}
+    except Exception as e:
+        result = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+    return dict(file=path, **result)
+
+
+def app_status():
+    """The app's health and login state, as the status command reports them."""
+    from .transport import adopt_advertised_socket
+    res = send_request('/health')
+    running = bool(res and res.get('success'))
+    status = {'appRunning': running, 'loggedIn': False, 'username': None}
+    if running:
+        adopt_advertised_socket(res)
+        status['appVersion'] = res.get('version')
+        from .state import parse_auth_status
+        status['loggedIn'], status['username'] = parse_auth_status(send_request('/auth/status'))
+    else:
+        status['error'] = _error(res)
+    return status
+
+
+def run(command, files, args, out):
+    """Process files with up to args.jobs workers, emitting each result as it completes. Returns the exit code."""
+    codes = set()
+    with ThreadPoolExecutor(max_workers=max(1, min(args.jobs, len(files)))) as pool:
+        futures = [pool.submit(_run_one, command, path, args) for path in files]
+        for future in as_completed(futures):
+            result = future.result()
+            out.emit(result)
+            if not result['ok']:
+                codes.add(EXIT_NOT_VERSIONED if result['error'] == NOT_VERSIONED_ERROR else EXIT_FAILED)
+    if EXIT_FAILED in codes:
+        return EXIT_FAILED
+    return EXIT_NOT_VERSIONED if codes else EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="draftwolf", description="DraftWolf version control without the Blender UI")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--format", choices=("json", "ndjson"), default="json",
+                        help="one JSON array (default) or one JSON object per line")
+    common.add_argument("-j", "--jobs", type=int, default=CLI_DEFAULT_JOBS,
+                        help=f"files processed at once (default {CLI_DEFAULT_JOBS})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("commit", parents=[common], help="save each file as a new version")
+    p.add_argument("files", nargs="+")
+    p.add_argument("-m", "--message", default="New Version", help="version label")
+    p.add_argument("--verify", action="store_true", help="check the file against the digest the app stored")
+
+    p = sub.add_parser("history", parents=[common], help="list each file's versions, newest first")
+    p.add_argument("files", nargs="+")
+    p.add_argument("-n", "--limit", type=int, default=0, help="at most this many versions per file")
+    p.add_argument("-s", "--search", default="", help="filter like the panel's search box")
+
+    p = sub.add_parser("restore", parents=[common], help="restore a version of each file")
+    p.add_argument("files", nargs="+")
+    p.add_argument("-v", "--version", default="latest", help="'latest', a version number (12 or v12) or a version id")
+    p.add_argument("--verify", action="store_true", help="check the restored file against the version's digest")
+
+    p = sub.add_parser("import", parents=[common],
+                       help="back-fill history from legacy versioned files (shot_v001.blend, ...) under each folder")
+    p.add_argument("files", nargs="+", metavar="folders")
+    p.add_argument("-l", "--label", default="Imported {name}", help="version label; {name} is the legacy file's name")
+    p.add_argument("--dry-run", action="store_true", help="scan and report what would be imported")
+
+    p = sub.add_parser("status", parents=[common], help="app and login state, and each file's latest version")
+    p.add_argument("files", nargs="*")
+    return parser
+
+
+def _argv():
+    """Arguments after '--' when run inside Blender (blender -b --python cli.py -- ...), else sys.argv[1:]."""
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+    return sys.argv[1:]
+
+
+def main(argv=None, stdout=None):
+    parser = build_parser()
+    try:
+        args = parser.parse_args(_argv() if argv is None else argv)
+    except SystemExit as e:
+        return EXIT_USAGE if e.code else EXIT_OK
+    if args.jobs < 1:
+        parser.print_usage(sys.stderr)
+        print("draftwolf: error: --jobs must be at least 1", file=sys.stderr)
+        return EXIT_USAGE
+
+    out = _Output(stdout or sys.stdout, args.format)
+    files = [os.path.abspath(f) for f in args.files]
+    # The API and cache modules print diagnostics; keep stdout for results only
+    with contextlib.redirect_stdout(sys.stderr):
+        status = app_status()
+        if args.command == 'status' and not files:
+            out.emit(status)
+            out.close()
+            return EXIT_OK if status['appRunning'] else EXIT_UNAVAILABLE
+        if not status['appRunning']:
+            print(f"draftwolf: {status['error']}", file=sys.stderr)
+            out.close()
+            return EXIT_UNAVAILABLE
+        code = run(args.command, files, args, out)
+    out.close()
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Content-encoding negotiation for the local API (gzip / deflate, zstd when available).
+
+Responses: we send Accept-Encoding and stream-decompress whatever the app picks.
+Requests: bodies above COMPRESSION_MIN_BYTES are compressed only with an encoding
+the app has advertised in an Accept-Encoding response header (RFC 7694).
+"""
+
+import zlib
+
+from .constants import COMPRESSION_ENCODINGS, COMPRESSION_MIN_BYTES
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+READ_CHUNK = 64 * 1024
+
+# Encodings the client may use, in preference order (benchmarks narrow this)
+preferred_encodings = tuple(e for e in COMPRESSION_ENCODINGS if e != "zstd" or zstandard is not None)
+
+# Request encodings the app said it accepts, learned from its responses
+_server_accepts = set()
+
+
+def accept_encoding_header():
+    """Value for the Accept-Encoding request header ('identity' if compression is off)."""
+    return ", ".join(preferred_encodings) if preferred_encodings else "identity"
+
+
+def note_server_accepts(header_value):
+    """Remember which request encodings the app advertised (called for every response)."""
+    if header_value is None:
+        return
+    offered = {part.split(";")[0].strip().lower() for part in header_value.split(",")}
+    _server_accepts.clear()
+    _server_accepts.update(offered & set(preferred_encodings))
+
+
+def compress_body(body):
+    """Return (body, encoding or None); compresses only large bodies the app can decode."""
+    if len(body) < COMPRESSION_MIN_BYTES:
+        return body, None
+    for encoding in preferred_encodings:
+        if encoding in _server_accepts:
+            return _compress(body, encoding), encoding
+    return body, None
+
+
+def _compress(data, encoding):
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if encoding == "gzip":
+        co = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return co.compress(data) + co.flush()
+    if encoding == "deflate":
+        return zlib.compress(data, 6)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def _decompressor(encoding):
+    if encoding == "gzip":
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        return _DeflateDecompressor()
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+
+
+class _DeflateDecompressor:
+    """'deflate' is meant to be zlib-wrapped, but some servers send raw deflate; accept both."""
+
+    def __init__(self):
+        self._obj = None
+
+    def decompress(self, data):
+        if self._obj is None:
+            self._obj = zlib.decompressobj()
+            try:
+                return self._obj.decompress(data)
+            except zlib.error:
+                self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self._obj.decompress(data)
+
+    def flush(self):
+        return self._obj.flush() if self._obj is not None else b""
+
+
+def read_body(response, encoding):
+    """Read a response body, decompressing it chunk by chunk as it arrives."""
+    encoding = (encoding or "identity").strip().lower()
+    if encoding == "identity":
+        return response.read()
+    decoder = _decompressor(encoding)
+    parts = []
+    try:
+        while True:
+            chunk = response.read(READ_CHUNK)
+            if not chunk:
+                break
+            parts.append(decoder.decompress(chunk))
+        flush = getattr(decoder, "flush", None)
+        if flush is not None:
+            parts.append(flush())
+    except zlib.error as e:
+        raise ValueError(f"Corrupt {encoding} response: {e}") from e
+    return b"".join(parts)
@@ -21,15 +21,134 @@ CURRENT_VERSION = BL_INFO["version"]
 GITHUB_REPO = None
 # How often to check for updates (seconds); 0 = only when user clicks "Check for updates"
 UPDATE_CHECK_INTERVAL = 0
+# Env var naming a releases endpoint to check instead of GitHub's (e.g. a local stand-in for testing)
+UPDATE_RELEASES_URL_ENV = "DRAFTWOLF_RELEASES_URL"
+# Last check result, ETag and time, in Blender's user config dir
+UPDATE_CACHE_FILE = "update_check.json"
 
 API_PORT = 45000
 API_URL = f"http://127.0.0.1:{API_PORT}"
+# Default request timeout; per-endpoint timeouts and retries live in policy.py
+API_TIMEOUT = 2.0
+# Circuit breaker: open after this many consecutive connection failures...
+BREAKER_FAILURE_THRESHOLD = 3
+# ...fail fast for this long before a half-open probe, doubling after each failed probe up to the max
+BREAKER_RESET_TIMEOUT = 5.0
+BREAKER_MAX_RESET_TIMEOUT = 60.0
+# Jittered exponential backoff between retries of idempotent requests (seconds)
+RETRY_BACKOFF_BASE = 0.05
+RETRY_BACKOFF_CAP = 1.0
+# Idempotent endpoints whose concurrent identical calls are still sent separately
+# (singleflight.py; mutating endpoints never share a call)
+SINGLE_FLIGHT_EXEMPT = ()
+# Unix domain socket: used when this env var names a socket, or when the app advertises
+# one in its /health response (socketPath) and PREFER_UNIX_SOCKET is set
+API_SOCKET_ENV = "DRAFTWOLF_SOCKET"
+PREFER_UNIX_SOCKET = True
+# Discovery file the app writes under the user runtime dir (pid, port, socketPath, version,
+# startedAt); the env var overrides its path
+DISCOVERY_FILE_NAME = "app.json"
+DISCOVERY_FILE_ENV = "DRAFTWOLF_DISCOVERY_FILE"
+
+# HTTP content encodings offered to the app, in preference order (zstd needs the zstandard module)
+COMPRESSION_ENCODINGS = ("zstd", "gzip", "deflate")
+# Request bodies smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = 8 * 1024
+
+# Longest a caller waits for another thread's in-flight history fetch (seconds)
+HISTORY_FETCH_WAIT = 10.0
+# Delay before a local (optimistic) history update is checked against the app (seconds)
+HISTORY_RECONCILE_DELAY = 1.0
+# Delay after register() before the status worker starts (the first panel draw starts it sooner)
+STARTUP_DELAY = 3.0
+# Background status polling (seconds)
+STATUS_POLL_INTERVAL = 5.0
+# Worker threads that run scheduled tasks (the scheduler thread only times and dispatches them)
+SCHEDULER_WORKERS = 3
+# How often Blender's main thread runs callbacks queued by background work (seconds)
+MAIN_THREAD_DRAIN_INTERVAL = 0.05
+# Share one poller between concurrent Blender instances via files in the user runtime dir
+SHARED_STATUS_ENABLED = True
+# Followers re-check the shared snapshot this often (a stat call, no HTTP)
+SHARED_STATUS_FOLLOW_INTERVAL = 1.0
+# A snapshot older than this is ignored and followers poll the app themselves
+SHARED_STATUS_STALE_AFTER = 15.0
+# How long a shared project-root lookup stays valid for other instances
+SHARED_ROOT_TTL = 30.0
+
+# Versions listed in the panel, and most search matches offered in the restore dialog
+PANEL_VERSION_LIMIT = 10
+SEARCH_DIALOG_LIMIT = 200
+SEARCH_HELP = "Filter by label words, v12 for a version number, 2024-03 or after:/before: dates"
+
+# Profiling (off unless enabled from the operator search or with DRAFTWOLF_PROFILE=1 at startup)
+PROFILE_ENV = "DRAFTWOLF_PROFILE"
+PROFILE_STATS_WINDOW = 256          # recent durations kept per section for percentiles
+PROFILE_TRACE_EVENTS = 100_000      # calls kept for the Chrome trace export
+PROFILE_DIR_NAME = "draftwolf-profiles"   # under the system temp dir
+
+# Default retention policy (see retention.py): everything from the last day, hourly for a
+# week, daily for a month; labeled and pinned versions are always kept
+RETENTION_POLICY = {
+    'keep_all_hours': 24,
+    'hourly_days': 7,
+    'daily_days': 30,
+    'weekly_weeks': 0,
+    'keep_labeled': True,
+}
+# Labels commits get by default; a version with any other label counts as labeled
+RETENTION_DEFAULT_LABELS = ("New Version", "Untitled")
+# Versions to be pruned listed in the panel's retention preview
+RETENTION_PREVIEW_LIMIT = 5
+
+# Restored/committed files are hashed in slices of this size when checked against their digest
+INTEGRITY_CHUNK_SIZE = 16 * 1024 * 1024
+
+# Files the command line (cli.py) processes at once unless --jobs says otherwise
+CLI_DEFAULT_JOBS = 4
+
+# Delta restore (delta.py): working files of at least this size are patched in place from
+# a chunk plan; each chunk's sha256 tells the app which bytes it can reuse
+DELTA_MIN_SIZE = 32 * 1024 * 1024
+DELTA_CHUNK_SIZE = 1024 * 1024
+
+# Render versioning (render.py): threads hashing output frames, and the per-user cache
+# folder stills are saved to when a render wrote no files
+RENDER_HASH_WORKERS = 4
+RENDER_STILL_DIR_NAME = "draftwolf-renders"
+
+# Safety snapshots before a restore (snapshot.py): folder next to the file, and how many
+# per file and for how long (seconds) they are kept
+SNAPSHOT_DIR_NAME = ".draftwolf_snapshots"
+SNAPSHOT_KEEP = 5
+SNAPSHOT_MAX_AGE = 7 * 24 * 3600
+
+# Pull from version (pull.py): version files are exported to this per-user cache folder,
+# which keeps the most recently used ones
+PULL_CACHE_DIR_NAME = "draftwolf-versions"
+PULL_CACHE_VERSIONS = 5
+
+# Legacy import (legacy_import.py): versions sent per /draft/import request, and the journal
+# in the project root that lets an interrupted import resume
+LEGACY_IMPORT_CHUNK = 200
+LEGACY_IMPORT_JOURNAL = ".draftwolf_import.jsonl"
+
+# Commit dialog scopes; partial scopes write just those datablocks to PARTIAL_DIR_NAME next to the file
+COMMIT_SCOPES = [
+    ('FULL', "Full File", "Save the whole .blend as a new version"),
+    ('SELECTED', "Selected Objects", "Version only the selected objects and what they use"),
+    ('COLLECTION', "Active Collection", "Version only the active collection and what it contains"),
+]
+PARTIAL_DIR_NAME = ".draftwolf_partial"
 
 # Error message literals (avoid duplication for linter)
 UNKNOWN_ERROR = "Unknown Error"
 CONNECTION_ERROR = "Connection Error"
+APP_NOT_RUNNING_ERROR = "DraftWolf App is not running"
 CANNOT_CONNECT_APP = "Cannot connect to DraftWolf App"
 
 # Pre-compile regex patterns for performance
 VERSION_SUFFIX_PATTERN = re.compile(r'-v[\d\.]+$')
 NUMBER_SUFFIX_PATTERN = re.compile(r'-\d+$')
+# shot_v001 / shot v12: the underscore form of legacy versioned file names
+LEGACY_VERSION_PATTERN = re.compile(r'[_ ][vV]\d+(?:\.\d+)*$')
@@ -0,0 +1,184 @@
+"""
+Delta restore: patch the working file into a version instead of rewriting it whole.
+
+The working file is fingerprinted in fixed DELTA_CHUNK_SIZE chunks (sha256 each)
+and the list is sent to /draft/restore-delta. The app answers with the version's
+size and digest and a plan in file order: ranges to copy from the working file
+({'from', 'length'}) and the bytes it doesn't have ({'data'}, base64). The target
+is rebuilt in a temp file next to the working file and swapped in with os.replace,
+so an interrupted restore leaves the old file intact.
+
+Ranges are copied with os.copy_file_range where the OS has it (the kernel copies,
+or shares the extents on reflink filesystems), else through one reused buffer.
+Like integrity.py this doesn't mmap the working file: a file truncated while
+mapped raises SIGBUS in Blender instead of an error. Before the swap the rebuilt
+file must have the version's size and digest, and the working file's size and
+mtime are checked again, as the plan is only valid for the bytes that were
+fingerprinted. Otherwise the temp file is removed and DeltaError raised.
+
+restore_version() uses the delta path for files of DELTA_MIN_SIZE and up, and a
+plain /draft/restore for small files, or when the app has no delta endpoint or
+the delta fails.
+"""
+
+import base64
+import hashlib
+import os
+import tempfile
+import time
+
+from .api import send_request
+from .constants import CANNOT_CONNECT_APP, DELTA_CHUNK_SIZE, DELTA_MIN_SIZE, UNKNOWN_ERROR
+from .integrity import digest_from, file_digest
+
+
+class DeltaError(Exception):
+    pass
+
+
+def fingerprint(path, chunk_size=DELTA_CHUNK_SIZE):
+    """sha256 hex digests of path's consecutive chunk_size chunks (the last may be shorter)."""
+    digests = []
+    with open(path, "rb", buffering=0) as f:
+        buffer = bytearray(max(1, min(chunk_size, os.fstat(f.fileno()).st_size)))
+        with memoryview(buffer) as view:
+            while True:
+                n = f.readinto(view)
+                if not n:
+                    break
+                digests.append(hashlib.sha256(view[:n]).hexdigest())
+    return digests
+
+
+def request_plan(root, path, version_id, chunks, chunk_size=DELTA_CHUNK_SIZE):
+    """Ask the app how to turn the fingerprinted file into version_id's copy of path."""
+    return send_request('/draft/restore-delta', {
+        'projectRoot': root,
+        'versionId': version_id,
+        'path': path,
+        'chunkSize': chunk_size,
+        'chunks': chunks,
+    })
+
+
+def _copy_range(src, dst, offset, length, buffer):
+    """Append length bytes of src from offset to dst (both unbuffered binary files)."""
+    if hasattr(os, "copy_file_range"):
+        try:
+            while length:
+                n = os.copy_file_range(src.fileno(), dst.fileno(), length, offset)
+                if not n:
+                    raise DeltaError("Working file is shorter than the plan expects")
+                offset += n
+                length -= n
+            return
+        except OSError:
+            pass    # e.g. unsupported between these filesystems; copy what is left through the buffer
+    src.seek(offset)
+    with memoryview(buffer) as view:
+        while length:
+            n = src.readinto(view[:min(length, len(view))])
+            if not n:
+                raise DeltaError("Working file is shorter than the plan expects")
+            dst.write(view[:n])
+            length -= n
+
+
+def rebuild(path, plan, chunk_size=DELTA_CHUNK_SIZE):
+    """
+    Write the plan's target next to path, copying reused ranges from path. Returns
+    (temp path, bytes copied, bytes received); the caller swaps it in or removes it.
+    """
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".draftwolf-delta",
+                                     dir=os.path.dirname(path))
+    copied = received = 0
+    try:
+        with open(path, "rb", buffering=0) as src, os.fdopen(fd, "wb", buffering=0) as dst:
+            buffer = bytearray(chunk_size)
+            for op in plan:
+                data = op.get('data')
+                if data is not None:
+                    raw = base64.b64decode(data)
+                    dst.write(raw)
+                    received += len(raw)
+                else:
+                    _copy_range(src, dst, int(op['from']), int(op['length']), buffer)
+                    copied += int(op['length'])
+            os.fsync(dst.fileno())
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return temp_path, copied, received
+
+
+def delta_restore(root, path, version_id, chunk_size=DELTA_CHUNK_SIZE):
+    """
+    Patch path into version_id's copy. Returns the app's reply with a 'delta' summary added.
+    Raises DeltaError (the working file is left as it was) if the app can't or the result is wrong.
+    """
+    start = time.perf_counter()
+    before = os.stat(path)
+    chunks = fingerprint(path, chunk_size)
+    fingerprint_s = time.perf_counter() - start
+    res = request_plan(root, path, version_id, chunks, chunk_size)
+    if not (res and res.get('success')):
+        raise DeltaError(res.get('error', UNKNOWN_ERROR) if res else CANNOT_CONNECT_APP)
+    plan = res.get('ops')
+    if not isinstance(plan, list):
+        raise DeltaError("Invalid delta response")
+
+    temp_path, copied, received = rebuild(path, plan, chunk_size)
+    try:
+        size = os.path.getsize(temp_path)
+        if isinstance(res.get('size'), int) and size != res['size']:
+            raise DeltaError(f"Rebuilt file is {size} bytes, the version has {res['size']}")
+        expected = digest_from(res)
+        if expected is not None and file_digest(temp_path, expected[0]) != expected[1]:
+            raise DeltaError("Rebuilt file doesn't match the version's digest")
+        after = os.stat(path)
+        if (after.st_size, after.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+            raise DeltaError("The working file changed during the restore")
+        try:
+            os.chmod(temp_path, before.st_mode & 0o7777)
+        except OSError:
+            pass
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    res.pop('ops', None)
+    res['delta'] = {
+        'chunks': len(chunks),
+        'bytesCopied': copied,
+        'bytesReceived': received,
+        'fingerprintSeconds': round(fingerprint_s, 3),
+        'verified': expected is not None,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    return res
+
+
+def restore_version(root, path, version_id):
+    """
+    Restore version_id of the file at path: a delta restore when the working file is large
+    enough, otherwise (or if that fails) the app's full /draft/restore. Returns the reply.
+    """
+    try:
+        large = os.path.getsize(path) >= DELTA_MIN_SIZE
+    except OSError:
+        large = False
+    if large:
+        try:
+            return delta_restore(root, path, version_id)
+        except (DeltaError, OSError, ValueError, KeyError) as e:
+            print(f"DraftWolf: delta restore unavailable ({e}); restoring the whole file")
+    # The app may write into the file, which a hardlinked safety snapshot shares
+    from .snapshot import unshare
+    unshare(path)
+    return send_request('/draft/restore', {'projectRoot': root, 'versionId': version_id})
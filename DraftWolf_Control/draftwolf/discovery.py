@@ -0,0 +1,138 @@
+"""
+App discovery file: where the running DraftWolf app listens, and whether it is alive.
+
+The app writes a small JSON file under the user runtime dir when it starts:
+``{"pid": ..., "port": ..., "socketPath": ..., "version": ..., "startedAt": ...}``.
+The addon re-reads it only when an os.stat() shows it changed, and checks the
+pid is alive before any HTTP. A dead pid means "app not running" in
+microseconds instead of a connect timeout; a new port or socket is followed by
+switching the API transport. Without the file (older apps) nothing changes:
+the fixed API_PORT is used and liveness is learned over HTTP as before.
+"""
+
+import json
+import os
+import sys
+import threading
+
+from .constants import APP_NOT_RUNNING_ERROR, DISCOVERY_FILE_ENV, DISCOVERY_FILE_NAME
+from .transport import use_app_endpoint
+
+# check() results
+MISSING = "missing"   # no (readable) discovery file: unknown, fall back to HTTP
+DEAD = "dead"         # file present but its process is gone
+ALIVE = "alive"       # the process that wrote the file is running
+
+
+def discovery_path():
+    """The app's discovery file (DRAFTWOLF_DISCOVERY_FILE overrides the runtime-dir default)."""
+    override = os.environ.get(DISCOVERY_FILE_ENV)
+    if override:
+        return override
+    from .shared_status import user_runtime_dir
+    return os.path.join(user_runtime_dir(), DISCOVERY_FILE_NAME)
+
+
+if sys.platform == "win32":
+    def pid_alive(pid):
+        """True if a process with this pid is running (OpenProcess; os.kill would terminate it on Windows)."""
+        import ctypes
+        from ctypes import wintypes
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        ERROR_ACCESS_DENIED = 5
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, int(pid))
+        if not handle:
+            # Access denied still means the process exists
+            return ctypes.get_last_error() == ERROR_ACCESS_DENIED
+        try:
+            code = wintypes.DWORD()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+                return True
+            return code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+else:
+    def pid_alive(pid):
+        """True if a process with this pid is running (signal 0 checks without delivering anything)."""
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        except (OSError, ValueError, OverflowError):
+            return False
+        return True
+
+
+class AppDiscovery:
+    """Cached view of the discovery file; use the module-level ``discovery``."""
+
+    def __init__(self, path=None):
+        self._path = path
+        self._lock = threading.Lock()
+        self._stat_key = None      # (mtime_ns, size, inode) of the file last parsed
+        self.info = None           # parsed file contents, None if missing/unreadable
+        self._endpoint = None      # (port, socketPath) last applied to the transport
+        self.reads = 0             # times the file was actually read (for benchmarks)
+
+    @property
+    def path(self):
+        if self._path is None:
+            self._path = discovery_path()
+        return self._path
+
+    def _reload(self):
+        """Re-read the file if stat shows it changed. Returns False if there is no usable file."""
+        path = self.path
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._stat_key = None
+            self.info = None
+            return False
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if key == self._stat_key:
+            return True
+        self._stat_key = key
+        self.reads += 1
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            info = None
+        if not isinstance(info, dict):
+            # Probably caught mid-write: treat as missing and read it again next time
+            self._stat_key = None
+            self.info = None
+            return False
+        self.info = info
+        return True
+
+    def check(self):
+        """MISSING, DEAD or ALIVE; when ALIVE, the API transport follows the advertised port/socket."""
+        with self._lock:
+            if not self._reload():
+                return MISSING
+            info = self.info
+            if not info.get("pid") or not pid_alive(info["pid"]):
+                return DEAD
+            endpoint = (info.get("port"), info.get("socketPath"))
+            if endpoint != self._endpoint:
+                self._endpoint = endpoint
+                if use_app_endpoint(*endpoint):
+                    # Failures counted against the previous address say nothing about this one
+                    from .policy import breaker
+                    breaker.reset()
+            return ALIVE
+
+    def unavailable_error(self):
+        """Error dict for send_request when the app is known not to run, else None."""
+        if self.check() == DEAD:
+            return {'success': False, 'error': APP_NOT_RUNNING_ERROR}
+        return None
+
+
+discovery = AppDiscovery()
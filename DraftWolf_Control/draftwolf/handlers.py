@@ -0,0 +1,130 @@
+"""
+bpy.app.handlers that keep the panel's caches current without polling.
+
+load_post resets the per-file UI state and prefetches the new file's project root
+and history on the scheduler, so the first panel draw finds them cached; saving
+under a new path (save_pre/save_post) does the same for that path. A plain save
+changes no history and fetches nothing. depsgraph_update_post only redraws the
+panel when the dirty flag flips, which moves the "Unsaved changes" row. The render
+handlers pass frames and finished renders to render.py.
+
+Changes made elsewhere (the app, other sessions) arrive through the status task:
+shared_status markers from other instances, and the history revisions the app may
+report in /health (history.apply_history_revisions).
+"""
+
+import bpy
+
+from .state import HandlerState, PullState, RetentionState, SafeVersionList, invalidate_status_cache
+
+
+def _prefetch(filepath):
+    """Scheduler task: resolve filepath's project root and load its history into the cache."""
+    from .history import get_project_history
+    from .path_utils import get_project_root
+    root = get_project_root(filepath)
+    if root:
+        get_project_history(root)
+    from .panel import request_redraw
+    request_redraw()
+
+
+def prefetch(filepath):
+    """Warm the root and history caches for filepath in the background."""
+    if not filepath:
+        return
+    from .scheduler import PRIORITY_HIGH, scheduler
+    from .state import ensure_background_started
+    ensure_background_started()
+    HandlerState.prefetches += 1
+    scheduler.schedule(f"prefetch:{filepath}", _prefetch, filepath, priority=PRIORITY_HIGH)
+
+
+@bpy.app.handlers.persistent
+def on_load_post(*_args):
+    filepath = bpy.data.filepath
+    # Selection, search results and cleanup preview belonged to the previous file
+    SafeVersionList.selected = {}
+    SafeVersionList.search_key = None
+    if RetentionState.filepath != filepath:
+        RetentionState.plan = RetentionState.history = RetentionState.filepath = None
+    if PullState.filepath is not None and PullState.filepath != filepath:
+        from .pull import clear
+        clear()
+    HandlerState.dirty = False
+    invalidate_status_cache()
+    prefetch(filepath)
+
+
+@bpy.app.handlers.persistent
+def on_save_pre(*_args):
+    HandlerState.saving_from = bpy.data.filepath
+
+
+@bpy.app.handlers.persistent
+def on_save_post(*_args):
+    filepath = bpy.data.filepath
+    HandlerState.dirty = False
+    if filepath != HandlerState.saving_from:
+        # First save or Save As: the panel's saved/initialized state and history are for another path
+        invalidate_status_cache()
+        prefetch(filepath)
+    HandlerState.saving_from = None
+    from .panel import request_redraw
+    request_redraw()
+
+
+@bpy.app.handlers.persistent
+def on_depsgraph_update_post(*_args):
+    # Runs on every edit: one attribute read unless the dirty flag changed
+    dirty = bpy.data.is_dirty
+    if dirty != HandlerState.dirty:
+        HandlerState.dirty = dirty
+        from .panel import request_redraw
+        request_redraw()
+
+
+@bpy.app.handlers.persistent
+def on_render_write(scene, *_args):
+    from .render import frame_written
+    frame_written(scene)
+
+
+@bpy.app.handlers.persistent
+def on_render_complete(scene, *_args):
+    from .render import render_finished
+    render_finished(scene)
+
+
+@bpy.app.handlers.persistent
+def on_render_cancel(scene, *_args):
+    from .render import render_finished
+    render_finished(scene, complete=False)
+
+
+HANDLERS = (
+    ("load_post", on_load_post),
+    ("save_pre", on_save_pre),
+    ("save_post", on_save_post),
+    ("depsgraph_update_post", on_depsgraph_update_post),
+    ("render_write", on_render_write),
+    ("render_complete", on_render_complete),
+    ("render_cancel", on_render_cancel),
+)
+
+
+def register():
+    for name, function in HANDLERS:
+        handlers = getattr(bpy.app.handlers, name, None)
+        if handlers is not None and function not in handlers:
+            handlers.append(function)
+    HandlerState.registered = True
+    HandlerState.dirty = bool(getattr(bpy.data, "is_dirty", False))
+
+
+def unregister():
+    for name, function in HANDLERS:
+        handlers = getattr(bpy.app.handlers, name, None)
+        if handlers is not None and function in handlers:
+            handlers.remove(function)
+    HandlerState.registered = False
@@ -1,25 +1,35 @@
-"""Version history loading and filtering."""
+"""
+Version history loading and filtering.
+
+History is cached per project root in state.HistoryStore and shared by the panel,
+the restore dialog and the rename operator: reads are served from the cache,
+stale entries are revalidated in the background, and concurrent fetches for the
+same project share a single request. Successful mutations (commit, rename) are
+applied to the cached copy immediately and reconciled with the app afterwards:
+the app's copy replaces the optimistic one, and any change it didn't apply is
+reported in the panel.
+"""
 
 import os
+import threading
+import time
+from datetime import datetime, timezone
 
-from .constants import VERSION_SUFFIX_PATTERN, NUMBER_SUFFIX_PATTERN
+from .constants import (
+    VERSION_SUFFIX_PATTERN,
+    NUMBER_SUFFIX_PATTERN,
+    HISTORY_FETCH_WAIT,
+    HISTORY_RECONCILE_DELAY,
+)
 from .api import send_request
 from .path_utils import get_project_root
+from .scheduler import scheduler
+from .search import HistoryIndex
+from .state import HistoryStore, RootCache, StatusCache, invalidate_status_cache
 
 
-def load_version_history(filepath):
-    """Load and filter version history for the current file."""
-    if not filepath:
-        return []
-
-    root = get_project_root(filepath)
-    if not root:
-        return []
-
-    history = send_request('/draft/history', {'projectRoot': root})
-    if not history:
-        return []
-
+def clean_target_basename(filepath):
+    """Return (target_file, target_lower): the versioned file's basename with any retrieved-copy suffix removed."""
     target_file = os.path.basename(filepath)
     name, ext = os.path.splitext(target_file)
     clean_name = name
@@ -30,14 +40,370 @@ def load_version_history(filepath):
         clean_name = clean_name.replace('-retrieved', '')
         clean_name = VERSION_SUFFIX_PATTERN.sub('', clean_name)
         clean_name = NUMBER_SUFFIX_PATTERN.sub('', clean_name)
-
     target_file = clean_name + ext
-    target_lower = target_file.lower()
+    return target_file, target_file.lower()
 
-    filtered_history = []
+
+def filter_history_by_basename(history, target_lower):
+    """Return versions that contain a file whose basename (lower) equals target_lower."""
+    result = []
     for v in history:
         files = v.get('files', {})
-        if any(os.path.basename(f_path).lower() == target_lower for f_path in files.keys()):
-            filtered_history.append(v)
+        for f_path in files:
+            if os.path.basename(f_path).lower() == target_lower:
+                result.append(v)
+                break
+    return result
+
+
+def add_history_listener(listener):
+    """Call listener(root) whenever a project's cached history changes (may run on a worker thread)."""
+    if listener not in HistoryStore.listeners:
+        HistoryStore.listeners.append(listener)
+
+
+def remove_history_listener(listener):
+    if listener in HistoryStore.listeners:
+        HistoryStore.listeners.remove(listener)
+
+
+def _notify(root):
+    for listener in list(HistoryStore.listeners):
+        try:
+            listener(root)
+        except Exception as e:
+            print(f"DraftWolf history listener failed: {e}")
+
+
+def fetch_project_history(root):
+    """
+    Fetch root's full history from the app into the store and return it.
+    Concurrent callers for the same root wait for the one request in flight.
+    If the app can't be reached the last good copy is kept (None if there is none).
+    """
+    with HistoryStore.lock:
+        event = HistoryStore.inflight.get(root)
+        owner = event is None
+        if owner:
+            event = threading.Event()
+            HistoryStore.inflight[root] = event
+    if not owner:
+        event.wait(HISTORY_FETCH_WAIT)
+        entry = HistoryStore.entries.get(root)
+        return entry['history'] if entry else None
+
+    changed = False
+    started = time.time()
+    try:
+        res = send_request('/draft/history', {'projectRoot': root})
+        history = res if isinstance(res, list) else None
+        with HistoryStore.lock:
+            previous = HistoryStore.entries.get(root)
+            if previous and max(previous.get('mutated_at', 0.0), previous.get('fetched_at', 0.0)) > started:
+                # A local update (its reconcile fetch will follow) or a reconcile landed while this was in flight
+                history = previous['history']
+            elif history is None and previous and previous['history'] is not None:
+                previous['time'] = time.time()
+                history = previous['history']
+            else:
+                HistoryStore.entries[root] = {
+                    'history': history,
+                    'time': time.time(),
+                    'fetched_at': started,
+                    'filtered': {},
+                    # Search indexes survive refetches; get_history_index syncs them incrementally
+                    'indexes': previous.get('indexes', {}) if previous else {},
+                }
+                changed = previous is None or previous['history'] != history
+    finally:
+        with HistoryStore.lock:
+            HistoryStore.inflight.pop(root, None)
+        event.set()
+    if changed:
+        _notify(root)
+    return history
+
+
+def _revalidate_in_background(root):
+    if root in HistoryStore.inflight:
+        return
+    scheduler.schedule(f"history:{root}", fetch_project_history, root, replace=False)
+
+
+def get_project_history(root, max_age=None, block=True):
+    """
+    Return root's cached full history (stale-while-revalidate).
+    A missing entry is fetched now (or in the background when block=False, returning None);
+    an entry older than max_age is returned as-is and refreshed in the background. While the
+    app reports history revisions, entries are refetched when those change (see
+    apply_history_revisions) and the default max_age is only a backstop.
+    """
+    if max_age is None:
+        max_age = HistoryStore.event_max_age if StatusCache.history_events else HistoryStore.max_age
+    entry = HistoryStore.entries.get(root)
+    if entry is None:
+        if block:
+            return fetch_project_history(root)
+        _revalidate_in_background(root)
+        return None
+    if time.time() - entry['time'] > max_age:
+        _revalidate_in_background(root)
+    return entry['history']
+
+
+def get_file_history(filepath, max_age=None, block=True):
+    """Return cached versions of filepath ([] if not versioned, None if history isn't available)."""
+    if not filepath:
+        return []
+    root = get_project_root(filepath)
+    if not root:
+        return []
+    history = get_project_history(root, max_age=max_age, block=block)
+    if history is None:
+        return None
+    _, target_lower = clean_target_basename(filepath)
+    entry = HistoryStore.entries.get(root)
+    if entry is None or entry['history'] is not history:
+        return filter_history_by_basename(history, target_lower)
+    filtered = entry['filtered'].get(target_lower)
+    if filtered is None:
+        filtered = filter_history_by_basename(history, target_lower)
+        entry['filtered'][target_lower] = filtered
+    return filtered
+
+
+def get_history_index(filepath, block=True):
+    """
+    Return a search.HistoryIndex over filepath's versions, or None if history isn't available.
+    The index is kept with the cached history and brought up to date incrementally.
+    """
+    history = get_file_history(filepath, block=block)
+    if history is None:
+        return None
+    entry = HistoryStore.entries.get(get_project_root(filepath)) if history else None
+    if entry is None:
+        return HistoryIndex(history)
+    _, target_lower = clean_target_basename(filepath)
+    indexes = entry.setdefault('indexes', {})
+    index = indexes.get(target_lower)
+    if index is None:
+        index = indexes[target_lower] = HistoryIndex(history)
+    else:
+        index.sync(history)
+    return index
+
+
+def invalidate_history(root=None):
+    """Mark root's (or every) cached history stale so the next read revalidates it."""
+    with HistoryStore.lock:
+        entries = HistoryStore.entries.values() if root is None else [HistoryStore.entries.get(root)]
+        for entry in entries:
+            if entry:
+                entry['time'] = 0.0
+
+
+def apply_history_revisions(revisions):
+    """
+    Act on the per-project history revisions the app reports in /health (root -> revision;
+    runs on the status task, in followers with the leader's shared copy): refetch cached
+    histories whose revision changed, and retry failed project-root lookups when a project
+    appears or goes away. The first report is only recorded.
+    """
+    previous = HistoryStore.revisions
+    HistoryStore.revisions = dict(revisions)
+    if previous is None:
+        return
+    changed = [root for root in set(previous) | set(revisions) if previous.get(root) != revisions.get(root)]
+    if not changed:
+        return
+    if set(previous) != set(revisions):
+        gone = set(previous) - set(revisions)
+        RootCache.cache = {d: e for d, e in RootCache.cache.items() if e['root'] and e['root'] not in gone}
+        invalidate_status_cache()
+    for root in changed:
+        if root in HistoryStore.entries:
+            fetch_project_history(root)
+
+
+def _utc_timestamp():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z')
+
+
+def _apply_local_update(root, update_history, update_filtered):
+    """
+    Swap root's cached history for update_history(history) and patch each memoized
+    per-file list with update_filtered(target_lower, filtered) instead of refiltering.
+    Returns False if there is nothing cached to update.
+    """
+    with HistoryStore.lock:
+        entry = HistoryStore.entries.get(root)
+        if not entry or entry['history'] is None:
+            return False
+        filtered = {target: update_filtered(target, versions) for target, versions in entry['filtered'].items()}
+        HistoryStore.entries[root] = {
+            'history': update_history(entry['history']),
+            'time': entry['time'],
+            'filtered': filtered,
+            'indexes': entry.get('indexes', {}),
+            'mutated_at': time.time(),
+        }
+    _notify(root)
+    return True
+
+
+def _unapplied(history, checks):
+    """Messages for the checked local changes that the app's history doesn't show."""
+    by_id = {v.get('id'): v for v in history}
+    numbers = {str(v.get('versionNumber')) for v in history}
+    problems = []
+    for kind, key, expected in checks:
+        if kind == 'commit' and key not in by_id and str(expected) not in numbers:
+            problems.append(f"The app has no record of committed version v{expected}")
+        elif kind == 'rename' and by_id.get(key, {}).get('label') != expected:
+            problems.append(f"Rename to \"{expected}\" was not applied by the app")
+        elif kind == 'batch':
+            relabels, deleted = expected
+            missed = sum(1 for vid, label in relabels.items() if by_id.get(vid, {}).get('label') != label)
+            missed += sum(1 for vid in deleted if vid in by_id)
+            if missed:
+                problems.append(f"{missed} batch change(s) were not applied by the app")
+    return problems
+
+
+def _publish_reconcile(root, problems):
+    """Main thread: show (or, once a later reconcile agrees, clear) root's reverted changes in the panel."""
+    if problems:
+        HistoryStore.reverted = {'root': root, 'problems': problems}
+    elif HistoryStore.reverted and HistoryStore.reverted['root'] == root:
+        HistoryStore.reverted = None
+    else:
+        return
+    from .panel import request_redraw
+    request_redraw()
+
+
+def _reconcile(root, checks):
+    """
+    Refetch root's history after local updates; the app's copy replaces the optimistic one, rolling
+    back anything it rejected, and changes it didn't apply are reported in the panel.
+    """
+    from .scheduler import call_on_main_thread
+    with HistoryStore.lock:
+        HistoryStore.reconcile_timers.pop(root, None)
+    # Not fetch_project_history: a fetch in flight may predate the update, and it keeps the optimistic copy
+    started = time.time()
+    history = send_request('/draft/history', {'projectRoot': root})
+    if not isinstance(history, list):
+        return
+    changed = False
+    with HistoryStore.lock:
+        previous = HistoryStore.entries.get(root)
+        # A later local update is compared by its own reconcile
+        if previous is None or previous.get('mutated_at', 0.0) <= started:
+            HistoryStore.entries[root] = {
+                'history': history,
+                'time': time.time(),
+                'fetched_at': started,
+                'filtered': {},
+                'indexes': previous.get('indexes', {}) if previous else {},
+            }
+            changed = previous is None or previous['history'] != history
+    if changed:
+        _notify(root)
+    call_on_main_thread(_publish_reconcile, root, _unapplied(history, checks))
+
+
+def _schedule_reconcile(root, check):
+    """Queue a background reconcile for root; mutations in quick succession share one fetch."""
+    with HistoryStore.lock:
+        pending = HistoryStore.reconcile_timers.get(root)
+        if pending is not None and not pending.cancelled:
+            pending.args[1].append(check)
+            return
+        HistoryStore.reconcile_timers[root] = scheduler.schedule(
+            f"reconcile:{root}", _reconcile, root, [check], delay=HISTORY_RECONCILE_DELAY)
+
+
+def record_commit(root, filepath, res, label):
+    """
+    Insert the version a successful /draft/commit just created at the top of the cached
+    history (from the response's 'version' if present, else the operator's own knowledge),
+    then reconcile in the background. Returns the file's updated history.
+    """
+    version = res.get('version') if isinstance(res.get('version'), dict) else None
+    if version is None:
+        try:
+            rel_path = os.path.relpath(filepath, root)
+        except ValueError:
+            rel_path = os.path.basename(filepath)
+        number = res.get('versionNumber', '?')
+        version = {
+            'id': res.get('versionId') or res.get('id') or f"pending-{number}-{time.time():.0f}",
+            'versionNumber': str(number),
+            'label': label,
+            'timestamp': _utc_timestamp(),
+            'files': {rel_path.replace(os.sep, '/'): {}},
+        }
+    version_targets = {os.path.basename(f).lower() for f in version.get('files', {})}
+
+    def add_to_filtered(target, versions):
+        return [version] + versions if target in version_targets else versions
+
+    if _apply_local_update(root, lambda history: [version] + history, add_to_filtered):
+        _schedule_reconcile(root, ('commit', version.get('id'), version.get('versionNumber')))
+    else:
+        fetch_project_history(root)
+    return get_file_history(filepath, block=False) or []
+
+
+def record_rename(root, filepath, version_id, new_label):
+    """Relabel version_id in the cached history, then reconcile in the background. Returns the file's history."""
+    def relabel(versions):
+        return [dict(v, label=new_label) if v.get('id') == version_id else v for v in versions]
+
+    if _apply_local_update(root, relabel, lambda target, versions: relabel(versions)):
+        _schedule_reconcile(root, ('rename', version_id, new_label))
+    else:
+        fetch_project_history(root)
+    return get_file_history(filepath, block=False) or []
+
+
+def record_batch(root, filepath, relabels, tags, deleted):
+    """
+    Apply a batch's successful results to the cached history in one pass: relabels
+    ({id: label}), added tags ({id: tag}) and deleted ids. Returns the file's history.
+    """
+    def apply(versions):
+        updated = []
+        for v in versions:
+            vid = v.get('id')
+            if vid in deleted:
+                continue
+            if vid in relabels or vid in tags:
+                v = dict(v)
+                if vid in relabels:
+                    v['label'] = relabels[vid]
+                if vid in tags:
+                    v['tags'] = list(v.get('tags') or ()) + [tags[vid]]
+            updated.append(v)
+        return updated
+
+    if _apply_local_update(root, apply, lambda target, versions: apply(versions)):
+        _schedule_reconcile(root, ('batch', None, (relabels, deleted)))
+    else:
+        fetch_project_history(root)
+    return get_file_history(filepath, block=False) or []
+
+
+def load_version_history(filepath, refresh=False):
+    """Load and filter version history for the current file; refresh=True refetches from the app first."""
+    if not filepath:
+        return []
+
+    root = get_project_root(filepath)
+    if not root:
+        return []
 
-    return filtered_history
+    if refresh:
+        fetch_project_history(root)
+    return get_file_history(filepath) or []
@@ -0,0 +1,152 @@
+"""
+Integrity checks of restored and committed files against the version manifest.
+
+The file is hashed in large chunks on a worker thread (both the reads and
+hashlib release the GIL on big buffers), so a restore can reopen the file in
+Blender while it is being verified. Chunks are read into one reused buffer
+rather than mmapped: a file truncated while mapped (a save or restore racing
+the check) would kill Blender with SIGBUS instead of failing the check.
+Results are published to IntegrityState on the main thread. Versions whose
+manifest carries no digest are not checked.
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+from .constants import INTEGRITY_CHUNK_SIZE
+from .state import IntegrityState
+
+# Manifest keys that may carry a file's digest, and the algorithm assumed for a bare hex digest
+DIGEST_KEYS = ("sha256", "hash", "digest", "checksum")
+DEFAULT_ALGORITHM = "sha256"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def file_digest(path, algorithm=DEFAULT_ALGORITHM, chunk_size=INTEGRITY_CHUNK_SIZE):
+    """Hex digest of the file at path, read in chunk_size pieces into a single reused buffer."""
+    h = hashlib.new(algorithm)
+    with open(path, "rb", buffering=0) as f:
+        # Small files (legacy imports hash thousands) don't need a full chunk allocated
+        buffer = bytearray(max(1, min(chunk_size, os.fstat(f.fileno()).st_size + 1)))
+        with memoryview(buffer) as view:
+            while True:
+                n = f.readinto(view)
+                if not n:
+                    break
+                h.update(view[:n])
+    return h.hexdigest()
+
+
+def parse_digest(value):
+    """'sha256:ab12..' or 'ab12..' -> (algorithm, hex) or None if it isn't a usable digest."""
+    if not isinstance(value, str) or not value:
+        return None
+    algorithm, sep, hexdigest = value.partition(":")
+    if not sep:
+        algorithm, hexdigest = DEFAULT_ALGORITHM, value
+    algorithm = algorithm.lower().replace("-", "")
+    if algorithm not in hashlib.algorithms_available:
+        return None
+    return algorithm, hexdigest.lower()
+
+
+def digest_from(meta):
+    """The first digest found in a manifest/response dict (see DIGEST_KEYS), else None."""
+    if not isinstance(meta, dict):
+        return None
+    for key in DIGEST_KEYS:
+        parsed = parse_digest(meta.get(key))
+        if parsed is not None:
+            return parsed
+    return None
+
+
+def manifest_digest(version, filepath):
+    """Digest recorded for filepath in a version entry's 'files' manifest (matched by basename)."""
+    files = version.get('files') if isinstance(version, dict) else None
+    if not isinstance(files, dict):
+        return None
+    target = os.path.basename(filepath).lower()
+    for name, meta in files.items():
+        if os.path.basename(name.replace("\\", "/")).lower() == target:
+            return digest_from(meta)
+    return None
+
+
+def _verify(path, expected, kind, version_label):
+    algorithm, expected_hex = expected
+    start = time.perf_counter()
+    error = None
+    actual = None
+    try:
+        actual = file_digest(path, algorithm)
+    except OSError as e:
+        error = str(e)
+    return {
+        'path': path,
+        'kind': kind,
+        'version': version_label,
+        'algorithm': algorithm,
+        'expected': expected_hex,
+        'actual': actual,
+        'ok': error is None and actual == expected_hex,
+        'error': error,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def _publish(result):
+    IntegrityState.pending -= 1
+    IntegrityState.last_result = result
+    if not result['ok']:
+        IntegrityState.failures.append(result)
+        reason = result['error'] or f"{result['algorithm']} {result['actual']} != {result['expected']}"
+        print(f"DraftWolf: {result['kind']} of {result['version']} failed integrity check "
+              f"({result['path']}): {reason}")
+    from .panel import request_redraw
+    request_redraw()
+
+
+def _run(path, expected, kind, version_label):
+    from .scheduler import call_on_main_thread
+    result = _verify(path, expected, kind, version_label)
+    call_on_main_thread(_publish, result)
+    return result
+
+
+def verify_async(path, expected, kind, version_label):
+    """
+    Hash path on the integrity worker and compare with expected (algorithm, hex).
+    kind is 'restore' or 'commit'. Returns a Future with the result dict, or None if
+    there is nothing to compare against.
+    """
+    global _executor
+    if expected is None or not path:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="DraftWolfIntegrity")
+    from .scheduler import start_main_thread_drain
+    start_main_thread_drain()    # the result is published on the main thread
+    IntegrityState.pending += 1
+    return _executor.submit(_run, path, expected, kind, version_label)
+
+
+def clear_failure(path):
+    """Forget failures for path (e.g. after it was restored again)."""
+    IntegrityState.failures = [r for r in IntegrityState.failures if r['path'] != path]
+
+
+def shutdown():
+    """Stop the worker (addon unregister); a check in progress finishes first."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+    IntegrityState.pending = 0
@@ -0,0 +1,22 @@
+"""Deferred imports, so registering the addon doesn't load the implementation modules."""
+
+import importlib
+
+
+def lazy_function(module, name, package=__package__):
+    """
+    Return a stand-in for module.name that imports module on first call and forwards to it.
+    Used by operator and panel modules so their classes can be registered cheaply.
+    """
+    target = None
+
+    def proxy(*args, **kwargs):
+        nonlocal target
+        if target is None:
+            target = getattr(importlib.import_module(module, package), name)
+        return target(*args, **kwargs)
+
+    proxy.__name__ = name
+    proxy.__qualname__ = name
+    proxy.__doc__ = f"Deferred {module.lstrip('.')}.{name}"
+    return proxy
@@ -0,0 +1,277 @@
+"""
+Import of pre-DraftWolf history: shot_v001.blend ... shot_v250.blend, shot-3.blend
+or -retrieved-version copies become back-filled versions of shot.blend.
+
+The tree is walked with os.scandir (hidden directories such as the partial-commit
+folder are skipped) and files are grouped into assets by stripping their version
+suffix (VERSION_SUFFIX_PATTERN, NUMBER_SUFFIX_PATTERN, LEGACY_VERSION_PATTERN for
+the underscore form, and the retrieved-copy names path_utils recognizes). Each
+asset's files are ordered by version number, then mtime, fingerprinted on a thread
+pool and sent in chunks to /draft/import with their original timestamps.
+
+Every imported chunk is appended to a journal in the project root, so an
+interrupted import resumes where it stopped without hashing or sending the
+finished files again; each version also carries an importKey the app can use to
+drop a chunk it already applied but whose reply was lost.
+"""
+
+import json
+import os
+import re
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from .api import send_request
+from .constants import (
+    CANNOT_CONNECT_APP,
+    CLI_DEFAULT_JOBS,
+    LEGACY_IMPORT_CHUNK,
+    LEGACY_IMPORT_JOURNAL,
+    LEGACY_VERSION_PATTERN,
+    NUMBER_SUFFIX_PATTERN,
+    UNKNOWN_ERROR,
+    VERSION_SUFFIX_PATTERN,
+)
+from .history import clean_target_basename, invalidate_history
+from .integrity import file_digest
+from .path_utils import get_project_root, recover_original_filepath
+
+LegacyFile = namedtuple("LegacyFile", "path size mtime_ns number")
+LegacyAsset = namedtuple("LegacyAsset", "path files")   # path: the file the versions belong to
+
+_DIGITS = re.compile(r'\d+')
+
+
+def _number(text):
+    numbers = tuple(int(d) for d in _DIGITS.findall(text))
+    return numbers or None
+
+
+def parse_legacy_name(filename):
+    """(asset filename, version number tuple or None) for a legacy file, or None if it has no version suffix."""
+    name, ext = os.path.splitext(filename)
+    if '-retrieved' in name:
+        asset = os.path.basename(recover_original_filepath(filename))
+        if asset == filename:
+            asset, _ = clean_target_basename(filename)
+        asset_name = os.path.splitext(asset)[0]
+        return asset, _number(name[len(asset_name):]) if name.startswith(asset_name) else None
+    for pattern in (VERSION_SUFFIX_PATTERN, NUMBER_SUFFIX_PATTERN, LEGACY_VERSION_PATTERN):
+        match = pattern.search(name)
+        if match and match.start() > 0:
+            return name[:match.start()] + ext, _number(match.group())
+    return None
+
+
+def scan(directory, extensions=(".blend",)):
+    """Group the legacy versions under directory into assets. Returns (assets, files seen)."""
+    groups = {}
+    seen = 0
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    if not entry.name.lower().endswith(extensions):
+                        continue
+                    seen += 1
+                    parsed = parse_legacy_name(entry.name)
+                    if parsed is None:
+                        continue
+                    asset, number = parsed
+                    st = entry.stat()
+                    groups.setdefault(os.path.join(current, asset), []).append(
+                        LegacyFile(entry.path, st.st_size, st.st_mtime_ns, number))
+        except OSError as e:
+            print(f"DraftWolf import: skipping {current}: {e}")
+    assets = []
+    for path in sorted(groups):
+        files = sorted(groups[path], key=lambda f: (f.number or (), f.mtime_ns, f.path))
+        assets.append(LegacyAsset(path, files))
+    return assets, seen
+
+
+def _timestamp(mtime_ns):
+    return datetime.fromtimestamp(mtime_ns / 1e9, timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z')
+
+
+class Journal:
+    """Append-only record of imported files in a project root; one JSON object per line."""
+
+    def __init__(self, root):
+        self.path = os.path.join(root, LEGACY_IMPORT_JOURNAL)
+        self.done = {}    # source path -> entry
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue    # a line torn by the interruption we are resuming from
+                    self.done[entry['source']] = entry
+        except OSError:
+            pass
+
+    def finished(self, legacy_file):
+        entry = self.done.get(legacy_file.path)
+        return entry is not None and entry['size'] == legacy_file.size and entry['mtime_ns'] == legacy_file.mtime_ns
+
+    def record(self, entries):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+                self.done[entry['source']] = entry
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class ImportReport:
+    """Counts and timings of an import; summary() is what the command line prints."""
+
+    def __init__(self):
+        self.files_seen = 0
+        self.assets = 0
+        self.imported = 0
+        self.resumed = 0          # already in the journal
+        self.pending = 0          # left to import after the journal (what a dry run would import)
+        self.failed = []          # (path, error)
+        self.unversioned = []     # asset paths outside a version-controlled project
+        self.bytes_hashed = 0
+        self.scan_s = self.hash_s = self.commit_s = 0.0
+
+    def summary(self):
+        total_s = self.scan_s + self.hash_s + self.commit_s
+        return {
+            'filesSeen': self.files_seen,
+            'assets': self.assets,
+            'imported': self.imported,
+            'resumed': self.resumed,
+            'pending': self.pending,
+            'failed': [{'file': p, 'error': e} for p, e in self.failed],
+            'unversioned': self.unversioned,
+            'seconds': {'scan': round(self.scan_s, 3), 'hash': round(self.hash_s, 3),
+                        'commit': round(self.commit_s, 3), 'total': round(total_s, 3)},
+            'hashMBps': round(self.bytes_hashed / 1e6 / self.hash_s, 1) if self.hash_s and self.bytes_hashed else None,
+            'versionsPerSecond': round(self.imported / total_s, 1) if total_s and self.imported else None,
+        }
+
+
+def _timestamps(files):
+    """Original mtimes as timestamps, kept in version order where a copy is older than its predecessor."""
+    stamps = {}
+    last_ns = 0
+    for legacy_file in files:
+        last_ns = max(last_ns, legacy_file.mtime_ns)
+        stamps[legacy_file.path] = _timestamp(last_ns)
+    return stamps
+
+
+def _send_chunk(root, asset_rel, label, chunk, digests, stamps, report):
+    """Import chunk (LegacyFiles of one asset, in order); returns journal entries for what the app stored."""
+    versions = []
+    for legacy_file in chunk:
+        digest = digests[legacy_file.path]
+        versions.append({
+            'source': legacy_file.path,
+            'path': asset_rel,
+            'label': label.format(name=os.path.basename(legacy_file.path)),
+            'timestamp': stamps[legacy_file.path],
+            'size': legacy_file.size,
+            'sha256': digest,
+            'importKey': f"{asset_rel}:{digest}",
+        })
+    res = send_request('/draft/import', {'projectRoot': root, 'versions': versions})
+    if not res or not res.get('success'):
+        error = res.get('error', UNKNOWN_ERROR) if res else CANNOT_CONNECT_APP
+        report.failed.extend((f.path, error) for f in chunk)
+        return []
+    results = res.get('results')
+    if not isinstance(results, list) or len(results) != len(chunk):
+        report.failed.extend((f.path, "Invalid import response") for f in chunk)
+        return []
+    entries = []
+    for legacy_file, version, result in zip(chunk, versions, results):
+        if isinstance(result, dict) and result.get('success'):
+            entries.append({'source': legacy_file.path, 'size': legacy_file.size,
+                            'mtime_ns': legacy_file.mtime_ns, 'sha256': version['sha256'],
+                            'versionId': result.get('versionId')})
+        else:
+            error = result.get('error', UNKNOWN_ERROR) if isinstance(result, dict) else UNKNOWN_ERROR
+            report.failed.append((legacy_file.path, error))
+    return entries
+
+
+def _digest_or_none(legacy_file):
+    try:
+        return file_digest(legacy_file.path)
+    except OSError:
+        return None
+
+
+def import_tree(directory, label="Imported {name}", jobs=CLI_DEFAULT_JOBS, dry_run=False):
+    """
+    Import the legacy versions under directory (see module docstring). label may use {name},
+    the legacy file's name. dry_run scans and groups only. Returns an ImportReport.
+    """
+    report = ImportReport()
+    start = time.perf_counter()
+    assets, report.files_seen = scan(directory)
+    report.assets = len(assets)
+    report.scan_s = time.perf_counter() - start
+
+    journals = {}
+    pending = []    # (root, asset, files still to import)
+    for asset in assets:
+        root = get_project_root(asset.path)
+        if not root:
+            report.unversioned.append(asset.path)
+            continue
+        journal = journals.get(root)
+        if journal is None:
+            journal = journals[root] = Journal(root)
+        todo = [f for f in asset.files if not journal.finished(f)]
+        report.resumed += len(asset.files) - len(todo)
+        report.pending += len(todo)
+        if todo:
+            pending.append((root, asset, todo))
+    if dry_run:
+        return report
+
+    start = time.perf_counter()
+    to_hash = [f for _, _, todo in pending for f in todo]
+    digests = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        for legacy_file, digest in zip(to_hash, pool.map(_digest_or_none, to_hash)):
+            if digest is None:
+                report.failed.append((legacy_file.path, "Unreadable"))
+            else:
+                digests[legacy_file.path] = digest
+                report.bytes_hashed += legacy_file.size
+    report.hash_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for root, asset, todo in pending:
+        asset_rel = os.path.relpath(asset.path, root).replace(os.sep, '/')
+        stamps = _timestamps(asset.files)
+        todo = [f for f in todo if f.path in digests]
+        for i in range(0, len(todo), LEGACY_IMPORT_CHUNK):
+            chunk = todo[i:i + LEGACY_IMPORT_CHUNK]
+            entries = _send_chunk(root, asset_rel, label, chunk, digests, stamps, report)
+            if entries:
+                journals[root].record(entries)
+                report.imported += len(entries)
+                report.pending -= len(entries)
+            if len(entries) < len(chunk):
+                break    # later versions of this asset would land out of order; a rerun resumes here
+    report.commit_s = time.perf_counter() - start
+    for root in journals:
+        invalidate_history(root)
+    return report
@@ -3,15 +3,17 @@
 import os
 import sys
 import subprocess
-import urllib.request
+import time
 
 import bpy
 
-from .api import send_request
-from .constants import CANNOT_CONNECT_APP, UNKNOWN_ERROR
-from .path_utils import get_project_root
-from .state import StatusCache
-from .app_detection import is_app_installed
+from .constants import CANNOT_CONNECT_APP, SHARED_STATUS_ENABLED, UNKNOWN_ERROR
+from .lazy import lazy_function
+from .state import RootCache, StatusCache, invalidate_status_cache, request_status_refresh
+
+send_request = lazy_function(".api", "send_request")
+publish_shared_root = lazy_function(".shared_status", "publish_shared_root")
+is_app_installed = lazy_function(".app_detection", "is_app_installed")
 
 
 class object_ot_df_init(bpy.types.Operator):
@@ -29,6 +31,10 @@ class object_ot_df_init(bpy.types.Operator):
         directory = os.path.dirname(filepath)
         res = send_request('/draft/init', {'projectRoot': directory})
         if res and res.get('success'):
+            RootCache.cache[directory] = {'root': directory, 'time': time.time()}
+            invalidate_status_cache()
+            if SHARED_STATUS_ENABLED:
+                publish_shared_root(directory, directory)
             self.report({'INFO'}, "✓ Version control enabled! You can now save versions.")
         else:
             err = res.get('error', UNKNOWN_ERROR) if res else CANNOT_CONNECT_APP
@@ -47,6 +53,7 @@ class object_ot_df_open_app(bpy.types.Operator):
             filepath = bpy.data.filepath
             url = "myapp://open"
             if filepath:
+                import urllib.request
                 safe_path = urllib.request.pathname2url(filepath)
                 url += f"?path={safe_path}"
 
@@ -111,6 +118,8 @@ class object_ot_df_refresh_status(bpy.types.Operator):
     bl_label = "Refresh Status"
 
     def execute(self, context):
+        # Poll now rather than at the next scheduled check; the report shows the last known state
+        request_status_refresh()
         app_running = StatusCache.app_running
         is_logged_in = StatusCache.is_logged_in
         username = StatusCache.username
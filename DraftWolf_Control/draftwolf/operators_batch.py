@@ -0,0 +1,187 @@
+"""Batch operations on the versions selected in the panel, and retention cleanup."""
+
+import bpy
+
+from .constants import RETENTION_POLICY
+from .lazy import lazy_function
+from .state import RetentionState, SafeVersionList
+
+get_project_root = lazy_function(".path_utils", "get_project_root")
+get_file_history = lazy_function(".history", "get_file_history")
+notify_history_changed = lazy_function(".shared_status", "notify_history_changed")
+build_operations = lazy_function(".batch", "build_operations")
+submit_batch = lazy_function(".batch", "submit")
+RetentionPolicy = lazy_function(".retention", "RetentionPolicy")
+plan_retention = lazy_function(".retention", "plan")
+prune_versions = lazy_function(".retention", "prune")
+
+BATCH_ACTIONS = [
+    ('RELABEL', "Relabel", "Rename the selected versions with a pattern"),
+    ('TAG', "Tag", "Add a tag to the selected versions"),
+    ('DELETE', "Delete", "Delete the selected versions"),
+    ('EXPORT', "Export", "Copy the selected versions' files to a folder"),
+]
+BATCH_DONE = {'RELABEL': "relabeled", 'TAG': "tagged", 'DELETE': "deleted", 'EXPORT': "exported"}
+
+
+def selected_versions(filepath):
+    """The file's versions that are selected, in selection order."""
+    selected = SafeVersionList.selected
+    if not selected:
+        return []
+    history = get_file_history(filepath, block=False) or []
+    versions = [v for v in history if v.get('id') in selected]
+    versions.sort(key=lambda v: selected[v.get('id')])
+    return versions
+
+
+class object_ot_df_batch_versions(bpy.types.Operator):
+    """Relabel, tag, delete or export all selected versions in one request"""
+    bl_idname = "draftwolf.batch_versions"
+    bl_label = "Batch Edit Versions"
+    bl_options = {'REGISTER'}
+
+    action: bpy.props.EnumProperty(name="Action", items=BATCH_ACTIONS, default='RELABEL')
+    pattern: bpy.props.StringProperty(
+        name="Label", default="{label}",
+        description="New label; fields: {label} {n} (version number) {i} (position in selection) {date} {id}")
+    find: bpy.props.StringProperty(name="Find", default="", description="Regular expression replaced in each label first")
+    replace: bpy.props.StringProperty(name="Replace", default="")
+    tag: bpy.props.StringProperty(name="Tag", default="")
+    destination: bpy.props.StringProperty(name="Folder", default="", subtype='DIR_PATH')
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "action")
+        if self.action == 'RELABEL':
+            layout.prop(self, "find")
+            layout.prop(self, "replace")
+            layout.prop(self, "pattern")
+        elif self.action == 'TAG':
+            layout.prop(self, "tag")
+        elif self.action == 'EXPORT':
+            layout.prop(self, "destination")
+        elif self.action == 'DELETE':
+            layout.label(text=f"Delete {len(SafeVersionList.selected)} version(s)? This can't be undone.", icon='ERROR')
+
+    def execute(self, context):
+        filepath = bpy.data.filepath
+        root = get_project_root(filepath)
+        if not root:
+            return {'CANCELLED'}
+        versions = selected_versions(filepath)
+        if not versions:
+            self.report({'WARNING'}, "No versions selected")
+            return {'CANCELLED'}
+        try:
+            operations = build_operations(self.action, versions, pattern=self.pattern, find=self.find,
+                                          replace=self.replace, tag=self.tag,
+                                          destination=bpy.path.abspath(self.destination) if self.destination else "")
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        if not operations:
+            self.report({'INFO'}, "Nothing to change")
+            return {'FINISHED'}
+
+        succeeded, failed, error = submit_batch(root, filepath, operations)
+        if error:
+            self.report({'ERROR'}, f"Batch failed: {error}")
+            return {'CANCELLED'}
+        if self.action in ('RELABEL', 'TAG', 'DELETE') and succeeded:
+            SafeVersionList.full_history = get_file_history(filepath, block=False) or []
+            notify_history_changed(root)
+        if self.action == 'DELETE':
+            for op in succeeded:
+                SafeVersionList.selected.pop(op['versionId'], None)
+        if failed:
+            op, err = failed[0]
+            self.report({'WARNING'}, f"✓ {len(succeeded)} done, {len(failed)} failed "
+                                     f"(first: {op['versionId']}: {err})")
+        else:
+            self.report({'INFO'}, f"✓ {len(succeeded)} version(s) {BATCH_DONE[self.action]}")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if not SafeVersionList.selected:
+            self.report({'WARNING'}, "No versions selected")
+            return {'CANCELLED'}
+        return context.window_manager.invoke_props_dialog(self)
+
+
+class object_ot_df_plan_retention(bpy.types.Operator):
+    """Preview which old versions a retention policy would prune (nothing is deleted yet)"""
+    bl_idname = "draftwolf.plan_retention"
+    bl_label = "Plan Version Cleanup"
+
+    keep_all_hours: bpy.props.IntProperty(name="Keep All (hours)", default=RETENTION_POLICY['keep_all_hours'], min=0)
+    hourly_days: bpy.props.IntProperty(name="Hourly For (days)", default=RETENTION_POLICY['hourly_days'], min=0)
+    daily_days: bpy.props.IntProperty(name="Daily For (days)", default=RETENTION_POLICY['daily_days'], min=0)
+    weekly_weeks: bpy.props.IntProperty(name="Weekly For (weeks)", default=RETENTION_POLICY['weekly_weeks'], min=0)
+    keep_labeled: bpy.props.BoolProperty(name="Keep Labeled", default=RETENTION_POLICY['keep_labeled'],
+                                         description="Always keep versions whose label isn't the default")
+    dismiss: bpy.props.BoolProperty(options={'HIDDEN', 'SKIP_SAVE'})
+
+    def execute(self, context):
+        if self.dismiss:
+            RetentionState.plan = RetentionState.history = RetentionState.filepath = None
+            return {'FINISHED'}
+        filepath = bpy.data.filepath
+        history = get_file_history(filepath, block=False)
+        if not history:
+            self.report({'WARNING'}, "No version history loaded")
+            return {'CANCELLED'}
+        policy = RetentionPolicy(self.keep_all_hours, self.hourly_days, self.daily_days,
+                                 self.weekly_weeks, self.keep_labeled)
+        RetentionState.plan = plan_retention(history, policy)
+        RetentionState.history = history
+        RetentionState.filepath = filepath
+        self.report({'INFO'}, f"Cleanup would prune {len(RetentionState.plan.prune)} of {len(history)} versions")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if self.dismiss:
+            return self.execute(context)
+        return context.window_manager.invoke_props_dialog(self)
+
+
+class object_ot_df_apply_retention(bpy.types.Operator):
+    """Delete the versions the cleanup preview lists, in one request"""
+    bl_idname = "draftwolf.apply_retention"
+    bl_label = "Prune Old Versions"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        filepath = bpy.data.filepath
+        retention = RetentionState.plan
+        if retention is None or RetentionState.filepath != filepath:
+            self.report({'WARNING'}, "Plan a cleanup first")
+            return {'CANCELLED'}
+        root = get_project_root(filepath)
+        if not root:
+            return {'CANCELLED'}
+        history = get_file_history(filepath, block=False)
+        if history is not RetentionState.history and history:
+            # History changed since the preview (new commits, another session): plan again on the current list
+            retention = plan_retention(history, retention.policy)
+        if not retention.prune:
+            RetentionState.plan = None
+            self.report({'INFO'}, "Nothing to prune")
+            return {'FINISHED'}
+        succeeded, failed, error = prune_versions(root, filepath, retention)
+        if error:
+            self.report({'ERROR'}, f"Cleanup failed: {error}")
+            return {'CANCELLED'}
+        RetentionState.plan = RetentionState.history = RetentionState.filepath = None
+        SafeVersionList.full_history = get_file_history(filepath, block=False) or []
+        for op in succeeded:
+            SafeVersionList.selected.pop(op['versionId'], None)
+        notify_history_changed(root)
+        if failed:
+            self.report({'WARNING'}, f"✓ Pruned {len(succeeded)} versions, {len(failed)} failed")
+        else:
+            self.report({'INFO'}, f"✓ Pruned {len(succeeded)} versions")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_confirm(self, event)
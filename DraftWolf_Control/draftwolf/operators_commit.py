@@ -1,12 +1,31 @@
 """Commit / save version operators."""
 
+import time
+
 import bpy
 
-from .api import send_request
-from .constants import CANNOT_CONNECT_APP, UNKNOWN_ERROR
-from .path_utils import get_project_root
-from .history import load_version_history
-from .state import SafeVersionList
+from .constants import CANNOT_CONNECT_APP, COMMIT_SCOPES, UNKNOWN_ERROR
+from .lazy import lazy_function
+from .state import RenderState, SafeVersionList
+
+send_request = lazy_function(".api", "send_request")
+get_project_root = lazy_function(".path_utils", "get_project_root")
+notify_history_changed = lazy_function(".shared_status", "notify_history_changed")
+record_commit = lazy_function(".history", "record_commit")
+collect_datablocks = lazy_function(".partial", "collect_datablocks")
+write_partial = lazy_function(".partial", "write_partial")
+format_size = lazy_function(".partial", "format_size")
+digest_from = lazy_function(".integrity", "digest_from")
+manifest_digest = lazy_function(".integrity", "manifest_digest")
+verify_async = lazy_function(".integrity", "verify_async")
+still_job = lazy_function(".render", "still_job")
+submit_render = lazy_function(".render", "submit")
+
+
+def _verify_committed(path, res):
+    """Confirm in the background that the digest the app stored matches the committed file."""
+    expected = digest_from(res) or manifest_digest(res.get('version'), path)
+    verify_async(path, expected, 'commit', f"v{res.get('versionNumber', '?')}")
 
 
 class object_ot_df_commit(bpy.types.Operator):
@@ -16,6 +35,7 @@ class object_ot_df_commit(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     label_input: bpy.props.StringProperty(name="Label", default="New Version")
+    scope: bpy.props.EnumProperty(name="Scope", items=COMMIT_SCOPES, default='FULL')
 
     def execute(self, context):
         filepath = bpy.data.filepath
@@ -23,22 +43,75 @@ class object_ot_df_commit(bpy.types.Operator):
             self.report({'ERROR'}, "Please save your .blend file first (File > Save As)")
             return {'CANCELLED'}
 
+        if self.scope != 'FULL':
+            return self._commit_partial(context, filepath)
+
+        write_start = time.perf_counter()
         bpy.ops.wm.save_mainfile()
+        write_time = time.perf_counter() - write_start
 
         root = get_project_root(filepath)
         if not root:
             self.report({'ERROR'}, "Version control not enabled. Click 'Enable Version Control' first.")
             return {'CANCELLED'}
 
+        commit_start = time.perf_counter()
         res = send_request('/draft/commit', {
             'projectRoot': root,
             'label': self.label_input,
             'files': [filepath]
         })
+        commit_time = time.perf_counter() - commit_start
 
         if res and res.get('success'):
-            self.report({'INFO'}, f"✓ Version saved successfully! (v{res.get('versionNumber', '?')})")
-            SafeVersionList.full_history = load_version_history(filepath)
+            self.report({'INFO'}, f"✓ Version saved successfully! (v{res.get('versionNumber', '?')}) - "
+                                  f"save {write_time:.2f}s + commit {commit_time:.2f}s")
+            SafeVersionList.full_history = record_commit(root, filepath, res, self.label_input)
+            notify_history_changed(root)
+            _verify_committed(filepath, res)
+        else:
+            err = res.get('error', UNKNOWN_ERROR) if res else CANNOT_CONNECT_APP
+            self.report({'ERROR'}, f"Failed to save: {err}")
+
+        return {'FINISHED'}
+
+    def _commit_partial(self, context, filepath):
+        """Write only the scoped datablocks to a standalone .blend and version that, tied to filepath."""
+        root = get_project_root(filepath)
+        if not root:
+            self.report({'ERROR'}, "Version control not enabled. Click 'Enable Version Control' first.")
+            return {'CANCELLED'}
+
+        datablocks, description = collect_datablocks(context, self.scope)
+        if not datablocks:
+            self.report({'ERROR'}, "Nothing to version: select objects or an active collection first")
+            return {'CANCELLED'}
+
+        try:
+            partial_path, write_time, size = write_partial(filepath, self.scope, datablocks)
+        except (OSError, RuntimeError) as e:
+            self.report({'ERROR'}, f"Failed to write partial file: {e}")
+            return {'CANCELLED'}
+
+        commit_start = time.perf_counter()
+        res = send_request('/draft/commit', {
+            'projectRoot': root,
+            'label': self.label_input,
+            'files': [partial_path],
+            'partial': {
+                'parent': filepath,
+                'scope': self.scope,
+                'datablocks': sorted(getattr(d, 'name', str(d)) for d in datablocks),
+            },
+        })
+        commit_time = time.perf_counter() - commit_start
+
+        if res and res.get('success'):
+            self.report({'INFO'}, f"✓ Partial version saved (v{res.get('versionNumber', '?')}): {description}, "
+                                  f"{format_size(size)} - write {write_time:.2f}s + commit {commit_time:.2f}s")
+            record_commit(root, partial_path, res, self.label_input)
+            notify_history_changed(root)
+            _verify_committed(partial_path, res)
         else:
             err = res.get('error', UNKNOWN_ERROR) if res else CANNOT_CONNECT_APP
             self.report({'ERROR'}, f"Failed to save: {err}")
@@ -76,7 +149,9 @@ class object_ot_df_commit_last_saved(bpy.types.Operator):
 
         if res and res.get('success'):
             self.report({'INFO'}, f"✓ Last saved state versioned! (v{res.get('versionNumber', '?')})")
-            SafeVersionList.full_history = load_version_history(filepath)
+            SafeVersionList.full_history = record_commit(root, filepath, res, self.label_input)
+            notify_history_changed(root)
+            _verify_committed(filepath, res)
         else:
             err = res.get('error', UNKNOWN_ERROR) if res else CANNOT_CONNECT_APP
             self.report({'ERROR'}, f"Failed to save: {err}")
@@ -85,3 +160,30 @@ class object_ot_df_commit_last_saved(bpy.types.Operator):
 
     def invoke(self, context, event):
         return context.window_manager.invoke_props_dialog(self)
+
+
+class object_ot_df_version_last_render(bpy.types.Operator):
+    """Version the frames of the last render (or a still's Render Result), attached to this file's latest version"""
+    bl_idname = "draftwolf.version_last_render"
+    bl_label = "Version Last Render"
+
+    def execute(self, context):
+        filepath = bpy.data.filepath
+        if not filepath:
+            self.report({'ERROR'}, "Please save your .blend file first")
+            return {'CANCELLED'}
+        if not get_project_root(filepath):
+            self.report({'ERROR'}, "Version control not enabled for this project")
+            return {'CANCELLED'}
+        job = RenderState.last
+        if job is None or not job.frames or job.filepath != filepath:
+            # A still render writes no files; version its Render Result
+            job = still_job(context.scene)
+            if job is None:
+                self.report({'WARNING'}, "Nothing rendered yet")
+                return {'CANCELLED'}
+            RenderState.last = job
+        submit_render(job)
+        frames = "1 frame" if len(job.frames) == 1 else f"{len(job.frames)} frames"
+        self.report({'INFO'}, f"Versioning {frames} in the background...")
+        return {'FINISHED'}
@@ -0,0 +1,70 @@
+"""Profiling operators (toggle, capture, export); find them with F3 search."""
+
+import bpy
+
+from .lazy import lazy_function
+from .state import ProfilingState
+
+enable_profiling = lazy_function(".profiling", "enable")
+disable_profiling = lazy_function(".profiling", "disable")
+reset_profiling = lazy_function(".profiling", "reset")
+format_stats = lazy_function(".profiling", "format_stats")
+export_trace = lazy_function(".profiling", "export_trace")
+start_capture = lazy_function(".profiling", "start_capture")
+stop_capture = lazy_function(".profiling", "stop_capture")
+
+
+class object_ot_df_toggle_profiling(bpy.types.Operator):
+    """Time DraftWolf panel sections and operators (no overhead while off)"""
+    bl_idname = "draftwolf.toggle_profiling"
+    bl_label = "DraftWolf: Toggle Profiling"
+
+    def execute(self, context):
+        if ProfilingState.enabled:
+            disable_profiling()
+            print(format_stats())
+            self.report({'INFO'}, "DraftWolf profiling off (summary printed to the console)")
+        else:
+            reset_profiling()
+            enable_profiling()
+            self.report({'INFO'}, "DraftWolf profiling on")
+        return {'FINISHED'}
+
+
+class object_ot_df_profile_capture(bpy.types.Operator):
+    """Record a cProfile (and optionally tracemalloc) snapshot of the next few seconds"""
+    bl_idname = "draftwolf.profile_capture"
+    bl_label = "DraftWolf: Capture Profile"
+
+    seconds: bpy.props.FloatProperty(name="Seconds", default=10.0, min=0.5, max=600.0)
+    memory: bpy.props.BoolProperty(name="Track Allocations", default=False,
+                                   description="Also record allocations with tracemalloc (slower)")
+
+    def execute(self, context):
+        if ProfilingState.capturing:
+            paths = stop_capture()
+            self.report({'INFO'}, f"Profile written: {paths[0]}" if paths else "No capture running")
+            return {'FINISHED'}
+        start_capture(self.seconds, memory=self.memory)
+        self.report({'INFO'}, f"Capturing profile for {self.seconds:.0f}s")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if ProfilingState.capturing:
+            return self.execute(context)
+        return context.window_manager.invoke_props_dialog(self)
+
+
+class object_ot_df_export_profile(bpy.types.Operator):
+    """Write the recorded timings as a Chrome trace (open in chrome://tracing or Perfetto) plus a summary"""
+    bl_idname = "draftwolf.export_profile"
+    bl_label = "DraftWolf: Export Profile Trace"
+
+    def execute(self, context):
+        try:
+            path = export_trace()
+        except OSError as e:
+            self.report({'ERROR'}, f"Export failed: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Trace written: {path}")
+        return {'FINISHED'}
@@ -4,16 +4,46 @@ import os
 
 import bpy
 
-from .constants import (
-    CONNECTION_ERROR,
-    UNKNOWN_ERROR,
-    VERSION_SUFFIX_PATTERN,
-    NUMBER_SUFFIX_PATTERN,
-)
-from .api import send_request
-from .path_utils import get_project_root, recover_original_filepath
-from .history import load_version_history
-from .state import SafeVersionList
+from .constants import CONNECTION_ERROR, SEARCH_DIALOG_LIMIT, SEARCH_HELP, UNKNOWN_ERROR
+from .lazy import lazy_function
+from .state import PullState, SafeVersionList
+
+send_request = lazy_function(".api", "send_request")
+get_project_root = lazy_function(".path_utils", "get_project_root")
+recover_original_filepath = lazy_function(".path_utils", "recover_original_filepath")
+notify_history_changed = lazy_function(".shared_status", "notify_history_changed")
+record_rename = lazy_function(".history", "record_rename")
+get_project_history = lazy_function(".history", "get_project_history")
+get_file_history = lazy_function(".history", "get_file_history")
+get_history_index = lazy_function(".history", "get_history_index")
+clean_target_basename = lazy_function(".history", "clean_target_basename")
+digest_from = lazy_function(".integrity", "digest_from")
+manifest_digest = lazy_function(".integrity", "manifest_digest")
+verify_async = lazy_function(".integrity", "verify_async")
+clear_failure = lazy_function(".integrity", "clear_failure")
+restore_version = lazy_function(".delta", "restore_version")
+take_snapshot = lazy_function(".snapshot", "take")
+undo_snapshot = lazy_function(".snapshot", "undo")
+latest_snapshot = lazy_function(".snapshot", "latest")
+start_pull = lazy_function(".pull", "start")
+clear_pull = lazy_function(".pull", "clear")
+match_names = lazy_function(".pull", "match_names")
+pull_datablocks = lazy_function(".pull", "pull")
+
+# Same as pull.CATEGORIES (kept here so registering doesn't import pull.py)
+PULL_CATEGORIES = [
+    ('objects', "Objects", ""),
+    ('collections', "Collections", ""),
+    ('materials', "Materials", ""),
+    ('node_groups', "Node Groups", ""),
+    ('meshes', "Meshes", ""),
+    ('worlds', "Worlds", ""),
+    ('images', "Images", ""),
+    ('actions', "Actions", ""),
+    ('cameras', "Cameras", ""),
+    ('lights', "Lights", ""),
+    ('texts', "Texts", ""),
+]
 
 
 def _is_same_open_file(filepath, req_filepath):
@@ -33,6 +63,16 @@ def _open_mainfile_safe(filepath, on_error=None):
             on_error(e)
 
 
+def _snapshot_before_restore(operator, req_filepath, version_id):
+    """Keep a safety snapshot of the file the restore will overwrite. False (and reported) if it failed."""
+    try:
+        take_snapshot(req_filepath, version_id)
+    except OSError as e:
+        operator.report({'ERROR'}, f"Restore cancelled: could not snapshot the current file: {e}")
+        return False
+    return True
+
+
 def _resolve_rel_path(root, filepath):
     """Resolve filepath relative to root; strip -retrieved suffix for matching. Returns None if outside root."""
     filename = os.path.basename(filepath)
@@ -59,44 +99,33 @@ def _resolve_rel_path(root, filepath):
         return None
 
 
-def _get_clean_target_basename(filepath):
-    """Return (target_file, target_lower) for matching history entries."""
-    target_file = os.path.basename(filepath)
-    name, ext = os.path.splitext(target_file)
-    clean_name = name
-    if ' retrieved version' in clean_name.lower():
-        idx = clean_name.lower().find(' retrieved version')
-        clean_name = clean_name[:idx]
-    elif '-retrieved' in clean_name:
-        clean_name = clean_name.replace('-retrieved', '')
-        clean_name = VERSION_SUFFIX_PATTERN.sub('', clean_name)
-        clean_name = NUMBER_SUFFIX_PATTERN.sub('', clean_name)
-    target_file = clean_name + ext
-    return target_file, target_file.lower()
-
-
-def _filter_history_by_basename(history, target_lower):
-    """Return versions that contain a file whose basename (lower) equals target_lower."""
-    result = []
-    for v in history:
-        files = v.get('files', {})
-        for f_path in files:
-            if os.path.basename(f_path).lower() == target_lower:
-                result.append(v)
-                break
-    return result
+def _verify_restored(filepath, version_id, res):
+    """Start checking the restored file against the version's digest; it runs while Blender reopens the file."""
+    version = next((v for v in get_file_history(filepath, block=False) or [] if v.get('id') == version_id), None)
+    expected = digest_from(res) or manifest_digest(version, filepath)
+    label = f"v{version.get('versionNumber', '?')}" if version else version_id
+    clear_failure(filepath)
+    verify_async(filepath, expected, 'restore', label)
 
 
-def _populate_version_dialog_items(history):
-    """Fill SafeVersionList.items from history for the version selector dialog."""
-    SafeVersionList.items = []
+def _version_dialog_items(history):
+    """Enum items (id, display name, label) for the version selector dialog."""
+    items = []
     for v in history:
         vid = v.get('id')
         vnum = v.get('versionNumber', '0')
         vlbl = v.get('label', 'Untitled')
         vtime = v.get('timestamp', '').split('T')[0]
         display_name = f"v{vnum}: {vlbl} ({vtime})"
-        SafeVersionList.items.append((vid, display_name, vlbl))
+        items.append((vid, display_name, vlbl))
+    return items
+
+
+def _populate_version_dialog_items(history):
+    """Fill SafeVersionList.items from history for the version selector dialog."""
+    SafeVersionList.items = _version_dialog_items(history)
+    SafeVersionList.dialog_index = None
+    SafeVersionList.dialog_items = ()
 
 
 class object_ot_df_retrieve(bpy.types.Operator):
@@ -106,8 +135,21 @@ class object_ot_df_retrieve(bpy.types.Operator):
     bl_options = {'REGISTER'}
 
     def get_items(self, context):
-        return SafeVersionList.items
-
+        query = self.search.strip()
+        if not query:
+            return SafeVersionList.items
+        index = SafeVersionList.dialog_index
+        if index is None:
+            # Built on the first keystroke, not when the dialog opens
+            index = SafeVersionList.dialog_index = get_history_index(bpy.data.filepath, block=False)
+        if index is None:
+            return SafeVersionList.items
+        if not SafeVersionList.dialog_items or SafeVersionList.dialog_items[0] != query:
+            items = _version_dialog_items(index.search(query, limit=SEARCH_DIALOG_LIMIT))
+            SafeVersionList.dialog_items = (query, items or [('', "No matching versions", "")])
+        return SafeVersionList.dialog_items[1]
+
+    search: bpy.props.StringProperty(name="Search", description=SEARCH_HELP, options={'TEXTEDIT_UPDATE', 'SKIP_SAVE'})
     version_enum: bpy.props.EnumProperty(items=get_items, name="Select Version")
 
     def execute(self, context):
@@ -120,17 +162,17 @@ class object_ot_df_retrieve(bpy.types.Operator):
             return {'CANCELLED'}
 
         req_filepath = recover_original_filepath(filepath)
+        if not _snapshot_before_restore(self, req_filepath, version_id):
+            return {'CANCELLED'}
         is_open_file = _is_same_open_file(filepath, req_filepath)
         if is_open_file:
             bpy.ops.wm.read_homefile(app_template="")
 
-        res = send_request('/draft/restore', {
-            'projectRoot': root,
-            'versionId': version_id
-        })
+        res = restore_version(root, req_filepath, version_id)
         success = res and res.get('success')
         if success:
             self.report({'INFO'}, f"Restored Version {version_id}")
+            _verify_restored(req_filepath, version_id, res)
             _open_mainfile_safe(req_filepath, on_error=lambda e: self.report({'ERROR'}, f"Restored but failed to open: {e}"))
         else:
             err = res.get('error', UNKNOWN_ERROR) if res else CONNECTION_ERROR
@@ -152,15 +194,15 @@ class object_ot_df_retrieve(bpy.types.Operator):
         if not rel_path:
             self.report({'ERROR'}, "Could not resolve file path relative to project.")
             return {'CANCELLED'}
-        history = send_request('/draft/history', {'projectRoot': root})
-        if history is None:
+        project_history = get_project_history(root)
+        if project_history is None:
             self.report({'ERROR'}, "Could not connect to DraftWolf App.")
             return {'CANCELLED'}
-        if not history:
+        if not project_history:
             self.report({'WARNING'}, "No version history found.")
             return {'CANCELLED'}
-        target_file, target_lower = _get_clean_target_basename(filepath)
-        history = _filter_history_by_basename(history, target_lower)
+        target_file, _ = clean_target_basename(filepath)
+        history = get_file_history(filepath) or []
         if not history:
             self.report({'WARNING'}, f"No versions found for '{target_file}'")
             return {'CANCELLED'}
@@ -184,16 +226,16 @@ class object_ot_df_restore_quick(bpy.types.Operator):
         if not root:
             return {'CANCELLED'}
         req_filepath = recover_original_filepath(filepath)
+        if not _snapshot_before_restore(self, req_filepath, self.version_id):
+            return {'CANCELLED'}
         is_open_file = _is_same_open_file(filepath, req_filepath)
         if is_open_file:
             bpy.ops.wm.read_homefile(app_template="")
-        res = send_request('/draft/restore', {
-            'projectRoot': root,
-            'versionId': self.version_id
-        })
+        res = restore_version(root, req_filepath, self.version_id)
         success = res and res.get('success')
         if success:
             self.report({'INFO'}, "✓ Version restored successfully")
+            _verify_restored(req_filepath, self.version_id, res)
             _open_mainfile_safe(req_filepath, on_error=lambda e: self.report({'ERROR'}, f"Restored but failed to open: {e}"))
         else:
             err = res.get('error', UNKNOWN_ERROR) if res else CONNECTION_ERROR
@@ -203,6 +245,45 @@ class object_ot_df_restore_quick(bpy.types.Operator):
         return {'FINISHED'}
 
 
+class object_ot_df_undo_restore(bpy.types.Operator):
+    """Put back the file as it was before the last restore (the restored file is kept as a snapshot)"""
+    bl_idname = "draftwolf.undo_restore"
+    bl_label = "Undo Last Restore"
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        filepath = bpy.data.filepath
+        return bool(filepath) and latest_snapshot(recover_original_filepath(filepath)) is not None
+
+    def execute(self, context):
+        filepath = bpy.data.filepath
+        if not filepath:
+            return {'CANCELLED'}
+        req_filepath = recover_original_filepath(filepath)
+        # Checked before the open session is thrown away
+        if latest_snapshot(req_filepath) is None:
+            self.report({'WARNING'}, "No snapshot to undo to")
+            return {'CANCELLED'}
+        is_open_file = _is_same_open_file(filepath, req_filepath)
+        if is_open_file:
+            bpy.ops.wm.read_homefile(app_template="")
+        try:
+            undo_snapshot(req_filepath)
+        except OSError as e:
+            self.report({'ERROR'}, f"Undo failed: {e}")
+            if is_open_file:
+                _open_mainfile_safe(req_filepath)
+            return {'CANCELLED'}
+        clear_failure(req_filepath)
+        self.report({'INFO'}, "✓ Restore undone")
+        _open_mainfile_safe(req_filepath, on_error=lambda e: self.report({'ERROR'}, f"Undone but failed to open: {e}"))
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_confirm(self, event)
+
+
 class object_ot_df_rename_version(bpy.types.Operator):
     """Rename a version's label"""
     bl_idname = "draftwolf.rename_version"
@@ -229,7 +310,8 @@ class object_ot_df_rename_version(bpy.types.Operator):
 
         if res and res.get('success'):
             self.report({'INFO'}, "✓ Version renamed successfully")
-            SafeVersionList.full_history = load_version_history(filepath)
+            SafeVersionList.full_history = record_rename(root, filepath, self.version_id, self.new_label.strip())
+            notify_history_changed(root)
         else:
             err = res.get('error', UNKNOWN_ERROR) if res else CONNECTION_ERROR
             self.report({'ERROR'}, f"Rename failed: {err}")
@@ -237,9 +319,87 @@ class object_ot_df_rename_version(bpy.types.Operator):
         return {'FINISHED'}
 
     def invoke(self, context, event):
-        history = SafeVersionList.full_history or []
+        history = get_file_history(bpy.data.filepath, block=False) or []
         for v in history:
             if v.get('id') == self.version_id:
                 self.new_label = v.get('label', 'Untitled')
                 break
         return context.window_manager.invoke_props_dialog(self)
+
+
+class object_ot_df_pull_from_version(bpy.types.Operator):
+    """Fetch this version's file and list its datablocks, to pull some into the open file without restoring it"""
+    bl_idname = "draftwolf.pull_from_version"
+    bl_label = "Pull From Version"
+
+    version_id: bpy.props.StringProperty(options={'HIDDEN'})
+    dismiss: bpy.props.BoolProperty(options={'HIDDEN', 'SKIP_SAVE'})
+
+    def execute(self, context):
+        if self.dismiss:
+            clear_pull()
+            return {'FINISHED'}
+        filepath = bpy.data.filepath
+        root = get_project_root(filepath)
+        if not root:
+            return {'CANCELLED'}
+        version = next((v for v in get_file_history(filepath, block=False) or [] if v.get('id') == self.version_id), None)
+        if version is None:
+            self.report({'WARNING'}, "Version not found in the loaded history")
+            return {'CANCELLED'}
+        start_pull(root, filepath, version)
+        self.report({'INFO'}, f"Fetching v{version.get('versionNumber', '?')}...")
+        return {'FINISHED'}
+
+
+class object_ot_df_pull_datablocks(bpy.types.Operator):
+    """Append or link datablocks from the fetched version into the open file"""
+    bl_idname = "draftwolf.pull_datablocks"
+    bl_label = "Pull Datablocks"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    category: bpy.props.EnumProperty(name="Type", items=PULL_CATEGORIES, default='objects')
+    names: bpy.props.StringProperty(
+        name="Names", default="*",
+        description="Comma-separated datablock names; * and ? match any characters")
+    link: bpy.props.BoolProperty(name="Link", default=False,
+                                 description="Link from the cached version file instead of appending a copy")
+    replace: bpy.props.BoolProperty(name="Replace Existing", default=False,
+                                    description="Make users of same-named datablocks use the pulled ones")
+
+    def _matches(self):
+        return match_names((PullState.listing or {}).get(self.category, ()), self.names)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "category")
+        layout.prop(self, "names")
+        layout.prop(self, "link")
+        layout.prop(self, "replace")
+        matches = self._matches()
+        preview = ", ".join(matches[:5]) + (f" + {len(matches) - 5} more" if len(matches) > 5 else "")
+        layout.label(text=f"{len(matches)} match: {preview}" if matches else "No matches", icon='VIEWZOOM')
+
+    def execute(self, context):
+        if PullState.path is None or PullState.filepath != bpy.data.filepath:
+            self.report({'WARNING'}, "Choose a version to pull from first")
+            return {'CANCELLED'}
+        names = self._matches()
+        if not names:
+            self.report({'WARNING'}, "No datablocks match")
+            return {'CANCELLED'}
+        try:
+            loaded = pull_datablocks(PullState.path, self.category, names, link=self.link,
+                                     replace=self.replace, scene=context.scene)
+        except (OSError, RuntimeError) as e:
+            self.report({'ERROR'}, f"Pull failed: {e}")
+            return {'CANCELLED'}
+        action = "Linked" if self.link else "Appended"
+        self.report({'INFO'}, f"✓ {action} {len(loaded)} {self.category.replace('_', ' ')} from {PullState.version_label}")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if PullState.listing is None:
+            self.report({'WARNING'}, "Choose a version to pull from first")
+            return {'CANCELLED'}
+        return context.window_manager.invoke_props_dialog(self)
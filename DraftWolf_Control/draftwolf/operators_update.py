@@ -7,11 +7,11 @@ import subprocess
 import bpy
 
 from .constants import CURRENT_VERSION
+from .lazy import lazy_function
 from .state import UpdateState
-from .update import (
-    check_for_updates,
-    version_tuple_to_string,
-)
+
+check_for_updates = lazy_function(".update", "check_for_updates")
+version_tuple_to_string = lazy_function(".update", "version_tuple_to_string")
 
 
 class object_ot_df_check_for_updates(bpy.types.Operator):
@@ -21,24 +21,15 @@ class object_ot_df_check_for_updates(bpy.types.Operator):
     bl_options = {"REGISTER"}
 
     def execute(self, context):
-        check_for_updates()
         if UpdateState.checking:
+            self.report({"INFO"}, "Already checking for updates...")
             return {"FINISHED"}
-        if UpdateState.error_message:
-            self.report(
-                {"WARNING"},
-                f"Could not check: {UpdateState.error_message[:60]}..."
-            )
-            return {"CANCELLED"}
-        if UpdateState.update_available:
-            self.report(
-                {"INFO"},
-                f"Update available: v{version_tuple_to_string(UpdateState.latest_version)}"
-            )
-        else:
+        # Runs in the background; the result shows in the panel when it arrives
+        check_for_updates(force=True)
+        if UpdateState.checking:
             self.report(
                 {"INFO"},
-                f"You have the latest version (v{version_tuple_to_string(CURRENT_VERSION)})"
+                f"Checking for updates (current v{version_tuple_to_string(CURRENT_VERSION)})..."
             )
         return {"FINISHED"}
 
@@ -1,9 +1,12 @@
-"""Version list UI operators (toggle, refresh)."""
+"""Version list UI operators (toggle, refresh, selection)."""
 
 import bpy
 
-from .history import load_version_history
-from .state import SafeVersionList
+from .lazy import lazy_function
+from .state import HistoryStore, SafeVersionList
+
+load_version_history = lazy_function(".history", "load_version_history")
+get_history_index = lazy_function(".history", "get_history_index")
 
 
 class object_ot_df_toggle_versions(bpy.types.Operator):
@@ -27,6 +30,57 @@ class object_ot_df_refresh_versions(bpy.types.Operator):
             self.report({'WARNING'}, "Save file first")
             return {'CANCELLED'}
 
-        SafeVersionList.full_history = load_version_history(filepath)
+        SafeVersionList.full_history = load_version_history(filepath, refresh=True)
+        HistoryStore.reverted = None
         self.report({'INFO'}, f"✓ Refreshed! Found {len(SafeVersionList.full_history)} versions")
         return {'FINISHED'}
+
+
+class object_ot_df_select_version(bpy.types.Operator):
+    """Select or deselect this version for batch operations"""
+    bl_idname = "draftwolf.select_version"
+    bl_label = "Select Version"
+
+    version_id: bpy.props.StringProperty(options={'HIDDEN'})
+
+    def execute(self, context):
+        selected = SafeVersionList.selected
+        if self.version_id in selected:
+            del selected[self.version_id]
+        elif self.version_id:
+            selected[self.version_id] = len(selected)
+        return {'FINISHED'}
+
+
+class object_ot_df_select_versions(bpy.types.Operator):
+    """Select all versions matching the search (or all versions), none, or invert the selection"""
+    bl_idname = "draftwolf.select_versions"
+    bl_label = "Select Versions"
+
+    action: bpy.props.EnumProperty(items=[
+        ('ALL', "All", "Select every version matching the search"),
+        ('NONE', "None", "Clear the selection"),
+        ('INVERT', "Invert", "Invert the selection among versions matching the search"),
+    ], default='ALL')
+
+    def execute(self, context):
+        if self.action == 'NONE':
+            SafeVersionList.selected = {}
+            return {'FINISHED'}
+        query = context.window_manager.draftwolf_search.strip()
+        if query:
+            index = get_history_index(bpy.data.filepath, block=False)
+            versions = index.search(query) if index else []
+        else:
+            versions = SafeVersionList.full_history or []
+        ids = [v.get('id') for v in versions]
+        selected = SafeVersionList.selected
+        if self.action == 'ALL':
+            for vid in ids:
+                selected.setdefault(vid, len(selected))
+        else:
+            matching = set(ids)
+            kept = [vid for vid in selected if vid not in matching]
+            added = [vid for vid in ids if vid not in selected]
+            SafeVersionList.selected = {vid: i for i, vid in enumerate(kept + added)}
+        return {'FINISHED'}
@@ -4,20 +4,43 @@ import time
 
 import bpy
 
-from .path_utils import get_project_root
-from .state import SafeVersionList, StatusCache, UpdateState, check_app_status, check_login_status
-from .app_detection import is_app_installed
-from .history import load_version_history
-from .update import version_tuple_to_string
-from .constants import CURRENT_VERSION
+from .state import (
+    HandlerState,
+    HistoryStore,
+    IntegrityState,
+    PullState,
+    RenderState,
+    RetentionState,
+    SafeVersionList,
+    SnapshotState,
+    StatusCache,
+    UpdateState,
+    check_app_status,
+    check_login_status,
+    ensure_background_started,
+)
+from .lazy import lazy_function
+from .constants import CURRENT_VERSION, PANEL_VERSION_LIMIT, RETENTION_PREVIEW_LIMIT
+
+get_project_root = lazy_function(".path_utils", "get_project_root")
+is_app_installed = lazy_function(".app_detection", "is_app_installed")
+get_file_history = lazy_function(".history", "get_file_history")
+get_history_index = lazy_function(".history", "get_history_index")
+version_tuple_to_string = lazy_function(".update", "version_tuple_to_string")
+call_on_main_thread = lazy_function(".scheduler", "call_on_main_thread")
 
 
 def _get_cached_status():
-    """Return (current_time, filepath, is_saved, is_initialized)."""
+    """
+    Return (current_time, filepath, is_saved, is_initialized). Re-resolved every 0.5 s, or only
+    when invalidated (file loaded or saved elsewhere, project enabled or appearing in the app's
+    history revisions) while handlers are registered and the app reports revisions.
+    """
     current_time = time.time()
     filepath = bpy.data.filepath
-    if (current_time - StatusCache.last_draw_time < 0.5 and
-            StatusCache.cached_filepath == filepath):
+    event_driven = HandlerState.registered and StatusCache.history_events
+    if (StatusCache.last_draw_time and StatusCache.cached_filepath == filepath and
+            (event_driven or current_time - StatusCache.last_draw_time < 0.5)):
         return current_time, filepath, StatusCache.cached_is_saved, StatusCache.cached_is_initialized
     is_saved = bool(filepath)
     is_initialized = bool(get_project_root(filepath)) if is_saved else False
@@ -29,7 +52,11 @@ def _get_cached_status():
 
 
 def _draw_update_notice(layout):
-    """Draw update-available box if applicable."""
+    """Draw update-available box if applicable, and the progress/outcome of a running check."""
+    if UpdateState.checking:
+        layout.label(text="Checking for updates...", icon="SORTTIME")
+    elif UpdateState.error_message:
+        layout.label(text=f"Update check failed: {UpdateState.error_message[:40]}", icon="ERROR")
     if not (UpdateState.update_available and UpdateState.latest_version):
         return
     update_box = layout.box()
@@ -44,6 +71,33 @@ def _draw_update_notice(layout):
     row.operator("draftwolf.check_for_updates", text="", icon="FILE_REFRESH")
 
 
+def _draw_integrity_warning(layout, filepath):
+    """Warn when the open file didn't match its version's digest after a restore or commit."""
+    failures = [r for r in IntegrityState.failures if r['path'] == filepath]
+    if not failures:
+        return
+    result = failures[-1]
+    box = layout.box()
+    row = box.row()
+    row.alert = True
+    action = "Restored" if result['kind'] == 'restore' else "Committed"
+    row.label(text=f"{action} {result['version']} failed its integrity check", icon="ERROR")
+    box.label(text="The file on disk doesn't match the version; restore it again" if result['kind'] == 'restore'
+              else "The stored version may be damaged; save a new version")
+
+
+def _draw_reverted_changes(box, filepath):
+    """Tell the user which local changes the app didn't apply (the history shows the app's copy again)."""
+    reverted = HistoryStore.reverted
+    if reverted is None or reverted['root'] != get_project_root(filepath):
+        return
+    row = box.row()
+    row.alert = True
+    row.label(text="Some changes were reverted to the app's history", icon="ERROR")
+    for problem in reverted['problems']:
+        box.label(text=problem)
+
+
 def _draw_login_status(layout, app_running, is_logged_in, username):
     """Draw logged-in status box when app is running and user is logged in."""
     if not (app_running and is_logged_in):
@@ -84,17 +138,105 @@ def _draw_versions_commit_row(box):
         row = box.row(align=True)
         row.scale_y = 1.3
         row.operator("draftwolf.commit", text="Save Version", icon="EXPORT")
+    _draw_render_row(box)
+
+
+def _draw_undo_restore_row(box, filepath):
+    """Offer to undo the last restore of the open file (from its safety snapshot)."""
+    record = SnapshotState.last
+    if not record or record['path'] != filepath:
+        return
+    row = box.row(align=True)
+    label = "Undo Undo" if record.get('undo') else "Undo Last Restore"
+    row.operator("draftwolf.undo_restore", text=label, icon="LOOP_BACK")
+
+
+def _draw_render_row(box):
+    """Version Last Render, the scene's auto-version toggle and the last render commit's outcome."""
+    row = box.row(align=True)
+    row.operator("draftwolf.version_last_render", text="Version Last Render", icon="RENDER_RESULT")
+    row.prop(bpy.context.scene, "draftwolf_version_renders", text="", icon="RENDER_ANIMATION")
+    result = RenderState.last_result
+    if RenderState.pending:
+        box.label(text="Versioning render...", icon="SORTTIME")
+    elif result is not None:
+        if result.get('error'):
+            box.label(text=f"Render not versioned: {result['error']}", icon="ERROR")
+        else:
+            box.label(text=f"Render saved as v{result.get('versionNumber', '?')}: "
+                           f"{result['frames']} frames, {result['unique']} unique", icon="CHECKMARK")
 
 
-def _update_history_cache_if_needed(filepath, current_time):
-    """Update SafeVersionList cache when filepath changes or interval elapsed."""
+def _update_history_cache_if_needed(filepath):
+    """Point SafeVersionList at the shared history store; never blocks the draw on a fetch."""
     if filepath != SafeVersionList.current_filepath:
         SafeVersionList.current_filepath = filepath
         SafeVersionList.full_history = None
-    if (SafeVersionList.full_history is None and SafeVersionList.show_versions and
-            current_time - SafeVersionList.last_fetch_time > SafeVersionList.fetch_interval):
-        SafeVersionList.last_fetch_time = current_time
-        SafeVersionList.full_history = load_version_history(filepath)
+    if SafeVersionList.show_versions:
+        history = get_file_history(filepath, block=False)
+        if history is not None:
+            SafeVersionList.full_history = history
+
+
+def _tag_redraw():
+    """Main-thread callback: redraw 3D viewports so the panel picks up new history."""
+    wm = getattr(bpy.context, "window_manager", None)
+    for window in getattr(wm, "windows", ()):
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+def request_redraw(root=None):
+    """History listener; hands the redraw to the main thread since it may be called from the scheduler."""
+    call_on_main_thread(_tag_redraw)
+
+
+def _search_versions(query):
+    """Versions matching query (one more than the panel shows, to detect overflow); cached per query and history."""
+    key = SafeVersionList.search_key
+    if key is None or key[0] != query or key[1] is not SafeVersionList.full_history:
+        index = get_history_index(SafeVersionList.current_filepath, block=False)
+        SafeVersionList.search_results = index.search(query, limit=PANEL_VERSION_LIMIT + 1) if index else []
+        SafeVersionList.search_key = (query, SafeVersionList.full_history)
+    return SafeVersionList.search_results
+
+
+def _draw_retention_preview(box, plan):
+    """Dry-run result of the cleanup planner, with buttons to prune or dismiss."""
+    preview = box.box()
+    row = preview.row(align=True)
+    row.label(text=f"Cleanup: keep {len(plan.keep)}, prune {len(plan.prune)}", icon="SORTTIME")
+    row.operator("draftwolf.plan_retention", text="", icon="X").dismiss = True
+    for v in plan.prune[:RETENTION_PREVIEW_LIMIT]:
+        preview.label(text=f"{v.get('label', 'Untitled')} ({v.get('timestamp', '').split('T')[0]})", icon="REMOVE")
+    if len(plan.prune) > RETENTION_PREVIEW_LIMIT:
+        preview.label(text=f"+ {len(plan.prune) - RETENTION_PREVIEW_LIMIT} more")
+    if plan.prune:
+        row = preview.row()
+        row.alert = True
+        row.operator("draftwolf.apply_retention", text=f"Prune {len(plan.prune)} Versions", icon="TRASH")
+
+
+def _draw_pull_preview(box):
+    """Datablocks of the version chosen to pull from, with a button per type."""
+    preview = box.box()
+    row = preview.row(align=True)
+    row.label(text=f"Pull from {PullState.version_label}", icon="IMPORT")
+    row.operator("draftwolf.pull_from_version", text="", icon="X").dismiss = True
+    if PullState.pending:
+        preview.label(text="Fetching version...", icon="SORTTIME")
+        return
+    if PullState.error:
+        preview.label(text=PullState.error, icon="ERROR")
+        return
+    if not PullState.listing:
+        preview.label(text="No datablocks in this version", icon="INFO")
+        return
+    for category, names in PullState.listing.items():
+        row = preview.row(align=True)
+        row.label(text=f"{category.replace('_', ' ').title()} ({len(names)})")
+        row.operator("draftwolf.pull_datablocks", text="Pull...").category = category
 
 
 def _draw_versions_history_ui(box):
@@ -106,24 +248,50 @@ def _draw_versions_history_ui(box):
                  text=f"Version History ({count} saved)",
                  icon=icon, emboss=False)
     row.operator("draftwolf.refresh_versions", text="", icon="FILE_REFRESH")
+    row.operator("draftwolf.plan_retention", text="", icon="SORTTIME")
+    if RetentionState.plan is not None and RetentionState.filepath == SafeVersionList.current_filepath:
+        _draw_retention_preview(box, RetentionState.plan)
+    if PullState.filepath is not None and PullState.filepath == SafeVersionList.current_filepath:
+        _draw_pull_preview(box)
     if not (SafeVersionList.show_versions and SafeVersionList.full_history):
         return
     version_box = box.box()
-    for v in SafeVersionList.full_history[:10]:
+    wm = bpy.context.window_manager
+    row = version_box.row(align=True)
+    row.prop(wm, "draftwolf_search", text="", icon='VIEWZOOM')
+    row.operator("draftwolf.select_versions", text="", icon="CHECKBOX_HLT").action = 'ALL'
+    selected = SafeVersionList.selected
+    if selected:
+        row = version_box.row(align=True)
+        row.label(text=f"{len(selected)} selected")
+        row.operator("draftwolf.batch_versions", text="Batch...", icon="MODIFIER")
+        row.operator("draftwolf.select_versions", text="", icon="X").action = 'NONE'
+    query = wm.draftwolf_search.strip()
+    versions = _search_versions(query) if query else SafeVersionList.full_history
+    if query and not versions:
+        version_box.label(text="No matching versions", icon='INFO')
+    for v in versions[:PANEL_VERSION_LIMIT]:
         vid = v.get('id')
         vlbl = v.get('label', 'Untitled')
         vtime = v.get('timestamp', '').split('T')[0]
+        tags = v.get('tags')
         row = version_box.row(align=True)
-        row.label(text=f"{vlbl} ({vtime})", icon='FILE')
+        row.operator("draftwolf.select_version", text="", emboss=False,
+                     icon='CHECKBOX_HLT' if vid in selected else 'CHECKBOX_DEHLT').version_id = vid
+        row.label(text=f"{vlbl} ({vtime})" + (f" [{', '.join(tags)}]" if tags else ""), icon='FILE')
         rename_op = row.operator("draftwolf.rename_version", text="", icon="GREASEPENCIL")
         rename_op.version_id = vid
+        row.operator("draftwolf.pull_from_version", text="", icon="IMPORT").version_id = vid
         restore_op = row.operator("draftwolf.restore_quick", text="", icon="LOOP_BACK")
         restore_op.version_id = vid
-    if len(SafeVersionList.full_history) > 10:
-        version_box.label(text=f"+ {len(SafeVersionList.full_history) - 10} more versions")
+    if query:
+        if len(versions) > PANEL_VERSION_LIMIT:
+            version_box.label(text="+ more matches (refine the search)")
+    elif len(versions) > PANEL_VERSION_LIMIT:
+        version_box.label(text=f"+ {len(versions) - PANEL_VERSION_LIMIT} more versions")
 
 
-def _draw_manage_versions(layout, is_initialized, filepath, current_time):
+def _draw_manage_versions(layout, is_initialized, filepath):
     """Draw Step ② Manage Versions box."""
     box = layout.box()
     box.label(text="② Manage Versions", icon='FILE_FOLDER')
@@ -132,7 +300,9 @@ def _draw_manage_versions(layout, is_initialized, filepath, current_time):
         box.label(text="Complete Step ① first", icon='INFO')
         return
     _draw_versions_commit_row(box)
-    _update_history_cache_if_needed(filepath, current_time)
+    _draw_undo_restore_row(box, filepath)
+    _draw_reverted_changes(box, filepath)
+    _update_history_cache_if_needed(filepath)
     _draw_versions_history_ui(box)
 
 
@@ -180,12 +350,14 @@ class df_pt_main_panel(bpy.types.Panel):
         layout = self.layout
         layout.use_property_split = True
         layout.use_property_decorate = False
-        current_time, filepath, is_saved, is_initialized = _get_cached_status()
+        ensure_background_started()
+        _, filepath, is_saved, is_initialized = _get_cached_status()
         app_running = check_app_status()
         is_logged_in, username = check_login_status()
 
         _draw_update_notice(layout)
+        _draw_integrity_warning(layout, filepath)
         _draw_login_status(layout, app_running, is_logged_in, username)
         _draw_getting_started(layout, is_saved, is_initialized)
-        _draw_manage_versions(layout, is_initialized, filepath, current_time)
+        _draw_manage_versions(layout, is_initialized, filepath)
         _draw_app_section(layout, app_running, is_logged_in)
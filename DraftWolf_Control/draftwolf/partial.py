@@ -0,0 +1,60 @@
+"""
+Partial commits: version only the selected objects or the active collection.
+
+The chosen datablocks are written to a small standalone .blend with
+bpy.data.libraries.write, which also writes everything they depend on (meshes,
+materials, images, ...). That file is committed instead of the full scene, with
+the parent file and scope sent along so the app can tie the snapshot to it.
+"""
+
+import os
+import time
+
+import bpy
+
+from .constants import PARTIAL_DIR_NAME
+
+
+def collect_datablocks(context, scope):
+    """Return (datablocks, description) for scope; datablocks is empty if there is nothing to write."""
+    if scope == 'SELECTED':
+        objects = set(getattr(context, 'selected_objects', None) or [])
+        return objects, f"{len(objects)} object(s)"
+    if scope == 'COLLECTION':
+        collection = getattr(context, 'collection', None)
+        if collection is None:
+            return set(), "no collection"
+        scene = getattr(context, 'scene', None)
+        if scene is not None and collection == getattr(scene, 'collection', None):
+            # The scene's master collection isn't a datablock of its own; write its objects
+            objects = set(collection.all_objects)
+            return objects, f"{len(objects)} object(s) in scene collection"
+        return {collection}, f"collection '{collection.name}'"
+    return set(), ""
+
+
+def partial_filepath(filepath, scope):
+    """Where the partial .blend for filepath is written (next to it, in a hidden folder)."""
+    folder = os.path.join(os.path.dirname(filepath), PARTIAL_DIR_NAME)
+    stem = os.path.splitext(os.path.basename(filepath))[0]
+    return os.path.join(folder, f"{stem}.{scope.lower()}.blend")
+
+
+def write_partial(filepath, scope, datablocks):
+    """Write datablocks (and their dependencies) for filepath's partial commit. Returns (path, seconds, bytes)."""
+    path = partial_filepath(filepath, scope)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    start = time.perf_counter()
+    # fake_user keeps the blocks in the file when nothing in it links them;
+    # RELATIVE_ALL rewrites texture/library paths for the file's new location
+    bpy.data.libraries.write(path, set(datablocks), path_remap='RELATIVE_ALL', fake_user=True, compress=False)
+    elapsed = time.perf_counter() - start
+    return path, elapsed, os.path.getsize(path)
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024.0
+    return f"{size:.1f} GB"
@@ -4,7 +4,26 @@ import os
 import time
 
 from .api import send_request
-from .state import RootCache
+from .constants import SHARED_STATUS_ENABLED
+from .shared_status import lookup_shared_root, publish_shared_root
+from .state import RootCache, StatusCache
+
+
+def user_cache_dir(name):
+    """
+    Private per-user folder for files DraftWolf caches locally (Blender's user data dir, else
+    the per-user runtime dir), created on demand. Unlike the shared temp dir, other local
+    users can't plant files in it.
+    """
+    try:
+        import bpy
+        base = bpy.utils.user_resource('DATAFILES', path="draftwolf", create=True)
+    except (ImportError, AttributeError, TypeError):
+        from .shared_status import user_runtime_dir
+        base = user_runtime_dir()
+    directory = os.path.join(base, name)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    return directory
 
 
 def recover_original_filepath(filepath):
@@ -37,11 +56,20 @@ def get_project_root(filepath):
 
     if dir_path in RootCache.cache:
         entry = RootCache.cache[dir_path]
-        if current_time - entry['time'] < RootCache.duration:
+        duration = RootCache.event_duration if StatusCache.history_events else RootCache.duration
+        if current_time - entry['time'] < duration:
             return entry['root']
 
+    if SHARED_STATUS_ENABLED:
+        found, root = lookup_shared_root(dir_path)
+        if found:
+            RootCache.cache[dir_path] = {'root': root, 'time': current_time}
+            return root
+
     res = send_request('/draft/find-root', {'path': dir_path})
     root = res.get('root') if res else None
     RootCache.cache[dir_path] = {'root': root, 'time': current_time}
+    if SHARED_STATUS_ENABLED and res and 'root' in res:
+        publish_shared_root(dir_path, root)
 
     return root
@@ -0,0 +1,118 @@
+"""
+Per-endpoint timeout/retry policy and a circuit breaker for the local API.
+
+Cheap probes (/health) get short timeouts; commits and restores of multi-GB files
+get long ones. Only idempotent endpoints are retried, with jittered exponential
+backoff. After repeated connection failures the breaker opens and calls fail
+instantly instead of each waiting for a timeout; once the reset timeout passes a
+single half-open probe decides whether to close it again.
+"""
+
+import random
+import threading
+import time
+from collections import namedtuple
+
+from .constants import (
+    API_TIMEOUT,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_RESET_TIMEOUT,
+    BREAKER_RESET_TIMEOUT,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_CAP,
+)
+
+EndpointPolicy = namedtuple("EndpointPolicy", "timeout retries idempotent")
+
+DEFAULT_POLICY = EndpointPolicy(timeout=API_TIMEOUT, retries=0, idempotent=False)
+
+POLICIES = {
+    '/health': EndpointPolicy(timeout=0.5, retries=0, idempotent=True),
+    '/auth/status': EndpointPolicy(timeout=1.0, retries=1, idempotent=True),
+    '/draft/find-root': EndpointPolicy(timeout=2.0, retries=2, idempotent=True),
+    '/draft/history': EndpointPolicy(timeout=15.0, retries=2, idempotent=True),
+    '/draft/init': EndpointPolicy(timeout=10.0, retries=0, idempotent=False),
+    '/draft/commit': EndpointPolicy(timeout=600.0, retries=0, idempotent=False),
+    '/draft/restore': EndpointPolicy(timeout=600.0, retries=0, idempotent=False),
+    # Only plans the restore (the client writes the file), but may carry most of a version's bytes
+    '/draft/restore-delta': EndpointPolicy(timeout=600.0, retries=1, idempotent=True),
+    '/draft/rename-version': EndpointPolicy(timeout=5.0, retries=0, idempotent=False),
+    # Thousands of items, and exports copy files
+    '/draft/batch': EndpointPolicy(timeout=120.0, retries=0, idempotent=False),
+    # The app copies each render frame it doesn't have into its store
+    '/draft/commit-render': EndpointPolicy(timeout=600.0, retries=0, idempotent=False),
+    # The app copies each imported version's file into its store
+    '/draft/import': EndpointPolicy(timeout=600.0, retries=0, idempotent=False),
+}
+
+
+def policy_for(endpoint):
+    return POLICIES.get(endpoint.split('?', 1)[0], DEFAULT_POLICY)
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff before retry number attempt (1-based)."""
+    return random.uniform(0.0, min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * (2 ** attempt)))
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Tracks connection failures to the app; see module docstring."""
+
+    def __init__(self, threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT,
+                 max_reset_timeout=BREAKER_MAX_RESET_TIMEOUT):
+        self.threshold = threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.reset_timeout = self.base_reset_timeout
+        self.open_until = 0.0
+        self.rejected = 0
+
+    def allow(self):
+        """True if a call may go out now. In half-open state only one probe is let through."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() >= self.open_until:
+                self.state = HALF_OPEN
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.reset_timeout = self.base_reset_timeout
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                # Probe failed: stay open longer each time, up to the cap
+                self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+                self._open()
+                return
+            self.failures += 1
+            if self.state == CLOSED and self.failures >= self.threshold:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.open_until = time.monotonic() + self.reset_timeout
+
+    def open_error(self):
+        remaining = max(0.0, self.open_until - time.monotonic())
+        return f"DraftWolf app unavailable (retrying in {remaining:.0f}s)"
+
+
+breaker = CircuitBreaker()
@@ -0,0 +1,233 @@
+"""
+Opt-in profiling of the sidebar panel and the addon's operators.
+
+enable() swaps the panel's _draw_* sections, the panel's draw() and every
+operator's execute/invoke/modal for timing wrappers; disable() puts the
+originals back, so nothing is added to the hot paths while profiling is off.
+Each call updates rolling statistics for its name and is appended to a bounded
+trace that export_trace() writes as a Chrome trace (chrome://tracing, Perfetto).
+start_capture() additionally records cProfile (and, if asked, tracemalloc) for
+a window of seconds and writes a .pstats file / allocation report.
+"""
+
+import collections
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+
+from .constants import PROFILE_DIR_NAME, PROFILE_STATS_WINDOW, PROFILE_TRACE_EVENTS
+from .state import ProfilingState
+
+OPERATOR_METHODS = ("execute", "invoke", "modal")
+
+
+class SectionStats:
+    """Call count and totals for one name, plus the last PROFILE_STATS_WINDOW durations for percentiles."""
+
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = collections.deque(maxlen=PROFILE_STATS_WINDOW)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.recent.append(seconds)
+
+    def as_dict(self):
+        recent = sorted(self.recent)
+        n = len(recent)
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1e3,
+            'mean_ms': self.total / self.count * 1e3 if self.count else 0.0,
+            'p50_ms': recent[n // 2] * 1e3 if n else 0.0,
+            'p95_ms': recent[min(n - 1, int(n * 0.95))] * 1e3 if n else 0.0,
+            'max_ms': self.max * 1e3,
+        }
+
+
+_stats = {}
+_trace = collections.deque(maxlen=PROFILE_TRACE_EVENTS)
+_patched = []            # (owner, attribute name, original) to restore on disable()
+_capture = None          # (cProfile.Profile, tracemalloc started by us, memory capture)
+_lock = threading.Lock()
+
+
+def _record(name, start_ns, end_ns):
+    seconds = (end_ns - start_ns) / 1e9
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = SectionStats()
+        stats.add(seconds)
+        _trace.append((name, start_ns, end_ns - start_ns, threading.get_ident()))
+
+
+def _timed(name, function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _record(name, start, time.perf_counter_ns())
+    return wrapper
+
+
+def _patch(owner, attribute, name):
+    original = owner.__dict__[attribute] if isinstance(owner, type) else getattr(owner, attribute)
+    setattr(owner, attribute, _timed(name, original))
+    _patched.append((owner, attribute, original))
+
+
+def enable():
+    """Start timing panel sections and operators (no-op if already enabled)."""
+    if ProfilingState.enabled:
+        return
+    from . import classes, panel
+    for attribute in sorted(vars(panel)):
+        if attribute.startswith("_draw_") and callable(getattr(panel, attribute)):
+            _patch(panel, attribute, f"panel.{attribute[len('_draw_'):]}")
+    for cls in classes:
+        for method in ("draw",) + OPERATOR_METHODS:
+            if method in cls.__dict__:
+                _patch(cls, method, f"{cls.bl_idname}.{method}")
+    ProfilingState.enabled = True
+    ProfilingState.enabled_at = time.time()
+    print(f"DraftWolf profiling enabled ({len(_patched)} functions timed)")
+
+
+def disable():
+    """Restore the original functions; collected statistics are kept until reset()."""
+    stop_capture()
+    while _patched:
+        owner, attribute, original = _patched.pop()
+        setattr(owner, attribute, original)
+    ProfilingState.enabled = False
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _trace.clear()
+
+
+def stats():
+    """{name: {count, total_ms, mean_ms, p50_ms, p95_ms, max_ms}}, slowest total first."""
+    with _lock:
+        items = [(name, s.as_dict()) for name, s in _stats.items()]
+    return dict(sorted(items, key=lambda item: item[1]['total_ms'], reverse=True))
+
+
+def format_stats(limit=20):
+    lines = [f"{'section':40s} {'count':>7s} {'mean ms':>9s} {'p95 ms':>9s} {'max ms':>9s}"]
+    for name, s in list(stats().items())[:limit]:
+        lines.append(f"{name:40s} {s['count']:7d} {s['mean_ms']:9.3f} {s['p95_ms']:9.3f} {s['max_ms']:9.3f}")
+    from .singleflight import stats as flight_stats
+    flights = flight_stats()
+    if flights['saved']:
+        by_endpoint = ", ".join(f"{e} {n}" for e, n in sorted(flights['saved_by_endpoint'].items()))
+        lines.append(f"API calls coalesced: {flights['saved']} of {flights['calls']} ({by_endpoint})")
+    return "\n".join(lines)
+
+
+def output_dir():
+    path = os.path.join(tempfile.gettempdir(), PROFILE_DIR_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _output_path(directory, suffix):
+    return os.path.join(directory or output_dir(), time.strftime("draftwolf-%Y%m%d-%H%M%S") + suffix)
+
+
+def export_trace(directory=None):
+    """Write the recorded calls as a Chrome trace (JSON) and the rolling stats as text. Returns the trace path."""
+    with _lock:
+        events = list(_trace)
+    pid = os.getpid()
+    trace = {
+        'traceEvents': [
+            {'name': name, 'cat': name.split('.', 1)[0], 'ph': 'X', 'ts': start / 1e3, 'dur': duration / 1e3,
+             'pid': pid, 'tid': tid}
+            for name, start, duration, tid in events
+        ],
+        'displayTimeUnit': 'ms',
+    }
+    path = _output_path(directory, ".trace.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(trace, f)
+    with open(path[:-len(".trace.json")] + ".stats.txt", "w", encoding="utf-8") as f:
+        f.write(format_stats(limit=len(_stats)) + "\n")
+    ProfilingState.last_export = path
+    return path
+
+
+def start_capture(seconds, memory=False):
+    """Record cProfile (and tracemalloc if memory) on this thread for seconds; stop_capture() writes the files."""
+    global _capture
+    import cProfile
+    import tracemalloc
+    if _capture is not None:
+        return False
+    profile = cProfile.Profile()
+    started_tracemalloc = memory and not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start(25)
+    profile.enable()
+    _capture = (profile, started_tracemalloc, memory)
+    ProfilingState.capturing = True
+    try:
+        import bpy
+        bpy.app.timers.register(_capture_timer, first_interval=seconds)
+    except (ImportError, AttributeError):
+        pass
+    return True
+
+
+def _capture_timer():
+    stop_capture()
+    return None
+
+
+def stop_capture(directory=None):
+    """End a capture window: writes <name>.pstats and, for memory captures, <name>.alloc.txt. Returns paths."""
+    global _capture
+    if _capture is None:
+        return []
+    import tracemalloc
+    profile, started_tracemalloc, memory = _capture
+    _capture = None
+    ProfilingState.capturing = False
+    profile.disable()
+    paths = []
+    path = _output_path(directory, ".pstats")
+    profile.dump_stats(path)
+    paths.append(path)
+    if memory and tracemalloc.is_tracing():
+        snapshot = tracemalloc.take_snapshot()
+        if started_tracemalloc:
+            tracemalloc.stop()
+        alloc_path = path[:-len(".pstats")] + ".alloc.txt"
+        with open(alloc_path, "w", encoding="utf-8") as f:
+            for stat in snapshot.statistics("lineno")[:50]:
+                f.write(f"{stat}\n")
+        paths.append(alloc_path)
+    try:
+        import bpy
+        if bpy.app.timers.is_registered(_capture_timer):
+            bpy.app.timers.unregister(_capture_timer)
+    except (ImportError, AttributeError):
+        pass
+    ProfilingState.last_export = paths[0]
+    print(f"DraftWolf profile written: {', '.join(paths)}")
+    return paths
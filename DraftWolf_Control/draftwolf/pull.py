@@ -0,0 +1,267 @@
+"""
+Pull datablocks from a past version into the open file, without restoring it.
+
+The app exports the version's file (a /draft/batch 'export' operation) into a
+per-version folder of a private per-user cache. A cached copy is reused only while
+it is the file exported for that version (same size and mtime as recorded right
+after the export) or matches the manifest's digest. Its datablock names are listed with bpy.data.libraries.load
+without loading anything, and only the chosen ones are appended (or linked), so
+unsaved work in the open file is kept and a multi-GB scene isn't reloaded.
+
+Appended objects and collections are added to the scene. With replace, users of
+the open file's datablock of the same name are remapped to the pulled copy, which
+takes over its name (the old one is left without users and is dropped on save).
+
+The export can take minutes for a large scene, so it runs on its own worker
+thread rather than the scheduler's, and the listing is published on the main thread.
+"""
+
+import fnmatch
+import json
+import os
+import shutil
+import threading
+
+import bpy
+
+from .constants import PULL_CACHE_DIR_NAME, PULL_CACHE_VERSIONS
+from .integrity import file_digest, manifest_digest
+from .path_utils import user_cache_dir
+from .state import PullState
+
+# Written next to an export: the version and the file's stat right after it arrived
+EXPORT_STAMP = ".export.json"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# bpy.data collections offered for pulling, with their labels
+CATEGORIES = (
+    ('objects', "Objects"),
+    ('collections', "Collections"),
+    ('materials', "Materials"),
+    ('node_groups', "Node Groups"),
+    ('meshes', "Meshes"),
+    ('worlds', "Worlds"),
+    ('images', "Images"),
+    ('actions', "Actions"),
+    ('cameras', "Cameras"),
+    ('lights', "Lights"),
+    ('texts', "Texts"),
+)
+
+
+def cache_root():
+    return user_cache_dir(PULL_CACHE_DIR_NAME)
+
+
+def version_dir(root, version_id):
+    """Cache folder for one version of a project."""
+    from .shared_status import history_root_key
+    safe_id = "".join(c if c.isalnum() or c in "-_." else "_" for c in str(version_id))
+    return os.path.join(cache_root(), history_root_key(root), safe_id)
+
+
+def _manifest_size(version, filepath):
+    target = os.path.basename(filepath).lower()
+    for name, meta in (version.get('files') or {}).items():
+        if os.path.basename(name.replace("\\", "/")).lower() == target and isinstance(meta, dict):
+            size = meta.get('size')
+            return size if isinstance(size, int) and size > 0 else None
+    return None
+
+
+def _find_blend(directory, filepath):
+    """The exported .blend in directory: the one named like filepath, else the only/first one."""
+    try:
+        names = sorted(n for n in os.listdir(directory) if n.lower().endswith(".blend"))
+    except OSError:
+        return None
+    target = os.path.basename(filepath).lower()
+    for name in names:
+        if name.lower() == target:
+            return os.path.join(directory, name)
+    return os.path.join(directory, names[0]) if names else None
+
+
+def _stamp(path, version_id):
+    st = os.stat(path)
+    return {'version': str(version_id), 'name': os.path.basename(path), 'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns}
+
+
+def _write_stamp(directory, path, version_id):
+    with open(os.path.join(directory, EXPORT_STAMP), "w", encoding="utf-8") as f:
+        json.dump(_stamp(path, version_id), f)
+
+
+def _cached_copy(directory, filepath, version):
+    """
+    The cached export of version in directory, or None if there is none or it can't be trusted:
+    the file must still be the one exported for this version, or match the manifest's digest.
+    """
+    path = _find_blend(directory, filepath)
+    if path is None:
+        return None
+    expected_size = _manifest_size(version, filepath)
+    try:
+        if expected_size is not None and os.path.getsize(path) != expected_size:
+            return None
+        with open(os.path.join(directory, EXPORT_STAMP), encoding="utf-8") as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        stamp = None
+    try:
+        if stamp == _stamp(path, version.get('id')):
+            return path
+        expected = manifest_digest(version, filepath)
+        if expected is None or file_digest(path, expected[0]) != expected[1]:
+            return None
+        _write_stamp(directory, path, version.get('id'))
+    except OSError:
+        return None
+    return path
+
+
+def _prune_cache(keep_dir):
+    """Drop the least recently used cached versions beyond PULL_CACHE_VERSIONS."""
+    try:
+        dirs = [e.path for project in os.scandir(cache_root()) if project.is_dir()
+                for e in os.scandir(project.path) if e.is_dir()]
+        dirs.sort(key=os.path.getmtime, reverse=True)
+    except OSError:
+        return
+    for path in dirs[PULL_CACHE_VERSIONS:]:
+        if path != keep_dir:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def fetch_version_file(root, filepath, version):
+    """
+    Path of version's copy of filepath in the pull cache, exported by the app unless
+    already cached. Returns (path, error). Runs off the main thread.
+    """
+    from .batch import build_operations, submit
+    directory = version_dir(root, version.get('id'))
+    path = _cached_copy(directory, filepath, version)
+    if path is not None:
+        os.utime(directory)    # most recently used
+        return path, None
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    _, failed, error = submit(root, filepath, build_operations('EXPORT', [version], destination=directory))
+    if error or failed:
+        return None, error or failed[0][1]
+    path = _find_blend(directory, filepath)
+    if path is None:
+        return None, "The app exported no .blend file for this version"
+    _write_stamp(directory, path, version.get('id'))
+    _prune_cache(directory)
+    return path, None
+
+
+def list_datablocks(path):
+    """category -> sorted datablock names in the .blend at path; reads names only, loads nothing."""
+    listing = {}
+    with bpy.data.libraries.load(path, link=False) as (data_from, _data_to):
+        for category, _label in CATEGORIES:
+            names = getattr(data_from, category, None)
+            if names:
+                listing[category] = sorted(names)
+    return listing
+
+
+def match_names(names, patterns):
+    """Names matching any comma-separated pattern (exact names or * ? wildcards), in listing order."""
+    wanted = [p.strip() for p in patterns.split(",") if p.strip()]
+    return [n for n in names if any(n == p or fnmatch.fnmatchcase(n, p) for p in wanted)]
+
+
+def pull(path, category, names, link=False, replace=False, scene=None):
+    """Append (or link) the named category datablocks from path. Returns the new datablocks."""
+    collection = getattr(bpy.data, category)
+    existing = {name: collection.get(name) for name in names} if replace else {}
+    with bpy.data.libraries.load(path, link=link) as (_data_from, data_to):
+        setattr(data_to, category, list(names))
+
+    loaded, unplaced = [], []
+    for name, block in zip(names, getattr(data_to, category)):
+        if block is None:
+            continue
+        loaded.append(block)
+        old = existing.get(name)
+        if old is not None and old is not block:
+            old.user_remap(block)
+            if not link:
+                old.name = f"{name}.replaced"
+                block.name = name
+        else:
+            unplaced.append(block)
+    if scene is not None:
+        # Replaced ones took over their predecessor's place; the rest would otherwise be orphans
+        if category == 'objects':
+            for obj in unplaced:
+                scene.collection.objects.link(obj)
+        elif category == 'collections':
+            for coll in unplaced:
+                scene.collection.children.link(coll)
+    return loaded
+
+
+def _publish(filepath, version_id, path, error):
+    """Main thread: list the fetched file's datablocks for the panel (unless another pull superseded this one)."""
+    if PullState.filepath != filepath or PullState.version_id != version_id:
+        return
+    PullState.pending = False
+    PullState.path = path
+    PullState.error = error
+    if path is not None:
+        try:
+            PullState.listing = list_datablocks(path)
+        except (OSError, RuntimeError) as e:
+            PullState.error = f"Could not read the version's file: {e}"
+    from .panel import request_redraw
+    request_redraw()
+
+
+def _fetch(root, filepath, version):
+    from .scheduler import call_on_main_thread
+    if PullState.filepath != filepath or PullState.version_id != version.get('id'):
+        return    # superseded by a later pull while it waited
+    try:
+        path, error = fetch_version_file(root, filepath, version)
+    except OSError as e:
+        path, error = None, str(e)
+    call_on_main_thread(_publish, filepath, version.get('id'), path, error)
+
+
+def start(root, filepath, version):
+    """Fetch version's file in the background; the panel lists its datablocks when it arrives."""
+    global _executor
+    from .scheduler import start_main_thread_drain
+    PullState.filepath = filepath
+    PullState.version_id = version.get('id')
+    PullState.version_label = f"v{version.get('versionNumber', '?')} {version.get('label', '')}".strip()
+    PullState.path = PullState.listing = PullState.error = None
+    PullState.pending = True
+    with _executor_lock:
+        if _executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="DraftWolfPull")
+    start_main_thread_drain()    # the listing is published on the main thread
+    _executor.submit(_fetch, root, filepath, version)
+
+
+def clear():
+    PullState.filepath = PullState.version_id = PullState.version_label = None
+    PullState.path = PullState.listing = PullState.error = None
+    PullState.pending = False
+
+
+def shutdown():
+    """Stop the export worker (addon unregister); an export in progress finishes first."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
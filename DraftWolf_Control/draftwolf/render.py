@@ -0,0 +1,243 @@
+"""
+Versioning of render outputs, attached to the .blend version they were rendered from.
+
+The render handlers do almost nothing on Blender's render loop: render_write records
+the frame's output path and, when the scene opts in (Scene.draftwolf_version_renders),
+hands it to a pool of RENDER_HASH_WORKERS threads, so a long animation is hashed
+while it renders rather than in one burst at the end. render_complete snapshots the
+render as a RenderJob, with the .blend's newest version if it is already cached
+(no request is made on Blender's main thread). An opted-in scene's job is committed
+on a single commit worker (in render order), which looks up the project and any
+version not cached, and waits for the hashes and the upload without holding up the
+scheduler; the outcome is published on the main thread.
+
+"Version Last Render" commits the last job on demand. A still render (F12) writes
+no files, so its Render Result is saved to RENDER_STILL_DIR_NAME in the per-user
+cache first.
+
+Identical frames (held frames, static shots) are sent once with all their paths;
+/draft/commit-render stores each digest once, across renders too. The version
+records the .blend's newest version and whether the render had unsaved changes.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError
+
+import bpy
+
+from .constants import CANNOT_CONNECT_APP, RENDER_HASH_WORKERS, RENDER_STILL_DIR_NAME, UNKNOWN_ERROR
+from .path_utils import user_cache_dir
+from .state import HistoryStore, RenderState, RootCache
+
+_executor = None
+_committer = None
+_executor_lock = threading.Lock()
+_queue = deque()    # RenderJobs waiting to be committed, in render order
+
+
+class RenderJob:
+    """Frames of one render and the .blend version they belong to."""
+
+    def __init__(self, filepath, scene_name, frames, hashes, blend_version_id, blend_dirty, complete=True):
+        self.filepath = filepath
+        self.scene_name = scene_name
+        self.frames = frames
+        self.hashes = hashes
+        self.blend_version_id = blend_version_id
+        self.blend_dirty = blend_dirty
+        self.complete = complete
+
+    def label(self):
+        if len(self.frames) == 1:
+            return f"Render {self.scene_name}"
+        return f"Render {self.scene_name} ({len(self.frames)} frames)"
+
+
+def _hash_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _executor = ThreadPoolExecutor(max_workers=RENDER_HASH_WORKERS, thread_name_prefix="DraftWolfRender")
+    return _executor
+
+
+def _fingerprint(path):
+    from .integrity import file_digest
+    return file_digest(path), os.path.getsize(path)
+
+
+def versioning_enabled(scene):
+    return bool(getattr(scene, "draftwolf_version_renders", False))
+
+
+def frame_written(scene):
+    """render_write: remember the frame's output path (and start hashing it if the scene opts in)."""
+    if not RenderState.frames:
+        RenderState.started = time.time()
+        RenderState.hashes = {}
+    path = bpy.path.abspath(scene.render.frame_path(frame=scene.frame_current))
+    RenderState.frames.append(path)
+    if versioning_enabled(scene):
+        RenderState.hashes[path] = _hash_pool().submit(_fingerprint, path)
+
+
+def _cached_blend_version(filepath):
+    """The .blend's newest version from the root and history caches alone (None if not cached)."""
+    from .history import clean_target_basename, filter_history_by_basename
+    entry = RootCache.cache.get(os.path.dirname(filepath)) if filepath else None
+    cached = HistoryStore.entries.get(entry['root']) if entry and entry['root'] else None
+    if not cached or not cached['history']:
+        return None
+    _, target_lower = clean_target_basename(filepath)
+    history = cached['filtered'].get(target_lower)
+    if history is None:
+        history = filter_history_by_basename(cached['history'], target_lower)
+    return history[0].get('id') if history else None
+
+
+def _latest_blend_version(filepath):
+    """The .blend's newest version, fetching its project root and history if needed (worker only)."""
+    from .history import get_file_history
+    history = get_file_history(filepath) if filepath else None
+    return history[0].get('id') if history else None
+
+
+def render_finished(scene, complete=True):
+    """render_complete / render_cancel: keep the render as the last job; commit it if the scene opts in."""
+    frames, RenderState.frames = RenderState.frames, []
+    hashes, RenderState.hashes = RenderState.hashes, {}
+    filepath = bpy.data.filepath
+    RenderState.last = RenderJob(filepath, scene.name, frames, hashes, _cached_blend_version(filepath),
+                                 bool(bpy.data.is_dirty), complete)
+    if complete and frames and versioning_enabled(scene):
+        submit(RenderState.last)
+
+
+def save_still(scene):
+    """Save the Render Result image of a still render to the per-user cache; returns its path, or None."""
+    image = bpy.data.images.get("Render Result")
+    if image is None:
+        return None
+    directory = user_cache_dir(RENDER_STILL_DIR_NAME)
+    stem = os.path.splitext(os.path.basename(bpy.data.filepath))[0] or "untitled"
+    extension = scene.render.file_extension or ".png"
+    path = os.path.join(directory, f"{stem}-{scene.name}-{time.strftime('%Y%m%d-%H%M%S')}{extension}")
+    image.save_render(filepath=path, scene=scene)
+    return path
+
+
+def still_job(scene):
+    """A job for the Render Result of a still render, saved to the per-user cache; None if nothing was rendered."""
+    path = save_still(scene)
+    if path is None:
+        return None
+    filepath = bpy.data.filepath
+    return RenderJob(filepath, scene.name, [path], {}, _cached_blend_version(filepath), bool(bpy.data.is_dirty))
+
+
+def group_frames(frames, digests):
+    """One entry per distinct digest, in first-frame order: {sha256, size, path, duplicates}."""
+    groups = {}
+    for path in frames:
+        digest, size = digests[path]
+        group = groups.get(digest)
+        if group is None:
+            groups[digest] = {'sha256': digest, 'size': size, 'path': path, 'duplicates': []}
+        else:
+            group['duplicates'].append(path)
+    return list(groups.values())
+
+
+def commit(job, root):
+    """Hash job's frames (reusing digests already computed) and commit them. Returns a result dict."""
+    from .api import send_request
+    start = time.perf_counter()
+    pool = _hash_pool()
+    futures = {path: job.hashes.get(path) or pool.submit(_fingerprint, path) for path in job.frames}
+    digests = {}
+    missing = []
+    for path, future in futures.items():
+        try:
+            digests[path] = future.result()
+        except (OSError, CancelledError):    # unreadable, or the pool was shut down
+            missing.append(path)
+    frames = [path for path in job.frames if path in digests]
+    groups = group_frames(frames, digests)
+    hash_s = time.perf_counter() - start
+    result = {'frames': len(frames), 'unique': len(groups), 'missing': len(missing),
+              'bytes': sum(g['size'] for g in groups), 'hashSeconds': round(hash_s, 3)}
+    if not groups:
+        result['error'] = "The render wrote no frames that could be read"
+        return result
+    res = send_request('/draft/commit-render', {
+        'projectRoot': root,
+        'blendPath': job.filepath,
+        'blendVersionId': job.blend_version_id,
+        'blendModified': job.blend_dirty,
+        'label': job.label(),
+        'frames': groups,
+    })
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    if res and res.get('success'):
+        result.update(versionId=res.get('versionId'), versionNumber=res.get('versionNumber'),
+                      stored=res.get('stored'), reused=res.get('reused'))
+    else:
+        result['error'] = res.get('error', UNKNOWN_ERROR) if res else CANNOT_CONNECT_APP
+    return result
+
+
+def _publish(result):
+    RenderState.pending = bool(_queue)
+    RenderState.last_result = result
+    if result.get('error'):
+        print(f"DraftWolf: render not versioned: {result['error']}")
+    from .panel import request_redraw
+    request_redraw()
+
+
+def _drain():
+    from .path_utils import get_project_root
+    from .scheduler import call_on_main_thread
+    while _queue:
+        try:
+            job = _queue.popleft()
+        except IndexError:
+            break
+        root = get_project_root(job.filepath)
+        if root and job.blend_version_id is None:
+            # Not cached when the render finished; looked up here rather than in the handler
+            job.blend_version_id = _latest_blend_version(job.filepath)
+        result = commit(job, root) if root else {'error': "Version control not enabled for this project"}
+        if 'versionId' in result:
+            from .history import invalidate_history
+            invalidate_history(root)
+        call_on_main_thread(_publish, result)
+
+
+def submit(job):
+    """Commit job on the commit worker (after any renders queued before it); the outcome lands in RenderState.last_result."""
+    global _committer
+    from .scheduler import start_main_thread_drain
+    RenderState.pending = True
+    _queue.append(job)
+    with _executor_lock:
+        if _committer is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _committer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="DraftWolfRenderCommit")
+    start_main_thread_drain()    # the outcome is published on the main thread
+    _committer.submit(_drain)
+
+
+def shutdown():
+    """Stop the hashing pool and the commit worker (addon unregister)."""
+    global _executor, _committer
+    with _executor_lock:
+        executors = (_executor, _committer)
+        _executor = _committer = None
+    for executor in executors:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,124 @@
+"""
+Retention planning: which versions of a file to keep and which to prune.
+
+A policy keeps every version from the last keep_all_hours, the newest version
+of each hour for hourly_days, of each day for daily_days and of each week for
+weekly_weeks; anything older is pruned. Versions with a meaningful label, that
+are pinned (a 'pinned' flag or tag), the newest version and versions whose
+timestamp can't be read are always kept. Planning sorts once by timestamp and
+then makes a single pass, so it is O(n log n) in the size of the history.
+
+plan() is a dry run; prune() sends the plan's deletions as one batch request.
+"""
+
+import time
+from collections import namedtuple
+
+from .constants import RETENTION_DEFAULT_LABELS, RETENTION_POLICY
+from .search import parse_timestamp
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+
+RetentionPolicy = namedtuple("RetentionPolicy", "keep_all_hours hourly_days daily_days weekly_weeks keep_labeled")
+
+DEFAULT_POLICY = RetentionPolicy(**RETENTION_POLICY)
+
+
+class RetentionPlan:
+    """Result of plan(): versions to keep and to prune (newest first), with the reason each is kept."""
+
+    def __init__(self, policy, keep, prune, reasons, planned_at):
+        self.policy = policy
+        self.keep = keep
+        self.prune = prune
+        self.reasons = reasons      # version id -> why it is kept
+        self.planned_at = planned_at
+
+    @property
+    def prune_bytes(self):
+        """Stored size of the pruned versions' files, as far as the manifest records it."""
+        total = 0
+        for v in self.prune:
+            for meta in (v.get('files') or {}).values():
+                if isinstance(meta, dict) and isinstance(meta.get('size'), (int, float)):
+                    total += meta['size']
+        return total
+
+    def summary(self):
+        counts = {}
+        for reason in self.reasons.values():
+            counts[reason] = counts.get(reason, 0) + 1
+        return {'keep': len(self.keep), 'prune': len(self.prune), 'kept_because': counts}
+
+
+def is_pinned(version):
+    return bool(version.get('pinned')) or 'pinned' in (version.get('tags') or ())
+
+
+def is_labeled(version):
+    """True if the label was chosen by someone, not the default a commit gets."""
+    label = (version.get('label') or '').strip()
+    return bool(label) and label not in RETENTION_DEFAULT_LABELS
+
+
+def _tiers(policy):
+    """(max age, bucket width) for each thinning tier, youngest first."""
+    tiers = []
+    if policy.hourly_days > 0:
+        tiers.append((policy.hourly_days * DAY, HOUR))
+    if policy.daily_days > 0:
+        tiers.append((policy.daily_days * DAY, DAY))
+    if policy.weekly_weeks > 0:
+        tiers.append((policy.weekly_weeks * WEEK, WEEK))
+    return tiers
+
+
+def plan(history, policy=DEFAULT_POLICY, now=None):
+    """Plan retention for history (one file's versions, any order)."""
+    now = time.time() if now is None else now
+    keep_all = policy.keep_all_hours * HOUR
+    tiers = _tiers(policy)
+    reasons = {}
+    dated = []
+    for position, v in enumerate(history):
+        t = parse_timestamp(v.get('timestamp'))
+        if t is None:
+            reasons[v.get('id')] = 'undated'
+        else:
+            dated.append((t, position, v))
+    dated.sort(key=lambda item: (-item[0], item[1]))
+
+    seen_buckets = set()
+    for rank, (t, _, v) in enumerate(dated):
+        vid = v.get('id')
+        age = now - t
+        if rank == 0:
+            reasons[vid] = 'newest'
+        elif age <= keep_all:
+            reasons[vid] = 'recent'
+        elif is_pinned(v):
+            reasons[vid] = 'pinned'
+        elif policy.keep_labeled and is_labeled(v):
+            reasons[vid] = 'labeled'
+        else:
+            for max_age, width in tiers:
+                if age <= max_age:
+                    # Newest first, so the first version seen in a bucket is its newest
+                    bucket = (width, int(t // width))
+                    if bucket not in seen_buckets:
+                        seen_buckets.add(bucket)
+                        reasons[vid] = 'hourly' if width == HOUR else 'daily' if width == DAY else 'weekly'
+                    break
+
+    keep, prune = [], []
+    for v in history:
+        (keep if v.get('id') in reasons else prune).append(v)
+    return RetentionPlan(policy, keep, prune, reasons, now)
+
+
+def prune(root, filepath, retention_plan):
+    """Delete the plan's pruned versions in one batch. Returns batch.submit's (succeeded, failed, error)."""
+    from .batch import build_operations, submit
+    return submit(root, filepath, build_operations('DELETE', retention_plan.prune))
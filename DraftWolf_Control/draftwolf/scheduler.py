@@ -0,0 +1,378 @@
+"""
+One background thread that times the addon's periodic and one-off work.
+
+Tasks sit in a heap ordered by due time. The thread sleeps on a condition
+variable until the next task is due or the schedule changes, so an idle addon
+causes no wake-ups. When several tasks are due at once the highest priority
+(lowest number) is dispatched first. A task that can't start within its deadline
+is skipped and counted as missed rather than run late.
+
+The scheduler thread only dispatches: tasks run on a pool of SCHEDULER_WORKERS
+threads, so a slow request or export never holds up the status poll. Runs of the
+same task name never overlap; a run that falls due while the previous one is
+still going starts when it ends.
+
+Like bpy.app.timers, a task's function may return a number of seconds to run
+again after that delay; returning None repeats a periodic task after its
+interval and ends a one-off task.
+
+Work that must run on Blender's main thread (bpy data, operators, UI) is queued
+(pass main_thread=True, or use call_on_main_thread() for a plain callback) and run
+by a persistent bpy.app.timers callback that start_main_thread_drain() registers
+from the main thread. Other threads only append to the queue and never touch bpy.
+"""
+
+import collections
+import heapq
+import itertools
+import threading
+import time
+
+from .constants import MAIN_THREAD_DRAIN_INTERVAL, SCHEDULER_WORKERS
+
+try:
+    import bpy
+except ImportError:    # command line (cli.py): main-thread work runs in the thread that posts it
+    bpy = None
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+
+class TaskStats:
+    """Run-time statistics kept per task name (across replacements of the task)."""
+
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.missed = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.last_time = 0.0
+        self.last_run = None       # wall-clock time of the last run
+        self.last_error = None
+
+    def record(self, elapsed, error=None):
+        self.runs += 1
+        self.total_time += elapsed
+        self.last_time = elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.last_run = time.time()
+        if error is not None:
+            self.failures += 1
+            self.last_error = str(error)
+
+    def as_dict(self):
+        return {
+            'runs': self.runs,
+            'failures': self.failures,
+            'missed': self.missed,
+            'total_s': self.total_time,
+            'mean_s': self.total_time / self.runs if self.runs else 0.0,
+            'max_s': self.max_time,
+            'last_s': self.last_time,
+            'last_run': self.last_run,
+            'last_error': self.last_error,
+        }
+
+
+class Task:
+    """A scheduled function; created by Scheduler.schedule()."""
+
+    def __init__(self, name, function, args, interval, priority, deadline, main_thread, stats):
+        self.name = name
+        self.function = function
+        self.args = args
+        self.interval = interval
+        self.priority = priority
+        self.deadline = deadline
+        self.main_thread = main_thread
+        self.stats = stats
+        self.due = 0.0
+        self.cancelled = False
+
+    def __repr__(self):
+        return f"Task({self.name!r}, due={self.due:.3f}, priority={self.priority})"
+
+
+class Scheduler:
+    """The scheduler thread and its task heap; use the module-level ``scheduler``."""
+
+    def __init__(self, workers=SCHEDULER_WORKERS):
+        self._cond = threading.Condition()
+        self._heap = []
+        self._tasks = {}           # name -> Task currently scheduled
+        self._stats = {}           # name -> TaskStats
+        self._counter = itertools.count()
+        self._thread = None
+        self._running = False
+        self._stopped = False      # set by stop(); schedule() won't restart the thread until start()
+        self._workers = workers
+        self._executor = None      # created with the first dispatched task
+        self._busy = set()         # names of tasks running on a worker
+        self._deferred = {}        # name -> task that fell due while its previous run was still going
+        self._main_lock = threading.Lock()
+        self._main_queue = collections.deque()
+        self.wakeups = 0           # times the thread woke up (for benchmarks)
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self):
+        """Start the thread (no-op if it is already running)."""
+        with self._cond:
+            self._stopped = False
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="DraftWolfScheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Cancel every task, wake the thread and wait for it to exit. Tasks already running on a worker finish in the background."""
+        with self._cond:
+            self._running = False
+            self._stopped = True
+            for task in self._tasks.values():
+                task.cancelled = True
+            self._tasks.clear()
+            self._heap.clear()
+            self._deferred.clear()
+            self._cond.notify_all()
+            thread, self._thread = self._thread, None
+            executor, self._executor = self._executor, None
+        with self._main_lock:
+            self._main_queue.clear()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def schedule(self, name, function, *args, delay=0.0, interval=None, priority=PRIORITY_NORMAL,
+                 deadline=None, main_thread=False, replace=True):
+        """
+        Run function(*args) after delay seconds, then every interval seconds if given.
+        A task with the same name is replaced, or kept (and returned) with replace=False.
+        deadline: seconds past its due time after which a run is skipped as missed.
+        """
+        with self._cond:
+            existing = self._tasks.get(name)
+            if existing is not None:
+                if not replace:
+                    return existing
+                existing.cancelled = True
+            stats = self._stats.setdefault(name, TaskStats())
+            task = Task(name, function, args, interval, priority, deadline, main_thread, stats)
+            task.due = time.monotonic() + delay
+            self._tasks[name] = task
+            self._push(task)
+            self._cond.notify()
+            start = not (self._running or self._stopped)
+        if start:
+            self.start()
+        return task
+
+    def cancel(self, name):
+        """Cancel the task called name; returns False if there was none."""
+        with self._cond:
+            task = self._tasks.pop(name, None)
+            if task is None:
+                return False
+            task.cancelled = True
+            self._cond.notify()
+            return True
+
+    def run_soon(self, name):
+        """Move the task called name to the front of the queue (e.g. a manual refresh)."""
+        with self._cond:
+            task = self._tasks.get(name)
+            if task is None or task.cancelled:
+                return False
+            task.cancelled = True
+            task = self._tasks[name] = Task(task.name, task.function, task.args, task.interval, task.priority,
+                                            task.deadline, task.main_thread, task.stats)
+            task.due = time.monotonic()
+            self._push(task)
+            self._cond.notify()
+            return True
+
+    def get(self, name):
+        return self._tasks.get(name)
+
+    def stats(self):
+        """{task name: stats dict} for every task that has been scheduled."""
+        with self._cond:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    # -- thread ---------------------------------------------------------------
+
+    def _push(self, task):
+        heapq.heappush(self._heap, (task.due, task.priority, next(self._counter), task))
+
+    def _next_task(self):
+        """Wait until a task is due and return it (None once stopped). Called with the lock held."""
+        # After a stop/start, a thread still finishing a long task must not go on consuming the heap
+        while self._running and self._thread is threading.current_thread():
+            while self._heap and self._heap[0][3].cancelled:
+                heapq.heappop(self._heap)
+            if not self._heap:
+                self._cond.wait()
+                self.wakeups += 1
+                continue
+            now = time.monotonic()
+            delay = self._heap[0][0] - now
+            if delay > 0:
+                self._cond.wait(delay)
+                self.wakeups += 1
+                continue
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                if not entry[3].cancelled:
+                    due.append(entry)
+            if not due:
+                continue
+            due.sort(key=lambda entry: (entry[1], entry[0], entry[2]))
+            for entry in due[1:]:
+                heapq.heappush(self._heap, entry)
+            return due[0][3]
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                task = self._next_task()
+                if task is None:
+                    return
+                missed = task.deadline is not None and time.monotonic() - task.due > task.deadline
+                if missed:
+                    task.stats.missed += 1
+                elif not task.main_thread:
+                    if task.name in self._busy:
+                        self._deferred[task.name] = task
+                        continue
+                    self._busy.add(task.name)
+            if missed:
+                self._reschedule(task, None)
+            elif task.main_thread:
+                self._post_main(task)
+            else:
+                self._dispatch(task)
+
+    def _dispatch(self, task):
+        """Run task on a worker thread."""
+        with self._cond:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="DraftWolfWorker")
+            executor = self._executor
+        try:
+            executor.submit(self._work, task)
+        except RuntimeError:    # stop() shut the pool down meanwhile
+            with self._cond:
+                self._busy.discard(task.name)
+
+    def _work(self, task):
+        result = self._invoke(task)
+        with self._cond:
+            self._busy.discard(task.name)
+            deferred = self._deferred.pop(task.name, None)
+            if deferred is not None and not deferred.cancelled:
+                self._push(deferred)
+                self._cond.notify()
+        self._reschedule(task, result)
+
+    def _invoke(self, task):
+        start = time.perf_counter()
+        error = None
+        result = None
+        try:
+            result = task.function(*task.args)
+        except Exception as e:
+            error = e
+            print(f"DraftWolf background task '{task.name}' failed: {e}")
+        with self._cond:
+            task.stats.record(time.perf_counter() - start, error)
+        return result
+
+    def _reschedule(self, task, result):
+        with self._cond:
+            if task.cancelled or not self._running or self._tasks.get(task.name) is not task:
+                return
+            delay = result if isinstance(result, (int, float)) and not isinstance(result, bool) else task.interval
+            if delay is None:
+                del self._tasks[task.name]
+                return
+            task.due = time.monotonic() + delay
+            self._push(task)
+            self._cond.notify()
+
+    # -- main thread ------------------------------------------------------------
+
+    def _post_main(self, task):
+        """Queue task for the main thread; it is rescheduled after it runs there."""
+        with self._main_lock:
+            self._main_queue.append(task)
+        _main_thread_posted()
+
+    def call_on_main_thread(self, function, *args):
+        """Queue function(*args) to run once on Blender's main thread (once even if queued repeatedly)."""
+        item = (function, args)
+        with self._main_lock:
+            if item not in self._main_queue:
+                self._main_queue.append(item)
+        _main_thread_posted()
+
+    def drain_main_thread_queue(self):
+        """Run everything queued for the main thread (called from the drain timer)."""
+        while True:
+            with self._main_lock:
+                if not self._main_queue:
+                    break
+                item = self._main_queue.popleft()
+            if isinstance(item, Task):
+                if not item.cancelled:
+                    self._reschedule(item, self._invoke(item))
+                continue
+            function, args = item
+            try:
+                function(*args)
+            except Exception as e:
+                print(f"DraftWolf main-thread callback failed: {e}")
+
+
+scheduler = Scheduler()
+
+
+def _drain():
+    scheduler.drain_main_thread_queue()
+    return MAIN_THREAD_DRAIN_INTERVAL
+
+
+def start_main_thread_drain():
+    """Register the persistent timer that runs queued main-thread work. Call from the main thread only."""
+    if bpy is not None and not bpy.app.timers.is_registered(_drain):
+        bpy.app.timers.register(_drain, first_interval=0.0, persistent=True)
+
+
+def _main_thread_posted():
+    """
+    Without bpy (command line) run the queue in the posting thread. In Blender other threads
+    leave the work to the drain timer; only the main thread makes sure the timer is there.
+    """
+    if bpy is None:
+        scheduler.drain_main_thread_queue()
+    elif threading.current_thread() is threading.main_thread():
+        start_main_thread_drain()
+
+
+def shutdown():
+    """Stop the scheduler and drop the drain timer (addon unregister)."""
+    scheduler.stop()
+    if bpy is not None and bpy.app.timers.is_registered(_drain):
+        bpy.app.timers.unregister(_drain)
+
+
+call_on_main_thread = scheduler.call_on_main_thread
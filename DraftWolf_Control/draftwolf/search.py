@@ -0,0 +1,386 @@
+"""
+In-memory search over a file's version history.
+
+HistoryIndex keeps, for the versions it was built from:
+  - an inverted index from label and tag tokens to version sequence numbers,
+  - (epoch, seq) pairs sorted by time, for date ranges by binary search,
+  - a version-number lookup.
+Versions get increasing sequence numbers as they arrive, so posting lists stay
+sorted and newly committed versions are appended without rebuilding.
+
+Query syntax (terms are ANDed; the last word matches as a prefix while typing):
+    rig fix             label or tags contain words starting with "rig" and "fix"
+    v42 / #42           version number 42
+    2024-03             versions from March 2024 (or 2024-03-15; date:2024 for a year)
+    after:2024-03-01    on/after a date; before:2024-04 is exclusive
+"""
+
+import heapq
+import re
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+
+_TOKEN = re.compile(r"[^\W_]+")
+_VERSION_TERM = re.compile(r"^(?:v|#)(\d+(?:\.\d+)*)$")
+_DATE_TERM = re.compile(r"^(\d{4})(?:-(\d{1,2}))?(?:-(\d{1,2}))?$")
+
+# A prefix matching more tokens than this is checked per candidate instead of merged
+_PREFIX_MERGE_TOKENS = 32
+# Candidates checked one by one before switching to set intersection (few matches)
+_SCAN_BUDGET = 128
+# Posting lists at least this long keep a cached set for intersections
+_SET_CACHE_MIN = 1024
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def _searchable_text(version):
+    """The label followed by the tags: the words a version is found by."""
+    tags = version.get('tags')
+    if not tags:
+        return version.get('label')
+    return ' '.join([version.get('label') or '', *(str(tag) for tag in tags)])
+
+
+def parse_timestamp(value):
+    """Epoch seconds for an ISO-8601 timestamp ('Z' allowed); None if missing or malformed."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _date_span(term):
+    """(start, end) epoch range covered by 'YYYY', 'YYYY-MM' or 'YYYY-MM-DD'; None if not a date."""
+    match = _DATE_TERM.match(term)
+    if not match:
+        return None
+    year, month, day = (int(g) if g else None for g in match.groups())
+    try:
+        if day is not None:
+            start = datetime(year, month, day, tzinfo=timezone.utc)
+            end = start.timestamp() + 86400
+        elif month is not None:
+            start = datetime(year, month, 1, tzinfo=timezone.utc)
+            end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc).timestamp()
+        else:
+            start = datetime(year, 1, 1, tzinfo=timezone.utc)
+            end = datetime(year + 1, 1, 1, tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return None
+    return start.timestamp(), end
+
+
+class Query:
+    """A parsed search string."""
+
+    def __init__(self, text):
+        self.words = []          # exact label tokens
+        self.prefix = None       # last word while it's still being typed
+        self.version = None      # version number string
+        self.start = None        # epoch range [start, end)
+        self.end = None
+        terms = (text or "").split()
+        for i, term in enumerate(terms):
+            lowered = term.lower()
+            key, _, value = lowered.partition(':')
+            if value and key in ('after', 'before', 'date'):
+                span = _date_span(value)
+                if span is not None:
+                    if key in ('after', 'date'):
+                        self._narrow(span[0], None)
+                    if key in ('before', 'date'):
+                        self._narrow(None, span[0] if key == 'before' else span[1])
+                    continue
+            version = _VERSION_TERM.match(lowered)
+            if version:
+                self.version = version.group(1)
+                continue
+            span = _date_span(lowered)
+            if span is not None and '-' in lowered:
+                self._narrow(*span)
+                continue
+            tokens = tokenize(term)
+            if tokens and i == len(terms) - 1 and not text[-1:].isspace():
+                self.prefix = tokens.pop()
+            self.words.extend(tokens)
+
+    def _narrow(self, start, end):
+        if start is not None:
+            self.start = start if self.start is None else max(self.start, start)
+        if end is not None:
+            self.end = end if self.end is None else min(self.end, end)
+
+
+class HistoryIndex:
+    """Search index over a newest-first version list; see module docstring."""
+
+    def __init__(self, history=()):
+        self._reset()
+        self.source = None       # the list last indexed (identity check for sync)
+        self.sync(list(history))
+
+    def _reset(self):
+        self._versions = {}      # seq -> version dict
+        self._tokens = {}        # seq -> tuple of label tokens
+        self._texts = {}         # seq -> ' token token ' for substring checks
+        self._epochs = {}        # seq -> epoch or None
+        self._ids = {}           # version id -> seq
+        self._numbers = {}       # version number (str) -> seq
+        self._postings = {}      # token -> ascending list of seqs
+        self._vocabulary = []    # sorted tokens, for prefix ranges
+        self._times = []         # sorted (epoch, seq)
+        self._time_ordered = True  # timestamps never decrease with seq (the usual case)
+        self._sets = {}          # id(posting list) -> (list, frozenset) for large lists
+        self._next_seq = 0
+
+    def __len__(self):
+        return len(self._versions)
+
+    # -- maintenance --------------------------------------------------------
+
+    def _add(self, version, bulk=False):
+        """Index a version newer than everything indexed so far. bulk=True leaves sorting to the caller."""
+        seq = self._next_seq
+        self._next_seq += 1
+        self._versions[seq] = version
+        vid = version.get('id')
+        if vid is not None:
+            self._ids[vid] = seq
+        self._numbers[str(version.get('versionNumber'))] = seq
+        self._index_time(seq, version, bulk)
+        self._index_words(seq, _searchable_text(version), bulk)
+
+    def _index_time(self, seq, version, bulk=False):
+        epoch = parse_timestamp(version.get('timestamp'))
+        self._epochs[seq] = epoch
+        if epoch is not None:
+            if self._times and epoch < self._times[-1][0]:
+                self._time_ordered = False
+            if bulk:
+                self._times.append((epoch, seq))
+            else:
+                insort(self._times, (epoch, seq))
+
+    def _unindex_time(self, seq):
+        epoch = self._epochs.pop(seq, None)
+        if epoch is not None:
+            del self._times[bisect_left(self._times, (epoch, seq))]
+
+    def _index_words(self, seq, text, bulk=False):
+        tokens = tuple(dict.fromkeys(tokenize(text)))
+        self._tokens[seq] = tokens
+        self._texts[seq] = ' ' + ' '.join(tokens) + ' '
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                self._postings[token] = [seq]
+                if bulk:
+                    self._vocabulary.append(token)
+                else:
+                    insort(self._vocabulary, token)
+            else:
+                self._sets.pop(id(postings), None)
+                if postings[-1] < seq:
+                    postings.append(seq)
+                else:
+                    insort(postings, seq)
+
+    def _unindex_words(self, seq):
+        for token in self._tokens.pop(seq, ()):
+            postings = self._postings[token]
+            self._sets.pop(id(postings), None)
+            del postings[bisect_left(postings, seq)]
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def reindex(self, version):
+        """Replace an already indexed version (matched by id) and re-index its words, number and time."""
+        seq = self._ids.get(version.get('id'))
+        if seq is None:
+            return False
+        old, self._versions[seq] = self._versions[seq], version
+        if tuple(dict.fromkeys(tokenize(_searchable_text(version)))) != self._tokens.get(seq):
+            self._unindex_words(seq)
+            self._index_words(seq, _searchable_text(version))
+        number = str(version.get('versionNumber'))
+        if number != str(old.get('versionNumber')):
+            if self._numbers.get(str(old.get('versionNumber'))) == seq:
+                del self._numbers[str(old.get('versionNumber'))]
+            self._numbers[number] = seq
+        if version.get('timestamp') != old.get('timestamp'):
+            self._unindex_time(seq)
+            self._index_time(seq, version)
+            self._time_ordered = False    # no longer known to follow seq order
+        return True
+
+    def sync(self, history):
+        """
+        Bring the index up to date with history (newest first). Versions added on
+        top are indexed incrementally and changed entries (a new dict for the same
+        id) re-indexed; anything else (removals, reordering) rebuilds the index.
+        """
+        if history is self.source:
+            return
+        added = len(history) - len(self._versions)
+        # seqs are 0..n-1 in arrival order, so newest first is simply descending seq
+        ordered = [self._versions[seq] for seq in range(self._next_seq - 1, -1, -1)]
+        if added < 0 or any(old is not new and old.get('id') != new.get('id')
+                            for old, new in zip(ordered, history[added:])):
+            self._reset()
+            added = len(history)
+            ordered = []
+        for old, new in zip(ordered, history[added:]):
+            if old is not new:
+                self.reindex(new)
+        bulk = added > 64
+        for version in reversed(history[:added]):
+            self._add(version, bulk)
+        if bulk:
+            self._vocabulary.sort()
+            self._times.sort()
+        self.source = history
+
+    # -- queries ------------------------------------------------------------
+
+    def _prefix_tokens(self, prefix):
+        lo = bisect_left(self._vocabulary, prefix)
+        hi = bisect_left(self._vocabulary, prefix + '\uffff', lo)
+        return self._vocabulary[lo:hi]
+
+    def search(self, text, limit=None):
+        """Return versions matching text, newest first (at most limit)."""
+        query = text if isinstance(text, Query) else Query(text)
+        matches = self._predicate(query)
+        if query.version is not None:
+            seq = self._numbers.get(query.version)
+            return [self._versions[seq]] if seq is not None and matches(seq) else []
+
+        # Candidate sources: (size, ascending seqs, or None for the prefix's tokens)
+        sources = []
+        for word in query.words:
+            postings = self._postings.get(word)
+            if postings is None:
+                return []
+            sources.append((len(postings), postings))
+        prefix_tokens = ()
+        if query.prefix:
+            prefix_tokens = self._prefix_tokens(query.prefix)
+            if not prefix_tokens:
+                return []
+            size = sum(len(self._postings[t]) for t in prefix_tokens[:_PREFIX_MERGE_TOKENS + 1])
+            sources.append((min(size, self._next_seq), None))
+        if query.start is not None or query.end is not None:
+            in_range = self._seqs_in_range(query.start, query.end)
+            if not in_range:
+                return []
+            sources.append((len(in_range), in_range))
+        sources.sort(key=lambda source: source[0])
+
+        # Walk the smallest source newest-first checking the rest per version: dense
+        # matches finish within a few steps, sparse ones switch to set intersection
+        if not sources:
+            driver = range(self._next_seq - 1, -1, -1)
+        elif sources[0][1] is not None:
+            driver = reversed(sources[0][1])
+        elif len(prefix_tokens) <= _PREFIX_MERGE_TOKENS:
+            driver = self._merged_descending(prefix_tokens)
+        else:
+            driver = range(self._next_seq - 1, -1, -1)
+        budget = _SCAN_BUDGET if len(sources) > 1 else None
+        results = []
+        for scanned, seq in enumerate(driver, 1):
+            if matches(seq):
+                results.append(self._versions[seq])
+                if limit is not None and len(results) >= limit:
+                    return results
+            if scanned == budget:
+                return self._intersect(matches, sources, prefix_tokens, limit)
+        return results
+
+    def _predicate(self, query):
+        """Return matches(seq) checking every condition of query."""
+        words = query.words
+        prefix = ' ' + query.prefix if query.prefix else None
+        start, end = query.start, query.end
+        texts, epochs = self._texts, self._epochs
+
+        def matches(seq):
+            text = texts[seq]
+            for word in words:
+                if f' {word} ' not in text:
+                    return False
+            if prefix is not None and prefix not in text:
+                return False
+            if start is not None or end is not None:
+                epoch = epochs[seq]
+                if epoch is None or (start is not None and epoch < start) or (end is not None and epoch >= end):
+                    return False
+            return True
+        return matches
+
+    def _intersect(self, matches, sources, prefix_tokens, limit):
+        """All matches via set intersection, smallest source first; for queries few versions match."""
+        candidates = None
+        for size, seqs in sources:
+            if candidates is not None and len(candidates) * 4 <= size:
+                break   # cheaper to check what's left per candidate
+            if seqs is None and candidates is not None and len(prefix_tokens) <= _PREFIX_MERGE_TOKENS:
+                # Intersect per token rather than building the prefix's (possibly large) union
+                candidates = set(candidates) if not isinstance(candidates, (set, frozenset)) else candidates
+                candidates = set().union(*(candidates.intersection(self._as_set(self._postings[t]))
+                                           for t in prefix_tokens))
+                if not candidates:
+                    return []
+                continue
+            seqs = self._prefix_set(prefix_tokens) if seqs is None else self._as_set(seqs)
+            if candidates is None:
+                candidates = seqs
+            elif isinstance(seqs, (set, frozenset)):
+                candidates = candidates & seqs if isinstance(candidates, (set, frozenset)) else seqs.intersection(candidates)
+            else:
+                candidates = set(candidates).intersection(seqs)
+            if not candidates:
+                return []
+        found = sorted((seq for seq in candidates if matches(seq)), reverse=True)
+        return [self._versions[seq] for seq in found[:limit]]
+
+    def _as_set(self, seqs):
+        """A set view of a long posting list (cached until the list changes); short lists and ranges as-is."""
+        if isinstance(seqs, range) or len(seqs) < _SET_CACHE_MIN:
+            return seqs
+        cached = self._sets.get(id(seqs))
+        if cached is None or cached[0] is not seqs:
+            cached = self._sets[id(seqs)] = (seqs, frozenset(seqs))
+        return cached[1]
+
+    def _prefix_set(self, tokens):
+        if len(tokens) == 1:
+            return self._as_set(self._postings[tokens[0]])
+        return set().union(*(self._postings[t] for t in tokens))
+
+    def _merged_descending(self, tokens):
+        """Seqs having any of tokens, newest first, merged lazily from their posting lists."""
+        previous = None
+        for seq in heapq.merge(*(reversed(self._postings[t]) for t in tokens), reverse=True):
+            if seq != previous:
+                previous = seq
+                yield seq
+
+    def _seqs_in_range(self, start, end):
+        """Seqs whose timestamp is in [start, end): a range when timestamps follow arrival order."""
+        lo = 0 if start is None else bisect_left(self._times, (start, -1))
+        hi = len(self._times) if end is None else bisect_left(self._times, (end, -1))
+        if lo >= hi:
+            return ()
+        if self._time_ordered:
+            return range(self._times[lo][1], self._times[hi - 1][1] + 1)
+        return sorted(seq for _, seq in self._times[lo:hi])
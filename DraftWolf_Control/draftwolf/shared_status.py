@@ -0,0 +1,248 @@
+"""
+Cross-process status sharing between concurrent Blender instances.
+
+One instance (the leader, whoever holds an OS file lock under the user runtime
+dir) polls the app and publishes a snapshot file; the others only stat/read it.
+Project roots and history-change revisions are shared the same way, so the
+app's request rate stays flat however many Blender sessions are open.
+"""
+
+import getpass
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from .constants import SHARED_ROOT_TTL, SHARED_STATUS_STALE_AFTER
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+STATUS_FILE = "status.json"
+ROOTS_FILE = "roots.json"
+LEADER_LOCK = "leader.lock"
+ROOTS_LOCK = "roots.lock"
+CHANGES_DIR = "changes"
+
+
+def user_runtime_dir():
+    """Per-user runtime directory for DraftWolf coordination files (created on demand)."""
+    if sys.platform == "win32":
+        base = os.path.join(os.environ.get("LOCALAPPDATA") or tempfile.gettempdir(), "DraftWolf", "run")
+    elif os.environ.get("XDG_RUNTIME_DIR"):
+        base = os.path.join(os.environ["XDG_RUNTIME_DIR"], "draftwolf")
+    else:
+        try:
+            user = getpass.getuser()
+        except Exception:
+            user = str(os.getuid()) if hasattr(os, "getuid") else "user"
+        base = os.path.join(tempfile.gettempdir(), f"draftwolf-{user}")
+    os.makedirs(base, mode=0o700, exist_ok=True)
+    return base
+
+
+def _try_lock(fd):
+    """Non-blocking exclusive lock on fd. Returns True if acquired."""
+    try:
+        if sys.platform == "win32":
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _lock_blocking(fd):
+    if sys.platform == "win32":
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+    else:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+
+def _unlock(fd):
+    try:
+        if sys.platform == "win32":
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    except OSError:
+        pass
+
+
+def _write_json_atomic(path, data):
+    """Write JSON next to path and rename over it, so readers never see a torn file."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# mtimes of change markers written by this process, so it doesn't react to its own notifications
+_own_changes = {}
+
+
+def history_root_key(root):
+    """Stable file name for root's history-change marker."""
+    return hashlib.sha1(os.path.normcase(os.path.abspath(root)).encode("utf-8")).hexdigest()[:16]
+
+
+class StatusCoordinator:
+    """Leader election plus snapshot publish/read for one Blender process."""
+
+    def __init__(self, directory=None):
+        self.directory = directory or user_runtime_dir()
+        self.status_path = os.path.join(self.directory, STATUS_FILE)
+        self.changes_dir = os.path.join(self.directory, CHANGES_DIR)
+        self.is_leader = False
+        self._lock_fd = None
+        self._snapshot = None
+        self._snapshot_mtime = None
+        self._seen_revisions = {}
+        self._scanned = False
+
+    def try_lead(self):
+        """Become (or stay) leader if no other live process holds the lock."""
+        if self.is_leader:
+            return True
+        if self._lock_fd is None:
+            try:
+                self._lock_fd = os.open(os.path.join(self.directory, LEADER_LOCK), os.O_RDWR | os.O_CREAT, 0o600)
+            except OSError:
+                return False
+        self.is_leader = _try_lock(self._lock_fd)
+        return self.is_leader
+
+    def release(self):
+        """Give up leadership (the OS also releases the lock if the process dies)."""
+        if self._lock_fd is not None:
+            if self.is_leader:
+                _unlock(self._lock_fd)
+            os.close(self._lock_fd)
+        self._lock_fd = None
+        self.is_leader = False
+
+    def publish(self, app_running, is_logged_in, username, history_events=False, history_revisions=None):
+        _write_json_atomic(self.status_path, {
+            "app_running": app_running,
+            "is_logged_in": is_logged_in,
+            "username": username,
+            "history_events": history_events,
+            "history_revisions": history_revisions,
+            "updated": time.time(),
+            "leader_pid": os.getpid(),
+        })
+
+    def read(self):
+        """Return the latest snapshot if fresh, else None. Re-reads the file only when its mtime changes."""
+        try:
+            mtime = os.stat(self.status_path).st_mtime_ns
+        except OSError:
+            return None
+        if mtime != self._snapshot_mtime:
+            self._snapshot = _read_json(self.status_path)
+            self._snapshot_mtime = mtime
+        snap = self._snapshot
+        if not snap or time.time() - snap.get("updated", 0) > SHARED_STATUS_STALE_AFTER:
+            return None
+        return snap
+
+    def cycle(self, poll):
+        """
+        One coordination step. The leader calls poll() -> (app_running, is_logged_in, username,
+        history_events, history_revisions) and publishes it; followers return the shared snapshot,
+        falling back to poll() when it is stale (e.g. the leader is hung).
+        Returns (status_tuple, polled).
+        """
+        if self.try_lead():
+            status = poll()
+            self.publish(*status)
+            return status, True
+        snap = self.read()
+        if snap is None:
+            return poll(), True
+        return (snap.get("app_running", False), snap.get("is_logged_in", False), snap.get("username"),
+                snap.get("history_events", False), snap.get("history_revisions")), False
+
+    def changed_history_roots(self):
+        """Return project-root keys whose history revision changed since the last call."""
+        changed = []
+        try:
+            entries = list(os.scandir(self.changes_dir))
+        except OSError:
+            return changed
+        for entry in entries:
+            if entry.name.endswith(".tmp"):
+                continue
+            try:
+                mtime = entry.stat().st_mtime_ns
+            except OSError:
+                continue
+            previous = self._seen_revisions.get(entry.name)
+            self._seen_revisions[entry.name] = mtime
+            if self._scanned and previous != mtime and _own_changes.get(entry.name) != mtime:
+                changed.append(entry.name)
+        self._scanned = True
+        return changed
+
+
+def notify_history_changed(root, directory=None):
+    """Tell other instances that root's history changed (commit, rename, ...)."""
+    if not root:
+        return
+    try:
+        changes_dir = os.path.join(directory or user_runtime_dir(), CHANGES_DIR)
+        os.makedirs(changes_dir, exist_ok=True)
+        key = history_root_key(root)
+        marker = os.path.join(changes_dir, key)
+        _write_json_atomic(marker, {"root": root, "time": time.time()})
+        _own_changes[key] = os.stat(marker).st_mtime_ns
+    except OSError as e:
+        print(f"DraftWolf: could not publish history change: {e}")
+
+
+def lookup_shared_root(dir_path, directory=None):
+    """Return (found, root) for dir_path from the shared roots file."""
+    try:
+        data = _read_json(os.path.join(directory or user_runtime_dir(), ROOTS_FILE)) or {}
+    except OSError:
+        return False, None
+    entry = data.get(dir_path)
+    if not entry or time.time() - entry.get("time", 0) > SHARED_ROOT_TTL:
+        return False, None
+    return True, entry.get("root")
+
+
+def publish_shared_root(dir_path, root, directory=None):
+    """Record dir_path -> root for other instances (short lock-protected read-modify-write)."""
+    try:
+        directory = directory or user_runtime_dir()
+        fd = os.open(os.path.join(directory, ROOTS_LOCK), os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError:
+        return
+    try:
+        _lock_blocking(fd)
+        path = os.path.join(directory, ROOTS_FILE)
+        now = time.time()
+        data = {k: v for k, v in (_read_json(path) or {}).items() if now - v.get("time", 0) <= SHARED_ROOT_TTL}
+        data[dir_path] = {"root": root, "time": now}
+        _write_json_atomic(path, data)
+    except OSError as e:
+        print(f"DraftWolf: could not publish project root: {e}")
+    finally:
+        _unlock(fd)
+        os.close(fd)
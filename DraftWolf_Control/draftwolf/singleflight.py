@@ -0,0 +1,114 @@
+"""
+Single-flight coalescing of identical concurrent API calls.
+
+Several viewports drawing the panel and the status worker can ask for the same
+/draft/find-root or /draft/history at the same moment. A call whose endpoint and
+payload (canonical JSON: sorted keys, no whitespace) match one already in flight
+doesn't go out: it waits for that call and gets its result. Followers receive the
+same result object as the leader, so callers treat responses as read-only; if the
+call raises, they raise the same exception.
+
+Only idempotent endpoints (policy.py) coalesce; endpoints in SINGLE_FLIGHT_EXEMPT
+never do. A mutating request detaches the calls in flight when it completes, so a
+read started after a commit, rename or restore never gets a reply that predates it.
+"""
+
+import json
+import threading
+
+from .constants import SINGLE_FLIGHT_EXEMPT
+
+_canonical = json.JSONEncoder(sort_keys=True, separators=(",", ":")).encode
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = None     # created when the first follower arrives; most calls have none
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """In-flight calls keyed by endpoint and payload; see module docstring."""
+
+    def __init__(self, exempt=SINGLE_FLIGHT_EXEMPT):
+        self.enabled = True
+        self.exempt = set(exempt)
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.sent = 0                 # calls that went out
+            self.coalesced = {}           # endpoint -> calls answered by another call's reply
+            self.detached = 0             # in-flight calls a mutation made unjoinable
+
+    @staticmethod
+    def key(endpoint, data):
+        return endpoint if data is None else endpoint + "\n" + _canonical(data)
+
+    def coalesces(self, endpoint):
+        from .policy import policy_for
+        path = endpoint.split('?', 1)[0]
+        return self.enabled and path not in self.exempt and policy_for(path).idempotent
+
+    def do(self, endpoint, data, function):
+        """function() for the first caller with this endpoint and payload; the same result for the others meanwhile."""
+        key = self.key(endpoint, data)
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self.sent += 1
+                leader = True
+            else:
+                if flight.done is None:
+                    flight.done = threading.Event()
+                self.coalesced[endpoint] = self.coalesced.get(endpoint, 0) + 1
+                leader = False
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = function()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                done = flight.done
+            if done is not None:
+                done.set()
+        return flight.result
+
+    def detach(self):
+        """Start fresh calls from now on; the ones in flight still answer their current followers."""
+        with self._lock:
+            self.detached += len(self._flights)
+            self._flights.clear()
+
+    def stats(self):
+        with self._lock:
+            saved = sum(self.coalesced.values())
+            return {
+                'calls': self.sent + saved,
+                'sent': self.sent,
+                'saved': saved,
+                'saved_by_endpoint': dict(self.coalesced),
+                'in_flight': len(self._flights),
+                'detached': self.detached,
+            }
+
+
+single_flight = SingleFlight()
+
+
+def stats():
+    return single_flight.stats()
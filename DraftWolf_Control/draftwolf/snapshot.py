@@ -0,0 +1,234 @@
+"""
+Safety snapshots of the working file before a restore overwrites it, and undo of the restore.
+
+A snapshot goes to SNAPSHOT_DIR_NAME next to the file (same filesystem) and is made
+with the cheapest method the filesystem supports:
+
+- reflink (Linux FICLONE ioctl: btrfs, XFS, bcachefs...): a copy-on-write clone,
+  instant and sharing all blocks until one side changes;
+- hardlink: instant and free, but only safe while the restore replaces the file
+  rather than writing into it. Delta restores (files of DELTA_MIN_SIZE and up)
+  swap a new file in; before a full /draft/restore, which may write in place,
+  unshare() turns a hardlinked snapshot into a copy;
+- sparse copy: only the file's data extents are copied (os.copy_file_range where
+  available, so the kernel copies), and its holes stay holes.
+
+Undo swaps the latest snapshot back in, after snapshotting the restored file, so
+an undo can be undone the same way. Snapshots older than SNAPSHOT_MAX_AGE, or
+beyond the newest SNAPSHOT_KEEP of a file, are removed whenever one is taken.
+"""
+
+import errno
+import os
+import shutil
+import time
+
+from .constants import DELTA_MIN_SIZE, SNAPSHOT_DIR_NAME, SNAPSHOT_KEEP, SNAPSHOT_MAX_AGE
+from .state import SnapshotState
+
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+COPY_CHUNK = 8 * 1024 * 1024
+
+
+def snapshot_dir(path):
+    return os.path.join(os.path.dirname(path), SNAPSHOT_DIR_NAME)
+
+
+def _snapshot_name(path):
+    stem, ext = os.path.splitext(os.path.basename(path))
+    now = time.time()
+    return f"{stem}@{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{int(now * 1000) % 1000:03d}{ext}"
+
+
+def _parse_name(snapshot_name):
+    """'shot@20240315-101500-123.blend' -> ('shot.blend', creation time), or None if it isn't a snapshot."""
+    stem, ext = os.path.splitext(snapshot_name)
+    original, sep, stamp = stem.rpartition("@")
+    if not (sep and original) or len(stamp) != 19:
+        return None
+    try:
+        created = time.mktime(time.strptime(stamp[:15], '%Y%m%d-%H%M%S'))
+    except ValueError:
+        return None
+    return original + ext, created
+
+
+def _original_name(snapshot_name):
+    parsed = _parse_name(snapshot_name)
+    return parsed[0] if parsed else None
+
+
+def _reflink(src, dst):
+    import fcntl
+    with open(src, "rb") as s:
+        fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            fcntl.ioctl(fd, FICLONE, s.fileno())
+        except BaseException:
+            os.close(fd)
+            os.remove(dst)
+            raise
+        os.close(fd)
+    shutil.copystat(src, dst)
+
+
+def _extents(fd, size):
+    """(offset, length) of the data in fd, skipping holes; the whole file if the OS can't tell."""
+    if not hasattr(os, "SEEK_DATA"):
+        yield 0, size
+        return
+    offset = 0
+    while offset < size:
+        try:
+            start = os.lseek(fd, offset, os.SEEK_DATA)
+        except OSError as e:
+            if e.errno == errno.ENXIO:    # only a hole is left
+                return
+            if offset == 0:
+                yield 0, size
+                return
+            raise
+        end = os.lseek(fd, start, os.SEEK_HOLE)
+        yield start, end - start
+        offset = end
+
+
+def _copy_extent(s, d, offset, length):
+    if hasattr(os, "copy_file_range"):
+        try:
+            while length:
+                n = os.copy_file_range(s, d, min(length, COPY_CHUNK), offset, offset)
+                if not n:
+                    return
+                offset += n
+                length -= n
+            return
+        except OSError:
+            pass    # e.g. across filesystems; copy what is left in user space
+    while length:
+        data = os.pread(s, min(length, COPY_CHUNK), offset)
+        if not data:
+            return
+        os.pwrite(d, data, offset)
+        offset += len(data)
+        length -= len(data)
+
+
+def sparse_copy(src, dst):
+    """Copy src's data extents to dst; its holes stay holes in the copy."""
+    with open(src, "rb", buffering=0) as s, open(dst, "wb", buffering=0) as d:
+        size = os.fstat(s.fileno()).st_size
+        for offset, length in _extents(s.fileno(), size):
+            _copy_extent(s.fileno(), d.fileno(), offset, length)
+        d.truncate(size)    # a trailing hole still sets the size
+    shutil.copystat(src, dst)
+
+
+def take(path, version_id=None, expire_old=True):
+    """
+    Snapshot the file at path before it is restored to version_id. Returns the record kept
+    in SnapshotState.last (path, snapshot, method, versionId, created, seconds), or None if
+    there is no file. Raises OSError if no method worked.
+    """
+    if not os.path.isfile(path):
+        return None
+    start = time.perf_counter()
+    directory = snapshot_dir(path)
+    os.makedirs(directory, exist_ok=True)
+    target = os.path.join(directory, _snapshot_name(path))
+    method = None
+    try:
+        _reflink(path, target)
+        method = 'reflink'
+    except (ImportError, OSError):
+        pass
+    if method is None and os.path.getsize(path) >= DELTA_MIN_SIZE:
+        try:
+            os.link(path, target)
+            method = 'hardlink'
+        except OSError:
+            pass
+    if method is None:
+        sparse_copy(path, target)
+        method = 'copy'
+    record = {'path': path, 'snapshot': target, 'method': method, 'versionId': version_id,
+              'created': time.time(), 'seconds': round(time.perf_counter() - start, 4)}
+    SnapshotState.last = record
+    if expire_old:
+        expire(directory)
+    return record
+
+
+def unshare(path):
+    """Before path is written in place: give a hardlinked snapshot of it its own copy."""
+    record = SnapshotState.last
+    if not record or record['method'] != 'hardlink' or record['path'] != path:
+        return
+    try:
+        if not os.path.samefile(path, record['snapshot']):
+            return
+        temp = record['snapshot'] + ".tmp"
+        sparse_copy(path, temp)
+        os.replace(temp, record['snapshot'])
+        record['method'] = 'copy'
+    except OSError as e:
+        print(f"DraftWolf: could not copy the snapshot of {path}: {e}")
+
+
+def snapshots_of(path):
+    """Snapshots of path, newest first."""
+    directory = snapshot_dir(path)
+    name = os.path.basename(path)
+    try:
+        entries = [e for e in os.scandir(directory) if e.is_file() and _original_name(e.name) == name]
+    except OSError:
+        return []
+    return [e.path for e in sorted(entries, key=lambda e: e.name, reverse=True)]
+
+
+def latest(path):
+    found = snapshots_of(path)
+    return found[0] if found else None
+
+
+def undo(path):
+    """
+    Put the latest snapshot of path back, keeping the current file as a new snapshot.
+    Returns the snapshot that was restored; raises OSError if there is none or it fails.
+    """
+    previous = latest(path)
+    if previous is None:
+        raise FileNotFoundError(f"No snapshot of {os.path.basename(path)}")
+    current = take(path, expire_old=False) if os.path.isfile(path) else None
+    os.replace(previous, path)
+    if current is not None:
+        current['undo'] = True
+    expire(snapshot_dir(path))
+    return previous
+
+
+def expire(directory, now=None):
+    """Remove snapshots older than SNAPSHOT_MAX_AGE and all but the newest SNAPSHOT_KEEP per file."""
+    now = time.time() if now is None else now
+    groups = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                parsed = _parse_name(entry.name)
+                if parsed is not None and entry.is_file():
+                    groups.setdefault(parsed[0], []).append((entry.name, parsed[1], entry.path))
+    except OSError:
+        return 0
+    removed = 0
+    for entries in groups.values():
+        entries.sort(reverse=True)
+        for rank, (_name, created, path) in enumerate(entries):
+            # Creation time from the name: copies keep the file's mtime, hardlinks share it
+            if rank >= SNAPSHOT_KEEP or now - created > SNAPSHOT_MAX_AGE:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+    return removed
@@ -1,9 +1,13 @@
 """Global state, caches, and background status worker."""
 
-import time
 import threading
 
 from .api import send_request
+from .constants import (
+    SHARED_STATUS_ENABLED,
+    SHARED_STATUS_FOLLOW_INTERVAL,
+    STATUS_POLL_INTERVAL,
+)
 
 
 class SafeVersionList:
@@ -11,9 +15,25 @@ class SafeVersionList:
     items = []
     full_history = None
     show_versions = False
-    last_fetch_time = 0
-    fetch_interval = 10.0
     current_filepath = None
+    search_key = None       # (query, history) the panel's cached search results belong to
+    search_results = None
+    dialog_index = None     # search.HistoryIndex for the open restore dialog
+    dialog_items = ()       # (query, enum items) for the filtered restore dialog; kept alive for Blender
+    selected = {}           # version id -> selection order, for batch operations
+
+
+class HistoryStore:
+    """Per-project history cache shared by panel, restore dialog and rename (see history.py)."""
+    entries = {}      # project root -> {'history': list or None, 'time': float, 'filtered': {basename: list}}
+    inflight = {}     # project root -> threading.Event set when the running fetch finishes
+    listeners = []    # callables(root) notified when a project's history changes
+    reconcile_timers = {}  # project root -> scheduler.Task refetching after a local update
+    revisions = None  # project root -> history revision the app last reported in /health
+    reverted = None   # {'root', 'problems'}: local changes the app didn't apply, shown until the next refresh
+    lock = threading.Lock()
+    max_age = 10.0    # seconds before a cached history is revalidated in the background
+    event_max_age = 600.0  # the same while the app reports revisions (only a backstop for a missed change)
 
 
 class StatusCache:
@@ -21,18 +41,29 @@ class StatusCache:
     app_running = False
     is_logged_in = False
     username = None
-    thread_running = False
-    thread = None
+    thread_running = False   # True once the background scheduler and status task are started
     last_draw_time = 0
     cached_is_saved = False
     cached_is_initialized = False
     cached_filepath = None
+    coordinator = None     # shared_status.StatusCoordinator while the status task runs
+    coordinator_checked = False
+    history_events = False  # True while the app reports history revisions in /health (see history.py)
 
 
 class RootCache:
     """Cache for project root discovery."""
     cache = {}
     duration = 30.0
+    event_duration = 600.0  # while the app reports history revisions, which announce new projects
+
+
+class HandlerState:
+    """bpy.app.handlers-driven invalidation and prefetch (see handlers.py)."""
+    registered = False
+    saving_from = None     # filepath when the save in progress started (save_pre), to spot Save As
+    dirty = False          # bpy.data.is_dirty as last seen by depsgraph_update_post
+    prefetches = 0         # load/save prefetches started
 
 
 class UpdateState:
@@ -45,6 +76,54 @@ class UpdateState:
     error_message = None   # Set if last check failed
 
 
+class RetentionState:
+    """Dry-run retention plan shown in the panel until applied or dismissed (see retention.py)."""
+    plan = None            # retention.RetentionPlan
+    filepath = None        # file the plan was made for
+    history = None         # the file history list it was computed from (stale once replaced)
+
+
+class PullState:
+    """A past version whose datablocks are offered for pulling into the open file (see pull.py)."""
+    filepath = None        # open file the pull is for
+    version_id = None
+    version_label = None
+    path = None            # the version's .blend in the pull cache
+    listing = None         # category -> datablock names, once the file is fetched and read
+    pending = False        # fetching the version's file
+    error = None
+
+
+class RenderState:
+    """Frames of the render in progress and the outcome of versioning the last one (see render.py)."""
+    frames = []            # output paths written so far by the current render
+    hashes = {}            # path -> Future of its digest, when frames are hashed as they are written
+    started = 0.0
+    last = None            # RenderJob of the last finished or cancelled render
+    pending = False        # a render is being hashed/committed
+    last_result = None     # dict from the last render commit
+
+
+class SnapshotState:
+    """The snapshot taken before the last restore (or undo) in this session; see snapshot.py."""
+    last = None            # dict: path, snapshot, method, versionId, created, seconds
+
+
+class IntegrityState:
+    """Results of verifying restored/committed files against their version digests (see integrity.py)."""
+    pending = 0            # checks queued or running
+    last_result = None     # dict from the most recent check
+    failures = []          # result dicts of files that didn't match, shown in the panel
+
+
+class ProfilingState:
+    """Opt-in profiling mode (see profiling.py)."""
+    enabled = False
+    enabled_at = 0.0
+    capturing = False      # True during a cProfile/tracemalloc capture window
+    last_export = None     # path of the last trace/profile written
+
+
 def check_app_status():
     """Return latest known app status from background thread."""
     return StatusCache.app_running
@@ -62,66 +141,150 @@ def _truncate_username(uname: str, max_display: int = 15) -> str:
     return uname[:12] + "..."
 
 
-def _apply_auth_status(auth_res):
-    """Update StatusCache from auth/status response. Call when app is running."""
+def parse_auth_status(auth_res):
+    """(logged_in, username) from an /auth/status response (username is None when logged out)."""
     if not auth_res:
-        StatusCache.is_logged_in = False
-        StatusCache.username = None
-        return
+        return False, None
     # Accept both camelCase (loggedIn) and snake_case (logged_in); treat username as logged-in hint
     logged_in = auth_res.get('loggedIn', auth_res.get('logged_in', False))
     if not logged_in and auth_res.get('username'):
         # App may send username without loggedIn when session is valid
         logged_in = True
     if not logged_in:
+        return False, None
+    return True, auth_res.get('username', 'User')
+
+
+def _apply_auth_status(auth_res):
+    """Update StatusCache from auth/status response. Call when app is running."""
+    logged_in, username = parse_auth_status(auth_res)
+    StatusCache.is_logged_in = logged_in
+    StatusCache.username = _truncate_username(username) if logged_in else None
+
+
+def _poll_app_status():
+    """
+    Query /health and /auth/status, update StatusCache; return
+    (app_running, is_logged_in, username, history_events, history_revisions).
+    """
+    res = send_request('/health')
+    is_running = bool(res and res.get('success'))
+    StatusCache.app_running = is_running
+    if is_running:
+        from .transport import adopt_advertised_socket
+        adopt_advertised_socket(res)
+        _apply_auth_status(send_request('/auth/status'))
+        # Apps that report per-project history revisions let caches wait for a change instead of expiring
+        revisions = res.get('historyRevisions')
+        StatusCache.history_events = isinstance(revisions, dict)
+        if StatusCache.history_events:
+            from .history import apply_history_revisions
+            apply_history_revisions(revisions)
+        else:
+            revisions = None
+    else:
         StatusCache.is_logged_in = False
         StatusCache.username = None
+        StatusCache.history_events = False
+        revisions = None
+    return (StatusCache.app_running, StatusCache.is_logged_in, StatusCache.username,
+            StatusCache.history_events, revisions)
+
+
+def _make_coordinator():
+    """Create the cross-process coordinator, or None if sharing is disabled/unavailable."""
+    if not SHARED_STATUS_ENABLED:
+        return None
+    from .shared_status import StatusCoordinator
+    try:
+        return StatusCoordinator()
+    except OSError as e:
+        print(f"DraftWolf: shared status unavailable, polling locally: {e}")
+        return None
+
+
+def _refresh_changed_histories(coordinator):
+    """Refetch cached histories that another instance changed (runs on the scheduler thread)."""
+    from .shared_status import history_root_key
+    changed = coordinator.changed_history_roots()
+    if not changed:
         return
-    StatusCache.is_logged_in = True
-    StatusCache.username = _truncate_username(auth_res.get('username', 'User'))
+    from .history import fetch_project_history
+    for root in list(HistoryStore.entries):
+        if history_root_key(root) in changed:
+            fetch_project_history(root)
+
+
+def status_task():
+    """
+    Scheduled status poll (or follow another instance's poller). Returns the delay
+    until the next run: followers only stat the shared snapshot, so they check more often.
+    Followers apply the leader's history revisions to their own caches, which the leader
+    never sees, so the long event-driven TTLs hold in every instance.
+    """
+    if not StatusCache.coordinator_checked:
+        StatusCache.coordinator = _make_coordinator()
+        StatusCache.coordinator_checked = True
+    coordinator = StatusCache.coordinator
+    try:
+        if coordinator is None:
+            _poll_app_status()
+            return STATUS_POLL_INTERVAL
+        status, polled = coordinator.cycle(_poll_app_status)
+        if not polled:
+            (StatusCache.app_running, StatusCache.is_logged_in, StatusCache.username,
+             history_events, revisions) = status
+            # Without the revisions the caches would wait for events that never reach them
+            StatusCache.history_events = history_events and isinstance(revisions, dict)
+            if StatusCache.history_events:
+                from .history import apply_history_revisions
+                apply_history_revisions(revisions)
+        _refresh_changed_histories(coordinator)
+        return STATUS_POLL_INTERVAL if polled else SHARED_STATUS_FOLLOW_INTERVAL
+    except Exception as e:
+        print(f"Background check failed: {e}")
+        StatusCache.app_running = False
+        return STATUS_POLL_INTERVAL
 
 
-def _sleep_while_running(seconds: float, step: float = 0.1) -> None:
-    """Sleep in steps until seconds elapsed or thread_running becomes False."""
-    steps = max(0, int(seconds / step))
-    for _ in range(steps):
-        if not StatusCache.thread_running:
-            break
-        time.sleep(step)
+def ensure_background_started():
+    """Start the scheduler and the status task once. Called from the first panel draw or the startup timer, not register()."""
+    if StatusCache.thread_running:
+        return
+    StatusCache.thread_running = True
+    from .scheduler import PRIORITY_HIGH, scheduler, start_main_thread_drain
+    start_main_thread_drain()
+    scheduler.start()
+    scheduler.schedule("status", status_task, interval=STATUS_POLL_INTERVAL, priority=PRIORITY_HIGH)
 
 
-def status_worker():
-    """Background thread that polls app and login status."""
-    while StatusCache.thread_running:
-        try:
-            res = send_request('/health')
-            is_running = bool(res and res.get('success'))
-            StatusCache.app_running = is_running
+def invalidate_status_cache():
+    """Make the panel re-resolve saved/initialized state on its next draw (file loaded, project enabled, ...)."""
+    StatusCache.last_draw_time = 0
 
-            if is_running:
-                _apply_auth_status(send_request('/auth/status'))
-            else:
-                StatusCache.is_logged_in = False
-                StatusCache.username = None
 
-        except Exception as e:
-            print(f"Background check failed: {e}")
-            StatusCache.app_running = False
+def request_status_refresh():
+    """Poll the app now rather than at the next scheduled check (e.g. the refresh button)."""
+    if StatusCache.thread_running:
+        from .scheduler import scheduler
+        scheduler.run_soon("status")
 
-        _sleep_while_running(5.0)
+
+def stop_background():
+    """Stop the scheduler (waiting for a running task) and hand over status polling to other instances."""
+    StatusCache.thread_running = False
+    from .scheduler import shutdown
+    shutdown()
+    if StatusCache.coordinator is not None:
+        StatusCache.coordinator.release()
+    StatusCache.coordinator = None
+    StatusCache.coordinator_checked = False
 
 
 def run_once_sync_status():
     """One-off health + auth/status check; updates StatusCache. Safe to call from main thread (e.g. Blender timer)."""
     try:
-        res = send_request('/health')
-        is_running = bool(res and res.get('success'))
-        StatusCache.app_running = is_running
-        if is_running:
-            _apply_auth_status(send_request('/auth/status'))
-        else:
-            StatusCache.is_logged_in = False
-            StatusCache.username = None
+        _poll_app_status()
     except Exception as e:
         print(f"DraftWolf one-off sync failed: {e}")
         StatusCache.app_running = False
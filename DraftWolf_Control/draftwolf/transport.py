@@ -0,0 +1,152 @@
+"""
+Pluggable transports for the local API: HTTP over TCP or over a Unix domain socket.
+
+api.send_request talks to whatever get_transport() returns. The default is TCP to
+API_URL; a Unix socket is used instead when DRAFTWOLF_SOCKET is set or the app
+advertises one (``socketPath`` in its /health response or discovery file),
+falling back to TCP if the socket goes away. A port in the discovery file
+replaces API_PORT.
+"""
+
+import http.client
+import os
+import socket
+import threading
+import urllib.parse
+
+from .constants import API_SOCKET_ENV, API_URL, PREFER_UNIX_SOCKET
+
+HAS_UNIX_SOCKETS = hasattr(socket, "AF_UNIX")
+
+
+class TcpTransport:
+    """HTTP over TCP (the app's loopback port)."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+
+    @classmethod
+    def from_url(cls, url):
+        parts = urllib.parse.urlsplit(url)
+        return cls(parts.hostname or "127.0.0.1", parts.port or 80)
+
+    def connect(self, timeout):
+        return http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+
+    def request(self, method, path, body, headers, timeout):
+        """Send the request; return (connection, response). The caller reads the body and closes the connection."""
+        conn = self.connect(timeout)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            return conn, conn.getresponse()
+        except BaseException:
+            conn.close()
+            raise
+
+    def __repr__(self):
+        return f"TcpTransport({self.host}:{self.port})"
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+        except BaseException:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class UnixSocketTransport(TcpTransport):
+    """HTTP over an AF_UNIX socket; access is controlled by the socket file's permissions."""
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+
+    def connect(self, timeout):
+        return _UnixHTTPConnection(self.socket_path, timeout)
+
+    def request(self, method, path, body, headers, timeout):
+        try:
+            return super().request(method, path, body, headers, timeout)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            # The app stopped listening on the socket: go back to TCP for this and later calls
+            print(f"DraftWolf: socket {self.socket_path} unavailable ({e}); using TCP")
+            fallback = _tcp_fallback or default_transport()
+            set_transport(fallback)
+            return fallback.request(method, path, body, headers, timeout)
+
+    def __repr__(self):
+        return f"UnixSocketTransport({self.socket_path})"
+
+
+_lock = threading.Lock()
+_transport = None
+_tcp_fallback = None   # last TCP transport in use, restored if the socket disappears
+
+
+def default_transport():
+    return TcpTransport.from_url(API_URL)
+
+
+def _usable_socket(path):
+    return bool(path) and HAS_UNIX_SOCKETS and os.path.exists(path)
+
+
+def get_transport():
+    """Current transport (created on first use; honours DRAFTWOLF_SOCKET)."""
+    global _transport
+    if _transport is None:
+        with _lock:
+            if _transport is None:
+                env_socket = os.environ.get(API_SOCKET_ENV)
+                _transport = UnixSocketTransport(env_socket) if _usable_socket(env_socket) else default_transport()
+    return _transport
+
+
+def set_transport(transport):
+    """Replace the transport used by every API call (operators, status worker, ...)."""
+    global _transport, _tcp_fallback
+    with _lock:
+        _transport = transport
+        if not isinstance(transport, UnixSocketTransport):
+            _tcp_fallback = transport
+
+
+def adopt_advertised_socket(health_response):
+    """Switch to the app's Unix socket if its /health response advertises one we can reach."""
+    if not (PREFER_UNIX_SOCKET and isinstance(health_response, dict)):
+        return
+    path = health_response.get("socketPath") or health_response.get("socket")
+    current = get_transport()
+    if isinstance(current, UnixSocketTransport) and current.socket_path == path:
+        return
+    if _usable_socket(path):
+        set_transport(UnixSocketTransport(path))
+
+
+def use_app_endpoint(port, socket_path):
+    """
+    Point API calls at the socket or loopback port the app advertises in its discovery file.
+    Returns True if the transport changed. DRAFTWOLF_SOCKET, when set, always wins.
+    """
+    if os.environ.get(API_SOCKET_ENV):
+        return False
+    if PREFER_UNIX_SOCKET and _usable_socket(socket_path):
+        transport = UnixSocketTransport(socket_path)
+    elif isinstance(port, int) and 0 < port < 65536:
+        transport = TcpTransport("127.0.0.1", port)
+    else:
+        return False
+    if repr(get_transport()) == repr(transport):
+        return False
+    print(f"DraftWolf: app discovered at {transport!r}")
+    set_transport(transport)
+    return True
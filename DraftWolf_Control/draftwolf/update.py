@@ -1,12 +1,24 @@
 """
 Auto-update: check for a newer addon version from GitHub releases.
+
+Checks run on the background scheduler, never on Blender's main thread. The last
+result, its ETag and the check time are persisted, so later sessions show it
+immediately, honour UPDATE_CHECK_INTERVAL across restarts and revalidate with
+If-None-Match (an unchanged release costs a 304).
 """
 
 import json
+import os
 import re
-import urllib.request
+import time
 
-from .constants import CURRENT_VERSION, GITHUB_REPO
+from .constants import (
+    CURRENT_VERSION,
+    GITHUB_REPO,
+    UPDATE_CACHE_FILE,
+    UPDATE_CHECK_INTERVAL,
+    UPDATE_RELEASES_URL_ENV,
+)
 from .state import UpdateState
 
 
@@ -45,50 +57,151 @@ def is_newer(latest_tuple, current_tuple):
     return pad(latest_tuple, n) > pad(current_tuple, n)
 
 
-def fetch_latest_release():
+def releases_url():
+    """The 'latest release' API URL to check (DRAFTWOLF_RELEASES_URL overrides it), or None if checks are off."""
+    override = os.environ.get(UPDATE_RELEASES_URL_ENV)
+    if override:
+        return override
+    if not GITHUB_REPO:
+        return None
+    return f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
+
+
+def fetch_latest_release(etag=None):
     """
-    Fetch latest release from GitHub API.
-    Returns (version_tuple, release_url) or (None, None) on failure.
+    Fetch the latest release, conditionally if etag is given.
+    Returns (version_tuple, release_url, etag), or None if the release is unchanged (HTTP 304).
+    Raises OSError / ValueError on failure.
     """
-    if not GITHUB_REPO:
-        return None, None
-    url = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
+    import urllib.error
+    import urllib.request
+    url = releases_url()
     req = urllib.request.Request(url)
     req.add_header("Accept", "application/vnd.github.v3+json")
     req.add_header("User-Agent", "DraftWolf-Blender-Addon/1.0")
+    if etag:
+        req.add_header("If-None-Match", etag)
 
     try:
         with urllib.request.urlopen(req, timeout=10) as response:
             data = json.loads(response.read().decode("utf-8"))
-    except (OSError, ValueError) as e:
-        UpdateState.error_message = str(e)
-        return None, None
+            new_etag = response.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None
+        raise
 
     tag_name = data.get("tag_name") or ""
-    html_url = data.get("html_url") or f"https://github.com/{GITHUB_REPO}/releases"
-    version_tuple = parse_version(tag_name)
-    return version_tuple, html_url
+    fallback = f"https://github.com/{GITHUB_REPO}/releases" if GITHUB_REPO else None
+    html_url = data.get("html_url") or fallback
+    return parse_version(tag_name), html_url, new_etag
+
+
+def _cache_path():
+    """Where the last check's result is persisted (Blender's user config dir)."""
+    try:
+        import bpy
+        base = bpy.utils.user_resource('CONFIG', path="draftwolf", create=True)
+    except (ImportError, AttributeError, TypeError):
+        from .shared_status import user_runtime_dir
+        base = user_runtime_dir()
+    return os.path.join(base, UPDATE_CACHE_FILE)
+
+
+def load_cached_result():
+    """The persisted result of the last check ({} if none or unreadable)."""
+    try:
+        with open(_cache_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_cached_result(data):
+    """Write atomically so a concurrent reader (another Blender session) never sees a partial file."""
+    path = _cache_path()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"DraftWolf: could not save update check result: {e}")
+
+
+def _publish(result):
+    """Apply a check result to UpdateState in one step on the main thread, where the UI reads it."""
+    version = tuple(result["latest_version"]) if result.get("latest_version") else None
+    UpdateState.latest_version = version
+    UpdateState.release_url = result.get("release_url")
+    UpdateState.update_available = is_newer(version, CURRENT_VERSION)
+    UpdateState.last_check_time = result.get("checked_at", 0.0)
+    UpdateState.error_message = result.get("error")
+    UpdateState.checking = False
+    try:
+        from .panel import request_redraw
+    except ImportError:
+        return
+    request_redraw()
 
 
-def check_for_updates():
+def run_update_check(force=False):
     """
-    Check for updates and update UpdateState.
-    Call from main thread (e.g. operator) to avoid threading issues with Blender.
-    When GITHUB_REPO is None (dummy), no check is performed and any stale update notice is cleared.
+    Scheduler task: check for a newer release unless the persisted result is younger than
+    UPDATE_CHECK_INTERVAL (or force). Sends the stored ETag, so an unchanged release costs a 304.
+    Returns the delay until the next check is due.
     """
-    UpdateState.checking = True
-    UpdateState.error_message = None
+    from .scheduler import call_on_main_thread
+
+    cached = load_cached_result()
+    interval = UPDATE_CHECK_INTERVAL if UPDATE_CHECK_INTERVAL > 0 else None
+    age = time.time() - cached.get("checked_at", 0.0)
+    if not force and cached and interval is not None and 0 <= age < interval:
+        call_on_main_thread(_publish, dict(cached, error=None))
+        return interval - age
+
+    result = dict(cached, error=None)
     try:
-        if not GITHUB_REPO:
-            UpdateState.update_available = False
-            UpdateState.latest_version = None
-            UpdateState.release_url = None
-            return
-        latest_tuple, release_url = fetch_latest_release()
-        import time
-        UpdateState.last_check_time = time.time()
-        UpdateState.release_url = release_url
-        UpdateState.latest_version = latest_tuple
-        UpdateState.update_available = is_newer(latest_tuple, CURRENT_VERSION)
-    finally:
+        fetched = fetch_latest_release(cached.get("etag"))
+    except (OSError, ValueError) as e:
+        result["error"] = str(e) or type(e).__name__
+    else:
+        if fetched is not None:
+            version, release_url, etag = fetched
+            result.update(latest_version=list(version) if version else None, release_url=release_url, etag=etag)
+        result["checked_at"] = time.time()
+        _save_cached_result({k: v for k, v in result.items() if k != "error"})
+    call_on_main_thread(_publish, result)
+    return interval
+
+
+def restore_cached_result():
+    """Show the last persisted result straight away at startup, without a network request."""
+    cached = load_cached_result()
+    if cached and releases_url():
+        _publish(dict(cached, error=None))
+
+
+def check_for_updates(force=True):
+    """
+    Start an update check in the background and return immediately; results reach
+    UpdateState (and the panel) when it finishes. UpdateState.checking is True meanwhile.
+    When no releases URL is configured, no check is performed and any stale update notice is cleared.
+    """
+    if not releases_url():
+        UpdateState.update_available = False
+        UpdateState.latest_version = None
+        UpdateState.release_url = None
         UpdateState.checking = False
+        return
+    from .scheduler import PRIORITY_LOW, scheduler
+    UpdateState.checking = True
+    UpdateState.error_message = None
+    # One-off: a second click while a check is pending doesn't queue another
+    scheduler.schedule("update_check_now", _check_once, force, priority=PRIORITY_LOW, replace=False)
+
+
+def _check_once(force):
+    run_update_check(force)
+    return None
@@ -0,0 +1,519 @@
+"""
+Minimal stand-in for Blender's ``bpy`` module so the addon can be imported and
+exercised under plain CPython (benchmarks, headless tooling).
+
+Only the surface the addon actually touches is modelled. Call ``install()``
+before importing ``draftwolf``.
+"""
+
+import json
+import sys
+import time
+import types
+
+
+# ---------------------------------------------------------------------------
+# bpy.props
+# ---------------------------------------------------------------------------
+
+class _Prop:
+    """
+    Property descriptor placeholder; remembers its default for operator instances.
+    Assigned to a type (bpy.types.WindowManager.foo = StringProperty()), instances read the default.
+    """
+
+    def __init__(self, kind, **kwargs):
+        self.kind = kind
+        self.kwargs = kwargs
+
+    def __get__(self, obj, owner=None):
+        return self if obj is None else self.default()
+
+    def default(self):
+        if "default" in self.kwargs:
+            return self.kwargs["default"]
+        if self.kind == "EnumProperty":
+            items = self.kwargs.get("items")
+            if callable(items):
+                return ""
+            if items:
+                return items[0][0]
+            return ""
+        if self.kind == "CollectionProperty":
+            return []
+        return {
+            "StringProperty": "",
+            "BoolProperty": False,
+            "IntProperty": 0,
+            "FloatProperty": 0.0,
+        }.get(self.kind)
+
+
+def _prop_factory(kind):
+    def factory(**kwargs):
+        return _Prop(kind, **kwargs)
+    factory.__name__ = kind
+    return factory
+
+
+def _init_props(obj):
+    """Assign property defaults declared as annotations on obj's class hierarchy."""
+    for klass in reversed(type(obj).__mro__):
+        for name, value in getattr(klass, "__annotations__", {}).items():
+            if isinstance(value, _Prop) and name not in obj.__dict__:
+                setattr(obj, name, value.default())
+
+
+# ---------------------------------------------------------------------------
+# bpy.types
+# ---------------------------------------------------------------------------
+
+class _RNABase:
+    def __init__(self):
+        _init_props(self)
+
+
+class Operator(_RNABase):
+    def __init__(self):
+        super().__init__()
+        self.reports = []
+        self.layout = FakeLayout()
+
+    def report(self, level, message):
+        self.reports.append((set(level), message))
+
+
+class Panel(_RNABase):
+    def __init__(self, layout=None):
+        super().__init__()
+        self.layout = layout if layout is not None else FakeLayout()
+
+
+class PropertyGroup(_RNABase):
+    pass
+
+
+class AddonPreferences(_RNABase):
+    pass
+
+
+class WindowManager:
+    """Stand-in for context.window_manager."""
+
+    def invoke_props_dialog(self, operator, width=300):
+        return {'RUNNING_MODAL'}
+
+    def invoke_confirm(self, operator, event):
+        return {'RUNNING_MODAL'}
+
+
+class _LinkList(list):
+    def link(self, block):
+        if block in self:
+            raise RuntimeError(f"{block.name!r} already in collection")
+        self.append(block)
+
+
+class _SceneCollection:
+    def __init__(self):
+        self.objects = _LinkList()
+        self.children = _LinkList()
+
+
+class _RenderSettings:
+    def __init__(self):
+        self.filepath = "//render/"
+        self.file_extension = ".png"
+
+    def frame_path(self, frame=0):
+        """Output path of frame: the output path plus the frame number padded to 4 digits."""
+        base = sys.modules["bpy"].path.abspath(self.filepath)
+        return f"{base}{frame:04d}{self.file_extension}"
+
+
+class Scene(_RNABase):
+    def __init__(self):
+        super().__init__()
+        self.name = "Scene"
+        self.collection = _SceneCollection()
+        self.render = _RenderSettings()
+        self.frame_current = 1
+
+
+# ---------------------------------------------------------------------------
+# Fake UI layout (counts the widgets a draw() call produces)
+# ---------------------------------------------------------------------------
+
+class _OperatorProps:
+    """Returned by layout.operator(); accepts arbitrary attribute assignment."""
+
+
+class FakeLayout:
+    """Records how many UI elements a draw call emits."""
+
+    def __init__(self, counter=None):
+        self._counter = counter if counter is not None else {"elements": 0}
+        self.use_property_split = False
+        self.use_property_decorate = True
+        self.enabled = True
+        self.alert = False
+        self.scale_y = 1.0
+
+    @property
+    def element_count(self):
+        return self._counter["elements"]
+
+    def _child(self):
+        self._counter["elements"] += 1
+        return FakeLayout(self._counter)
+
+    def row(self, align=False, heading=""):
+        return self._child()
+
+    def column(self, align=False, heading=""):
+        return self._child()
+
+    def box(self):
+        return self._child()
+
+    def split(self, factor=0.0, align=False):
+        return self._child()
+
+    def label(self, text="", icon='NONE'):
+        self._counter["elements"] += 1
+
+    def separator(self, factor=1.0):
+        self._counter["elements"] += 1
+
+    def prop(self, data, prop, **kwargs):
+        self._counter["elements"] += 1
+
+    def operator(self, idname, text="", icon='NONE', emboss=True, depress=False):
+        self._counter["elements"] += 1
+        return _OperatorProps()
+
+
+# ---------------------------------------------------------------------------
+# bpy.data / bpy.ops / bpy.app / bpy.utils
+# ---------------------------------------------------------------------------
+
+class ID:
+    """A datablock; ``size`` is how many bytes it contributes to a written .blend."""
+
+    def __init__(self, name, size=1024, children=()):
+        self.name = name
+        self.size = size
+        self.children = list(children)
+        self.library = None
+        self.remapped_to = None
+
+    def user_remap(self, new_id):
+        self.remapped_to = new_id
+
+    @property
+    def all_objects(self):
+        return list(self.children)
+
+    def __repr__(self):
+        return f"ID({self.name!r})"
+
+
+class Image(ID):
+    """An image datablock; save_render() writes ``pixels`` (bytes) to the file."""
+
+    def __init__(self, name, pixels=b""):
+        super().__init__(name, size=len(pixels))
+        self.pixels = pixels
+
+    def save_render(self, filepath, scene=None):
+        with open(filepath, "wb") as f:
+            f.write(self.pixels)
+
+
+# Datablock collections of bpy.data that write_blend() files can hold
+ID_CATEGORIES = ("objects", "collections", "materials", "node_groups", "meshes", "worlds",
+                 "images", "actions", "cameras", "lights", "texts")
+_INDEX_MARK = b"\nDWINDEX:"
+
+
+def write_blend(filepath, index, size=0):
+    """Write a .blend of about size bytes holding the datablocks in index (category -> names)."""
+    with open(filepath, "wb") as f:
+        f.write(b"BLENDER-v402")
+        f.write(b"\0" * size)
+        f.write(_INDEX_MARK + json.dumps(index).encode())
+
+
+def _read_index(filepath):
+    with open(filepath, "rb") as f:
+        f.seek(0, 2)
+        f.seek(max(0, f.tell() - 65536))
+        tail = f.read()
+    at = tail.rfind(_INDEX_MARK)
+    if at < 0:
+        raise OSError(f"{filepath}: not a .blend with a datablock index")
+    return json.loads(tail[at + len(_INDEX_MARK):])
+
+
+class _IDCollection(list):
+    def get(self, name, default=None):
+        return next((b for b in self if b.name == name), default)
+
+    def unique_name(self, name):
+        """Blender's rename-on-clash: name, else name.001, name.002, ..."""
+        taken = {b.name for b in self}
+        if name not in taken:
+            return name
+        n = 1
+        while f"{name}.{n:03d}" in taken:
+            n += 1
+        return f"{name}.{n:03d}"
+
+
+class _LoadContext:
+    """bpy.data.libraries.load(): data_from lists the file's names; names put in data_to load on exit."""
+
+    def __init__(self, libraries, filepath, link):
+        self.libraries = libraries
+        self.filepath = filepath
+        self.link = link
+
+    def __enter__(self):
+        index = _read_index(self.filepath)
+        self.data_from = types.SimpleNamespace(**{c: list(index.get(c, ())) for c in ID_CATEGORIES})
+        self.data_to = types.SimpleNamespace(**{c: [] for c in ID_CATEGORIES})
+        return self.data_from, self.data_to
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            return False
+        data = sys.modules["bpy"].data
+        loaded = 0
+        for category in ID_CATEGORIES:
+            available = set(getattr(self.data_from, category))
+            collection = getattr(data, category)
+            blocks = []
+            for name in getattr(self.data_to, category):
+                if name not in available:
+                    blocks.append(None)
+                    continue
+                block = ID(collection.unique_name(name))
+                block.library = self.filepath if self.link else None
+                collection.append(block)
+                blocks.append(block)
+                loaded += 1
+            setattr(self.data_to, category, blocks)
+        self.libraries.loads.append((self.filepath, self.link, loaded))
+        return False
+
+
+class _Libraries:
+    def __init__(self):
+        self.writes = []
+        self.loads = []    # (filepath, link, datablocks loaded)
+
+    def load(self, filepath, link=False, relative=False):
+        return _LoadContext(self, filepath, link)
+
+    def write(self, filepath, datablocks, path_remap='NONE', fake_user=False, compress=False):
+        """Write a file as big as the datablocks plus everything they contain."""
+        blocks = _walk(datablocks)
+        with open(filepath, "wb") as f:
+            f.write(b"BLENDER-v402")
+            f.write(b"\0" * sum(getattr(b, "size", 0) for b in blocks))
+        self.writes.append((filepath, len(blocks)))
+
+
+def _walk(blocks):
+    """blocks plus everything reachable through their children (each once)."""
+    seen = {}
+    stack = list(blocks)
+    while stack:
+        block = stack.pop()
+        if id(block) not in seen:
+            seen[id(block)] = block
+            stack.extend(getattr(block, "children", ()))
+    return list(seen.values())
+
+
+class _Data:
+    def __init__(self):
+        self.filepath = ""
+        self.is_dirty = False
+        self.is_saved = False
+        self.libraries = _Libraries()
+        for category in ID_CATEGORIES:
+            setattr(self, category, _IDCollection())
+
+
+class _OpsCallable:
+    def __init__(self, calls, name, hooks):
+        self._calls = calls
+        self._name = name
+        self._hooks = hooks
+
+    def __call__(self, *args, **kwargs):
+        self._calls.append((self._name, kwargs))
+        hook = self._hooks.get(self._name)
+        if hook is not None:
+            hook(**kwargs)
+        return {'FINISHED'}
+
+
+class _OpsNamespace:
+    def __init__(self, calls, prefix, hooks):
+        self._calls = calls
+        self._prefix = prefix
+        self._hooks = hooks
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return _OpsCallable(self._calls, f"{self._prefix}.{name}", self._hooks)
+
+
+class _Ops:
+    """
+    bpy.ops: every call is recorded in ``calls`` and returns {'FINISHED'}.
+    ``hooks`` maps an operator name (e.g. "wm.save_mainfile") to a function run on each call.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.hooks = {}
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name in ("calls", "hooks"):
+            raise AttributeError(name)
+        return _OpsNamespace(self.calls, name, self.hooks)
+
+
+class _Timers:
+    """bpy.app.timers; timers only run when run_pending() is called."""
+
+    def __init__(self):
+        self._timers = {}
+
+    def register(self, function, first_interval=0.0, persistent=False):
+        self._timers[function] = time.monotonic() + first_interval
+
+    def unregister(self, function):
+        if function not in self._timers:
+            raise ValueError("Error: function is not registered")
+        del self._timers[function]
+
+    def is_registered(self, function):
+        return function in self._timers
+
+    def run_pending(self, now=None):
+        """Run every timer that is due; re-arm those that return a float."""
+        now = time.monotonic() if now is None else now
+        ran = 0
+        for function, due in list(self._timers.items()):
+            if due > now or function not in self._timers:
+                continue
+            ran += 1
+            interval = function()
+            if interval is None:
+                self._timers.pop(function, None)
+            else:
+                self._timers[function] = now + interval
+        return ran
+
+
+class _Handlers:
+    def __init__(self):
+        for name in ("load_pre", "load_post", "save_pre", "save_post",
+                     "depsgraph_update_post", "render_write", "render_complete",
+                     "render_cancel"):
+            setattr(self, name, [])
+
+    @staticmethod
+    def persistent(function):
+        function._bpy_persistent = True
+        return function
+
+
+class _Utils:
+    def __init__(self):
+        self.registered = []
+
+    def register_class(self, cls):
+        if cls in self.registered:
+            raise ValueError(f"register_class(...): already registered as a subclass '{cls.__name__}'")
+        self.registered.append(cls)
+
+    def unregister_class(self, cls):
+        if cls not in self.registered:
+            raise RuntimeError(f"unregister_class(...): missing bl_rna attribute from '{cls.__name__}'")
+        self.registered.remove(cls)
+
+    def user_resource(self, resource_type, path="", create=False):
+        import os
+        import tempfile
+        base = os.path.join(tempfile.gettempdir(), "draftwolf-bpy-stub", resource_type.lower(), path)
+        if create:
+            os.makedirs(base, exist_ok=True)
+        return base
+
+
+class _Path:
+    """bpy.path: only abspath ('//' is relative to the open .blend)."""
+
+    def abspath(self, path, start=None, library=None):
+        import os
+        if path.startswith("//"):
+            base = start or os.path.dirname(sys.modules["bpy"].data.filepath)
+            return os.path.join(base, path[2:])
+        return path
+
+
+class Context:
+    """Stand-in for bpy.context / the context passed to operators and panels."""
+
+    def __init__(self):
+        self.window_manager = WindowManager()
+        self.scene = Scene()
+        self.selected_objects = []
+        self.collection = None
+
+
+def install():
+    """Create the fake ``bpy`` package in sys.modules (idempotent) and return it."""
+    if "bpy" in sys.modules and getattr(sys.modules["bpy"], "_is_stub", False):
+        return sys.modules["bpy"]
+
+    bpy = types.ModuleType("bpy")
+    bpy._is_stub = True
+
+    props = types.ModuleType("bpy.props")
+    for kind in ("StringProperty", "BoolProperty", "IntProperty", "FloatProperty",
+                 "EnumProperty", "CollectionProperty", "PointerProperty"):
+        setattr(props, kind, _prop_factory(kind))
+
+    bpy_types = types.ModuleType("bpy.types")
+    for cls in (Operator, Panel, PropertyGroup, AddonPreferences, WindowManager, Scene, ID, Image):
+        setattr(bpy_types, cls.__name__, cls)
+
+    app = types.ModuleType("bpy.app")
+    app.timers = _Timers()
+    app.handlers = _Handlers()
+    app.version = (4, 2, 0)
+    app.background = True
+
+    bpy.props = props
+    bpy.types = bpy_types
+    bpy.app = app
+    bpy.data = _Data()
+    bpy.ops = _Ops()
+    bpy.utils = _Utils()
+    bpy.path = _Path()
+    bpy.context = Context()
+
+    sys.modules["bpy"] = bpy
+    sys.modules["bpy.props"] = props
+    sys.modules["bpy.types"] = bpy_types
+    sys.modules["bpy.app"] = app
+    sys.modules["bpy.app.handlers"] = app.handlers
+    sys.modules["bpy.app.timers"] = app.timers
+    return bpy
@@ -0,0 +1,498 @@
+"""
+In-process stand-in for the DraftWolf desktop app's local HTTP API.
+
+Serves the endpoints the addon uses with configurable latency, history size,
+per-version payload size and failure injection, so the addon's client paths can
+be benchmarked without the real app.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import random
+import shutil
+import socketserver
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _file_meta(path):
+    """Size and sha256 of a committed file, as the app's manifest records them (size 0 if it doesn't exist)."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return {"size": 0}
+    return {"size": len(data), "hash": "sha256:" + hashlib.sha256(data).hexdigest()}
+
+
+def make_history(count, target_file="scene.blend", files_per_version=1, other_every=4,
+                 start=None, step_seconds=3600):
+    """
+    Build a synthetic history, newest first.
+
+    Every ``other_every``-th version belongs to a different file, so filtering
+    by basename has something to discard. ``files_per_version`` pads each
+    version's ``files`` map to model large manifests.
+    """
+    start = start or datetime(2024, 1, 1, tzinfo=timezone.utc)
+    history = []
+    for i in range(count, 0, -1):
+        name = target_file if (other_every <= 0 or i % other_every) else f"other_{i % 7}.blend"
+        files = {f"scenes/{name}": {"size": 1024 * i, "hash": f"{i:064x}"}}
+        for extra in range(files_per_version - 1):
+            files[f"textures/tex_{i}_{extra}.png"] = {"size": 4096, "hash": f"{extra:064x}"}
+        timestamp = (start + timedelta(seconds=step_seconds * i)).isoformat().replace("+00:00", "Z")
+        history.append({
+            "id": f"ver-{i}",
+            "versionNumber": str(i),
+            "label": f"Version {i}",
+            "timestamp": timestamp,
+            "files": files,
+        })
+    return history
+
+
+def _encode(data, encoding):
+    if encoding == "gzip":
+        co = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return co.compress(data) + co.flush()
+    if encoding == "deflate":
+        return zlib.compress(data, 6)
+    if encoding == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    raise ValueError(encoding)
+
+
+def _decode(data, encoding):
+    encoding = (encoding or "identity").lower()
+    if encoding == "identity":
+        return data
+    if encoding == "gzip":
+        return zlib.decompress(data, 16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        return zlib.decompress(data)
+    if encoding == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(encoding)
+
+
+def _has_zstd():
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class MockConfig:
+    """Mutable knobs read by the request handler on every call."""
+
+    def __init__(self, latency=0.0, fail_rate=0.0, fail_status=500, drop_rate=0.0, seed=1234):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.drop_rate = drop_rate
+        self.rng = random.Random(seed)
+        self.project_root = None
+        self.logged_in = True
+        self.username = "bench"
+        self.history = []
+        self.request_counts = {}
+        self.lock = threading.Lock()
+        # Content-encodings the mock will use/accept; empty disables compression
+        self.encodings = ("zstd", "gzip", "deflate") if _has_zstd() else ("gzip", "deflate")
+        self.compress_min_bytes = 1024
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        # Advertised in /health as socketPath when set
+        self.socket_path = None
+        # Served at any .../releases/latest path (a stand-in for GitHub's releases API)
+        self.release_tag = "v1.0.0"
+        self.not_modified = 0
+        # /draft/import: importKey -> version id, so a resent chunk isn't stored twice
+        self.import_keys = {}
+        # Bumped on every history change; reported per project in /health when history_events is set
+        self.revision = 0
+        self.history_events = False
+        # path -> seconds between building a reply and sending it (a slow read of a snapshot)
+        self.reply_delay = {}
+        # version id -> path of the file's stored copy, written back by /draft/restore and
+        # planned from by /draft/restore-delta
+        self.stored_files = {}
+        # Render frames by digest, stored once however many renders and frames share it
+        self.render_store = {}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "DraftWolfMock/1.0"
+
+    def log_message(self, format, *args):  # noqa: A002 - signature from base class
+        pass
+
+    @property
+    def config(self):
+        return self.server.config
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        with self.config.lock:
+            self.config.bytes_received += len(raw)
+        if not raw:
+            return None
+        raw = _decode(raw, self.headers.get("Content-Encoding"))
+        return json.loads(raw.decode("utf-8"))
+
+    def _pick_encoding(self):
+        offered = [p.split(";")[0].strip().lower() for p in (self.headers.get("Accept-Encoding") or "").split(",")]
+        for encoding in offered:
+            if encoding in self.config.encodings:
+                return encoding
+        return None
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        delay = self.config.reply_delay.get(self.path.split("?", 1)[0])
+        if delay:
+            time.sleep(delay)
+        encoding = self._pick_encoding() if len(body) >= self.config.compress_min_bytes else None
+        if encoding:
+            body = _encode(body, encoding)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if self.config.encodings:
+            self.send_header("Accept-Encoding", ", ".join(self.config.encodings))
+        self.end_headers()
+        self.wfile.write(body)
+        with self.config.lock:
+            self.config.bytes_sent += len(body)
+
+    def _inject(self):
+        """Apply latency and failure injection. Returns True if the request was consumed."""
+        cfg = self.config
+        if cfg.latency:
+            time.sleep(cfg.latency)
+        with cfg.lock:
+            roll = cfg.rng.random()
+        if roll < cfg.drop_rate:
+            self.close_connection = True
+            self.connection.close()
+            return True
+        if roll < cfg.drop_rate + cfg.fail_rate:
+            self._send_json({"success": False, "error": "Injected failure"}, status=cfg.fail_status)
+            return True
+        return False
+
+    def _count(self, path):
+        cfg = self.config
+        with cfg.lock:
+            cfg.request_counts[path] = cfg.request_counts.get(path, 0) + 1
+
+    def do_GET(self):
+        self._dispatch(None)
+
+    def do_POST(self):
+        self._dispatch(self._read_json())
+
+    def _dispatch(self, data):
+        path = self.path.split("?", 1)[0]
+        self._count(path)
+        if self._inject():
+            return
+        if path.endswith("/releases/latest"):
+            self._route_releases_latest()
+            return
+        handler = getattr(self, "_route_" + path.strip("/").replace("/", "_").replace("-", "_"), None)
+        if handler is None:
+            self._send_json({"success": False, "error": "Not Found"}, status=404)
+            return
+        handler(data or {})
+
+    # -- routes -------------------------------------------------------------
+
+    def _route_health(self, data):
+        res = {"success": True, "version": "mock"}
+        if self.config.socket_path:
+            res["socketPath"] = self.config.socket_path
+        if self.config.history_events and self.config.project_root:
+            res["historyRevisions"] = {self.config.project_root: self.config.revision}
+        self._send_json(res)
+
+    def _route_auth_status(self, data):
+        cfg = self.config
+        self._send_json({"loggedIn": cfg.logged_in, "username": cfg.username})
+
+    def _route_draft_find_root(self, data):
+        self._send_json({"root": self.config.project_root})
+
+    def _route_draft_init(self, data):
+        self.config.project_root = data.get("projectRoot")
+        self.config.revision += 1
+        self._send_json({"success": True})
+
+    def _route_draft_history(self, data):
+        self._send_json(self.config.history)
+
+    def _route_draft_commit(self, data):
+        cfg = self.config
+        with cfg.lock:
+            number = len(cfg.history) + 1
+            entry = {
+                "id": f"ver-{number}",
+                "versionNumber": str(number),
+                "label": data.get("label", "New Version"),
+                "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                "files": {f: _file_meta(f) for f in data.get("files", [])},
+            }
+            cfg.history.insert(0, entry)
+            cfg.revision += 1
+        res = {"success": True, "versionId": entry["id"], "versionNumber": number}
+        if len(entry["files"]) == 1:
+            res.update(next(iter(entry["files"].values())))
+        self._send_json(res)
+
+    def _route_draft_commit_render(self, data):
+        """A render version: each distinct frame digest is stored once, across renders."""
+        cfg = self.config
+        stored = reused = 0
+        files = {}
+        with cfg.lock:
+            for frame in data.get("frames", []):
+                digest = frame.get("sha256")
+                if digest in cfg.render_store:
+                    reused += 1
+                elif os.path.isfile(frame.get("path") or ""):
+                    cfg.render_store[digest] = frame["size"]
+                    stored += 1
+                else:
+                    self._send_json({"success": False, "error": "Frame not found"}, status=400)
+                    return
+                for path in [frame["path"]] + frame.get("duplicates", []):
+                    files[path] = {"size": frame["size"], "hash": "sha256:" + digest}
+            number = len(cfg.history) + 1
+            cfg.history.insert(0, {
+                "id": f"ver-{number}",
+                "versionNumber": str(number),
+                "label": data.get("label", "Render"),
+                "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                "kind": "render",
+                "blendVersionId": data.get("blendVersionId"),
+                "files": files,
+            })
+            cfg.revision += 1
+        self._send_json({"success": True, "versionId": f"ver-{number}", "versionNumber": number,
+                         "stored": stored, "reused": reused})
+
+    def _route_draft_restore(self, data):
+        cfg = self.config
+        version = next((v for v in cfg.history if v.get("id") == data.get("versionId")), None)
+        if version is None:
+            self._send_json({"success": False, "error": "Version not found"}, status=404)
+            return
+        stored = cfg.stored_files.get(version["id"])
+        if stored:
+            for path in version.get("files") or {}:
+                shutil.copyfile(stored, path)
+        self._send_json({"success": True})
+
+    def _route_draft_restore_delta(self, data):
+        """Plan a version's file from the client's chunk digests: reused ranges and base64 data, in file order."""
+        stored = self.config.stored_files.get(data.get("versionId"))
+        if not stored:
+            self._send_json({"success": False, "error": "Version not stored"}, status=404)
+            return
+        chunk_size = int(data.get("chunkSize") or 0)
+        have = {}
+        for i, digest in enumerate(data.get("chunks") or []):
+            have.setdefault(digest, i * chunk_size)
+        ops = []
+        whole = hashlib.sha256()
+        with open(stored, "rb") as f:
+            while True:
+                block = f.read(chunk_size)
+                if not block:
+                    break
+                whole.update(block)
+                source = have.get(hashlib.sha256(block).hexdigest())
+                last = ops[-1] if ops else None
+                if source is not None:
+                    if last and "from" in last and last["from"] + last["length"] == source:
+                        last["length"] += len(block)
+                    else:
+                        ops.append({"from": source, "length": len(block)})
+                elif last and "raw" in last:
+                    last["raw"] += block
+                else:
+                    ops.append({"raw": block})
+            size = f.tell()
+        for op in ops:
+            if "raw" in op:
+                op["data"] = base64.b64encode(op.pop("raw")).decode("ascii")
+        self._send_json({"success": True, "size": size, "sha256": whole.hexdigest(), "ops": ops})
+
+    def _route_releases_latest(self):
+        """GitHub-style latest release with an ETag; a matching If-None-Match gets 304 Not Modified."""
+        tag = self.config.release_tag
+        etag = f'"{tag}"'
+        if self.headers.get("If-None-Match") == etag:
+            with self.config.lock:
+                self.config.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({"tag_name": tag, "html_url": f"https://example.invalid/releases/{tag}"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route_draft_batch(self, data):
+        """Apply rename/tag/delete/export operations; one result per operation, in order."""
+        cfg = self.config
+        results = []
+        with cfg.lock:
+            by_id = {v.get("id"): v for v in cfg.history}
+            deleted = set()
+            for op in data.get("operations", []):
+                version = by_id.get(op.get("versionId"))
+                if version is None or op.get("versionId") in deleted:
+                    results.append({"success": False, "error": "Version not found"})
+                    continue
+                kind = op.get("op")
+                if kind == "rename":
+                    version["label"] = op.get("newLabel", version.get("label"))
+                elif kind == "tag":
+                    version.setdefault("tags", []).append(op.get("tag"))
+                elif kind == "delete":
+                    deleted.add(op.get("versionId"))
+                elif kind == "export":
+                    # The mock keeps no stored copies: export the committed files as they are now
+                    destination = op.get("destination") or ""
+                    os.makedirs(destination, exist_ok=True)
+                    for path in version.get("files") or {}:
+                        if os.path.isfile(path):
+                            shutil.copyfile(path, os.path.join(destination, os.path.basename(path)))
+                else:
+                    results.append({"success": False, "error": f"Unknown operation {kind!r}"})
+                    continue
+                results.append({"success": True})
+            if deleted:
+                cfg.history = [v for v in cfg.history if v.get("id") not in deleted]
+            cfg.revision += 1
+        self._send_json({"success": True, "results": results})
+
+    def _route_draft_import(self, data):
+        """Back-fill versions with their own timestamps; history stays newest first."""
+        cfg = self.config
+        results = []
+        with cfg.lock:
+            for item in data.get("versions", []):
+                key = item.get("importKey")
+                if key in cfg.import_keys:
+                    results.append({"success": True, "versionId": cfg.import_keys[key]})
+                    continue
+                if not os.path.isfile(item.get("source") or ""):
+                    results.append({"success": False, "error": "Source file not found"})
+                    continue
+                number = len(cfg.history) + 1
+                entry = {
+                    "id": f"ver-{number}",
+                    "versionNumber": str(number),
+                    "label": item.get("label", "Imported"),
+                    "timestamp": item.get("timestamp"),
+                    "files": {item.get("path"): {"size": item.get("size", 0), "hash": "sha256:" + item.get("sha256", "")}},
+                }
+                cfg.history.append(entry)
+                cfg.import_keys[key] = entry["id"]
+                results.append({"success": True, "versionId": entry["id"]})
+            cfg.history.sort(key=lambda v: v.get("timestamp") or "", reverse=True)
+            cfg.revision += 1
+        self._send_json({"success": True, "results": results})
+
+    def _route_bench_sink(self, data):
+        """Accepts any payload (e.g. a large commit manifest) and reports its size."""
+        self._send_json({"success": True, "items": len(data.get("files", []))})
+
+    def _route_draft_rename_version(self, data):
+        cfg = self.config
+        found = False
+        with cfg.lock:
+            for v in cfg.history:
+                if v.get("id") == data.get("versionId"):
+                    v["label"] = data.get("newLabel", v.get("label"))
+                    cfg.revision += 1
+                    found = True
+                    break
+        if found:
+            self._send_json({"success": True})
+        else:
+            self._send_json({"success": False, "error": "Version not found"}, status=404)
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class MockDraftWolfServer:
+    """
+    Threaded HTTP server on 127.0.0.1 with an ephemeral port, or on a Unix
+    domain socket when ``unix_socket`` is given.
+
+    Use as a context manager; ``url`` is the base URL to point the addon at.
+    """
+
+    def __init__(self, config=None, unix_socket=None):
+        self.config = config or MockConfig()
+        self.unix_socket = unix_socket
+        self._server = None
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        if self.unix_socket:
+            if os.path.exists(self.unix_socket):
+                os.unlink(self.unix_socket)
+            self._server = _UnixHTTPServer(self.unix_socket, _Handler)
+        else:
+            self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+            self._server.daemon_threads = True
+        self._server.config = self.config
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            if self.unix_socket and os.path.exists(self.unix_socket):
+                os.unlink(self.unix_socket)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
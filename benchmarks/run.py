@@ -0,0 +1,1491 @@
+"""
+Headless benchmark suite for the DraftWolf addon.
+
+Runs under plain CPython with a stub ``bpy`` and an in-process mock DraftWolf
+server. Results are written as JSON so runs from different revisions can be
+compared:
+
+    python benchmarks/run.py -o before.json
+    git checkout <other revision>
+    python benchmarks/run.py -o after.json --compare before.json
+
+Use ``--quick`` for a fast smoke run and ``-k <substring>`` to select benchmarks.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+ADDON_DIR = os.path.join(REPO_ROOT, "DraftWolf_Control")
+
+for _p in (BENCH_DIR, ADDON_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+import bpy_stub  # noqa: E402
+
+bpy = bpy_stub.install()
+
+import draftwolf  # noqa: E402,F401
+from draftwolf import api, compression, constants, discovery, history, path_utils, panel, policy, scheduler, shared_status, singleflight, state, transport  # noqa: E402
+from draftwolf import cli, delta, handlers, legacy_import, operators_batch, operators_commit, operators_restore, operators_update, profiling, pull, retention, search, snapshot, update  # noqa: E402
+from mock_server import MockConfig, MockDraftWolfServer, make_history  # noqa: E402
+
+BENCHMARKS = []
+
+
+def benchmark(name, group):
+    """Register a benchmark function ``fn(env) -> result dict``."""
+    def decorator(fn):
+        BENCHMARKS.append((name, group, fn))
+        return fn
+    return decorator
+
+
+def summarize(samples, **extra):
+    """Turn a list of per-iteration durations (seconds) into a result dict."""
+    ordered = sorted(samples)
+    n = len(ordered)
+    mean = statistics.fmean(ordered)
+    result = {
+        "iterations": n,
+        "mean_s": mean,
+        "median_s": statistics.median(ordered),
+        "p95_s": ordered[min(n - 1, int(n * 0.95))],
+        "min_s": ordered[0],
+        "max_s": ordered[-1],
+        "stdev_s": statistics.stdev(ordered) if n > 1 else 0.0,
+        "ops_per_s": (1.0 / mean) if mean > 0 else None,
+    }
+    result.update(extra)
+    return result
+
+
+def measure(fn, iterations, warmup=1, setup=None):
+    """Time ``fn()`` ``iterations`` times (after ``warmup`` untimed calls)."""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    samples = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+class Env:
+    """Shared fixture: mock server, a project dir with a saved .blend, quick/full sizing."""
+
+    def __init__(self, quick):
+        self.quick = quick
+        self.tmp = tempfile.TemporaryDirectory(prefix="draftwolf-bench-")
+        self.project_root = self.tmp.name
+        # Keep cross-instance coordination files away from a real session's runtime dir
+        self.runtime_dir = os.path.join(self.project_root, ".runtime")
+        os.makedirs(self.runtime_dir)
+        os.environ["XDG_RUNTIME_DIR"] = self.runtime_dir
+        os.makedirs(os.path.join(self.project_root, "scenes"), exist_ok=True)
+        self.blend_path = os.path.join(self.project_root, "scenes", "scene.blend")
+        with open(self.blend_path, "wb") as f:
+            f.write(b"BLENDER-v402" + b"\0" * 1024)
+        self.config = MockConfig()
+        self.config.project_root = self.project_root
+        self.server = MockDraftWolfServer(self.config).start()
+        point_addon_at(self.server.url)
+        bpy.data.filepath = self.blend_path
+        self.context = bpy_stub.Context()
+        draftwolf.register()
+
+    def iterations(self, full, quick):
+        return quick if self.quick else full
+
+    def reset(self, history_size=100, latency=0.0, fail_rate=0.0, drop_rate=0.0):
+        cfg = self.config
+        cfg.latency = latency
+        cfg.fail_rate = fail_rate
+        cfg.drop_rate = drop_rate
+        cfg.history = make_history(history_size)
+        cfg.request_counts.clear()
+        cfg.import_keys.clear()
+        cfg.history_events = False
+        cfg.reply_delay.clear()
+        cfg.stored_files.clear()
+        cfg.render_store.clear()
+        state.RootCache.cache.clear()
+        state.SafeVersionList.full_history = None
+        state.HistoryStore.entries.clear()
+        state.SafeVersionList.items = []
+        bpy.data.filepath = self.blend_path
+        bpy.ops.calls.clear()
+        policy.breaker.reset()
+        singleflight.single_flight.reset()
+        # Drop history reconciles and flush main-thread callbacks left by earlier benchmarks
+        for name in scheduler.scheduler.stats():
+            if name.startswith("reconcile:"):
+                scheduler.scheduler.cancel(name)
+        with quiet():
+            bpy.app.timers.run_pending()
+        state.IntegrityState.failures = []
+        state.IntegrityState.last_result = None
+        state.SnapshotState.last = None
+        shutil.rmtree(snapshot.snapshot_dir(self.blend_path), ignore_errors=True)
+        state.HistoryStore.revisions = None
+        state.StatusCache.history_events = False
+
+    def close(self):
+        draftwolf.unregister()
+        self.server.stop()
+        self.tmp.cleanup()
+
+
+def point_addon_at(url):
+    """Redirect the addon's API client to ``url``."""
+    transport.set_transport(transport.TcpTransport.from_url(url))
+
+
+def quiet():
+    """Silence the addon's diagnostic prints inside timed loops."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+@benchmark("send_request.health", "api")
+def bench_send_request_health(env):
+    env.reset()
+    samples = measure(lambda: api.send_request('/health'), env.iterations(500, 50), warmup=5)
+    return summarize(samples)
+
+
+@benchmark("send_request.health_latency_5ms", "api")
+def bench_send_request_latency(env):
+    env.reset(latency=0.005)
+    samples = measure(lambda: api.send_request('/health'), env.iterations(100, 20), warmup=2)
+    return summarize(samples, injected_latency_s=0.005)
+
+
+@benchmark("send_request.history_payload_10k", "api")
+def bench_send_request_payload(env):
+    env.reset(history_size=10_000)
+    samples = measure(lambda: api.send_request('/draft/history', {'projectRoot': env.project_root}),
+                      env.iterations(20, 3))
+    size = len(json.dumps(env.config.history))
+    return summarize(samples, payload_bytes=size)
+
+
+@benchmark("send_request.failure_injection_25pct", "api")
+def bench_send_request_failures(env):
+    env.reset(fail_rate=0.20, drop_rate=0.05)
+    failures = 0
+
+    def call():
+        nonlocal failures
+        res = api.send_request('/health')
+        if not (res and res.get('success')):
+            failures += 1
+
+    with quiet():
+        samples = measure(call, env.iterations(300, 40), warmup=0)
+    return summarize(samples, failures=failures)
+
+
+@benchmark("policy.breaker_hung_app", "api")
+def bench_breaker_hung_app(env):
+    """An app that accepts connections but never answers: each call costs a timeout until the breaker opens."""
+    import socket
+
+    env.reset()
+    hung = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    hung.bind(("127.0.0.1", 0))
+    hung.listen(64)
+    point_addon_at(f"http://127.0.0.1:{hung.getsockname()[1]}")
+    try:
+        with quiet():
+            samples = measure(lambda: api.send_request('/health'), env.iterations(20, 10), warmup=0)
+    finally:
+        point_addon_at(env.server.url)
+        hung.close()
+    timed_out = sum(1 for s in samples if s >= policy.policy_for('/health').timeout * 0.9)
+    return summarize(samples, timed_out_calls=timed_out, breaker_state=policy.breaker.state,
+                     rejected_fast=policy.breaker.rejected, total_s=sum(samples))
+
+
+@benchmark("discovery.app_not_running", "api")
+def bench_discovery(env):
+    """
+    send_request when the discovery file names a dead pid (answered from a stat + pid check,
+    no connect), then the app "restarting" on a new port: the next call follows the file.
+    """
+    import socket
+
+    env.reset()
+    path = os.path.join(env.project_root, "app.json")
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    saved = discovery.discovery
+    discovery.discovery = watcher = discovery.AppDiscovery(path)
+
+    def write(pid, port):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"pid": pid, "port": port, "version": "mock", "startedAt": time.time()}, f)
+
+    try:
+        write(dead.pid, env.server.port)
+        samples = measure(lambda: api.send_request('/health'), env.iterations(5000, 500))
+        dead_result = api.send_request('/health')
+        # The app comes back on a different port while the addon still points at an old one
+        stale = socket.socket()
+        stale.bind(("127.0.0.1", 0))
+        point_addon_at(f"http://127.0.0.1:{stale.getsockname()[1]}")
+        stale.close()
+        write(os.getpid(), env.server.port)
+        with quiet():
+            followed = api.send_request('/health')
+        reads = watcher.reads
+    finally:
+        discovery.discovery = saved
+        point_addon_at(env.server.url)
+    return summarize(samples, dead_error=dead_result.get('error'), file_reads=reads,
+                     followed_port_change=bool(followed and followed.get('success')),
+                     server_calls=dict(env.config.request_counts))
+
+
+def _encodings_to_compare():
+    """identity plus every codec the client can use here (zstd only with the zstandard module)."""
+    return ["identity", "gzip", "deflate"] + (["zstd"] if compression.zstandard is not None else [])
+
+
+def _with_encoding(encoding, fn):
+    """Run fn() with the client restricted to one content-encoding ('identity' = off)."""
+    saved = compression.preferred_encodings
+    compression.preferred_encodings = () if encoding == "identity" else (encoding,)
+    compression._server_accepts.clear()
+    try:
+        return fn()
+    finally:
+        compression.preferred_encodings = saved
+        compression._server_accepts.clear()
+
+
+@benchmark("compression.history_20k", "compression")
+def bench_compression_history(env):
+    """Large history (20k versions, 4 files each) fetched per content-encoding over loopback."""
+    env.reset()
+    env.config.history = make_history(20_000, files_per_version=4)
+    raw_bytes = len(json.dumps(env.config.history).encode("utf-8"))
+    per_encoding = {}
+    for encoding in _encodings_to_compare():
+        def run_one():
+            env.config.bytes_sent = 0
+            samples = measure(lambda: api.send_request('/draft/history', {'projectRoot': env.project_root}),
+                              env.iterations(5, 1))
+            return summarize(samples, wire_bytes=env.config.bytes_sent // (len(samples) + 1))
+        per_encoding[encoding] = _with_encoding(encoding, run_one)
+    best = min(per_encoding.values(), key=lambda r: r["mean_s"])
+    return dict(best, raw_bytes=raw_bytes, per_encoding=per_encoding)
+
+
+@benchmark("compression.commit_manifest_20k", "compression")
+def bench_compression_commit(env):
+    """Large commit manifest (20k file paths) sent per content-encoding."""
+    env.reset()
+    payload = {'projectRoot': env.project_root, 'label': 'bench',
+               'files': [f"{env.project_root}/assets/textures/set_{i // 100}/texture_{i:05d}.png" for i in range(20_000)]}
+    raw_bytes = len(json.dumps(payload).encode("utf-8"))
+    per_encoding = {}
+    for encoding in _encodings_to_compare():
+        def run_one():
+            api.send_request('/health')  # learn which request encodings the app accepts
+            env.config.bytes_received = 0
+            samples = measure(lambda: api.send_request('/bench/sink', payload), env.iterations(20, 3))
+            return summarize(samples, wire_bytes=env.config.bytes_received // (len(samples) + 1))
+        per_encoding[encoding] = _with_encoding(encoding, run_one)
+    best = min(per_encoding.values(), key=lambda r: r["mean_s"])
+    return dict(best, raw_bytes=raw_bytes, per_encoding=per_encoding)
+
+
+def _transport_bench(env, make_transport, payload_size):
+    env.reset(history_size=payload_size)
+    saved = transport.get_transport()
+    transport.set_transport(make_transport())
+    try:
+        health = summarize(measure(lambda: api.send_request('/health'), env.iterations(500, 50), warmup=5))
+        hist = summarize(measure(lambda: api.send_request('/draft/history', {'projectRoot': env.project_root}),
+                                 env.iterations(50, 5)))
+    finally:
+        transport.set_transport(saved)
+    return dict(health, history_mean_s=hist["mean_s"], history_versions=payload_size)
+
+
+@benchmark("transport.tcp", "transport")
+def bench_transport_tcp(env):
+    return _transport_bench(env, lambda: transport.TcpTransport.from_url(env.server.url), 1_000)
+
+
+@benchmark("transport.unix_socket", "transport")
+def bench_transport_unix(env):
+    if not transport.HAS_UNIX_SOCKETS:
+        return {"skipped": "AF_UNIX not available"}
+    path = os.path.join(env.runtime_dir, "mock.sock")
+    with MockDraftWolfServer(env.config, unix_socket=path):
+        return _transport_bench(env, lambda: transport.UnixSocketTransport(path), 1_000)
+
+
+def _history_bench(env, size, iterations):
+    env.reset(history_size=size)
+    path_utils.get_project_root(env.blend_path)  # warm root cache; measure history only
+    result_len = 0
+
+    def call():
+        nonlocal result_len
+        result_len = len(history.load_version_history(env.blend_path, refresh=True))
+
+    samples = measure(call, iterations)
+    return summarize(samples, versions=size, matched=result_len)
+
+
+@benchmark("load_version_history.1k", "history")
+def bench_history_1k(env):
+    return _history_bench(env, 1_000, env.iterations(50, 5))
+
+
+@benchmark("load_version_history.10k", "history")
+def bench_history_10k(env):
+    return _history_bench(env, 10_000, env.iterations(10, 2))
+
+
+@benchmark("load_version_history.100k", "history")
+def bench_history_100k(env):
+    return _history_bench(env, 100_000, env.iterations(3, 1))
+
+
+@benchmark("history.filter_only.100k", "history")
+def bench_history_filter_only(env):
+    raw = make_history(100_000)
+    _, target_lower = history.clean_target_basename(env.blend_path)
+    samples = measure(lambda: history.filter_history_by_basename(raw, target_lower), env.iterations(5, 1))
+    return summarize(samples, versions=len(raw))
+
+
+def _searchable_history(count):
+    """make_history with varied labels, so searches have selective and broad terms."""
+    words = ("rig", "fix", "lighting", "blockout", "anim", "polish", "uv", "retopo", "shader", "review")
+    versions = make_history(count, other_every=0)
+    for i, v in enumerate(versions):
+        v["label"] = f"{words[i % 10]} {words[(i * 7) % 10]} pass {i % 97}"
+        if i % 997 == 0:
+            v["label"] = "rig fix for spine"
+    return versions
+
+
+@benchmark("search.keystrokes_50k", "search")
+def bench_search(env):
+    """Per-keystroke query time against a 50k-version index (10 results, as in the panel)."""
+    count = 50_000
+    versions = _searchable_history(count)
+    t0 = time.perf_counter()
+    index = search.HistoryIndex(versions)
+    build_s = time.perf_counter() - t0
+    typed = ["r", "ri", "rig", "rig ", "rig f", "rig fi", "rig fix", "rig fix s", "rig fix spine",
+             "v4", "v49", "v4999", "2024-03", "2025-03 rig", "after:2025-06 shader pol", "zzz"]
+    per_query = {}
+    samples = []
+    for text in typed:
+        q_samples = measure(lambda: index.search(text, limit=11), env.iterations(200, 30), warmup=2)
+        per_query[text] = statistics.fmean(q_samples) * 1e6
+        samples.extend(q_samples)
+    new = make_history(count + 10, other_every=0)[:10]
+    t0 = time.perf_counter()
+    index.sync(new + versions)
+    incremental_s = time.perf_counter() - t0
+    return summarize(samples, build_s=build_s, incremental_add_10_s=incremental_s,
+                     worst_query_us=max(per_query.values()), per_query_us=per_query)
+
+
+@benchmark("history_store.dedup_4_threads", "history")
+def bench_history_dedup(env):
+    """Four concurrent readers of a cold store (20 ms app latency) should cost one fetch."""
+    import threading
+    env.reset(history_size=1_000, latency=0.02)
+    root = path_utils.get_project_root(env.blend_path)
+
+    def call():
+        state.HistoryStore.entries.clear()
+        threads = [threading.Thread(target=history.get_project_history, args=(root,)) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    rounds = env.iterations(20, 5)
+    samples = measure(call, rounds, warmup=0)
+    fetches = env.config.request_counts.get('/draft/history', 0)
+    return summarize(samples, history_fetches_per_round=fetches / rounds)
+
+
+@benchmark("single_flight.viewports_and_worker", "api")
+def bench_single_flight(env):
+    """
+    Four viewports' panel draws and the status worker asking for the same root and app status at
+    once (20 ms app latency): requests sent with identical concurrent calls coalesced versus not.
+    A commit in between must not let a later read share a reply from before it, and the per-call
+    cost of keying an uncontended call is reported.
+    """
+    import threading
+    env.reset(latency=0.02)
+    flights = singleflight.single_flight
+    callers = 5
+
+    def round_trip():
+        barrier = threading.Barrier(callers)
+
+        def caller():
+            barrier.wait()
+            # What get_project_root sends on a cold cache (bypassing the cross-instance root store)
+            api.send_request('/draft/find-root', {'path': os.path.dirname(env.blend_path)})
+            api.send_request('/health')
+            api.send_request('/auth/status')
+
+        threads = [threading.Thread(target=caller) for _ in range(callers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def run(enabled):
+        flights.enabled = enabled
+        flights.reset()
+        env.config.request_counts.clear()
+        rounds = env.iterations(20, 5)
+        samples = measure(round_trip, rounds, warmup=0)
+        return samples, sum(env.config.request_counts.values()) / rounds
+
+    try:
+        off_samples, off_requests = run(False)
+        on_samples, on_requests = run(True)
+        stats = flights.stats()
+
+        # A slow read of the history from before a commit, then a read started after the commit returned
+        env.config.reply_delay['/draft/history'] = 0.1
+        reader = threading.Thread(target=api.send_request, args=('/draft/history', {'projectRoot': env.project_root}))
+        reader.start()
+        time.sleep(0.02)
+        api.send_request('/draft/commit', {'projectRoot': env.project_root, 'label': "Between reads",
+                                           'files': [env.blend_path]})
+        after = api.send_request('/draft/history', {'projectRoot': env.project_root})
+        reader.join()
+        fresh_after_commit = bool(after) and after[0].get('label') == "Between reads"
+        env.config.reply_delay.clear()
+
+        env.config.latency = 0.0
+        overhead = measure(lambda: flights.do('/draft/find-root', {'path': env.project_root}, lambda: None),
+                           env.iterations(100_000, 10_000))
+    finally:
+        flights.enabled = True
+    return summarize(on_samples, callers=callers, requests_per_round_off=off_requests,
+                     requests_per_round_on=on_requests, round_s_off=statistics.fmean(off_samples),
+                     saved=stats["saved"], saved_by_endpoint=stats["saved_by_endpoint"],
+                     fresh_after_commit=fresh_after_commit, key_overhead_us=statistics.fmean(overhead) * 1e6)
+
+
+@benchmark("get_project_root.cold", "path_utils")
+def bench_root_cold(env):
+    env.reset()
+    samples = measure(lambda: path_utils.get_project_root(env.blend_path),
+                      env.iterations(300, 30), setup=state.RootCache.cache.clear)
+    return summarize(samples, server_calls=env.config.request_counts.get('/draft/find-root', 0))
+
+
+@benchmark("get_project_root.warm", "path_utils")
+def bench_root_warm(env):
+    env.reset()
+    path_utils.get_project_root(env.blend_path)
+    env.config.request_counts.clear()
+    samples = measure(lambda: path_utils.get_project_root(env.blend_path), env.iterations(20_000, 2_000))
+    return summarize(samples, server_calls=env.config.request_counts.get('/draft/find-root', 0))
+
+
+@benchmark("shared_status.6_instances", "status")
+def bench_shared_status(env):
+    """Six coordinators (stand-ins for six Blender sessions) sharing one poller."""
+    env.reset()
+    directory = tempfile.mkdtemp(dir=env.project_root)
+    instances = [shared_status.StatusCoordinator(directory) for _ in range(6)]
+    rounds = env.iterations(50, 10)
+
+    def one_round():
+        for inst in instances:
+            inst.cycle(state._poll_app_status)
+
+    try:
+        samples = measure(one_round, rounds, warmup=0)
+    finally:
+        for inst in instances:
+            inst.release()
+    health_calls = env.config.request_counts.get('/health', 0)
+    return summarize(samples, instances=len(instances), rounds=rounds, health_calls=health_calls,
+                     health_calls_per_round=health_calls / rounds)
+
+
+@benchmark("scheduler.idle_and_dispatch", "scheduler")
+def bench_scheduler(env):
+    """Wake-ups of an idle scheduler (the old status loop woke 10x/s) and schedule-to-run latency."""
+    import threading
+
+    sched = scheduler.Scheduler()
+    sched.start()
+    try:
+        sched.schedule("idle", lambda: None, delay=60.0, interval=60.0)
+        before = sched.wakeups
+        idle_s = 1.0 if env.quick else 3.0
+        time.sleep(idle_s)
+        idle_wakeups = sched.wakeups - before
+
+        ran = threading.Event()
+
+        def dispatch():
+            ran.clear()
+            sched.schedule("one_off", ran.set, priority=scheduler.PRIORITY_HIGH)
+            ran.wait(1.0)
+
+        samples = measure(dispatch, env.iterations(500, 100))
+        task_stats = sched.stats()["one_off"]
+    finally:
+        sched.stop()
+    return summarize(samples, idle_seconds=idle_s, idle_wakeups=idle_wakeups,
+                     old_loop_wakeups=int(idle_s / 0.1), one_off_runs=task_stats["runs"])
+
+
+@benchmark("update.background_check", "update")
+def bench_update_check(env):
+    """
+    Operator latency while the releases endpoint is slow (the check used to block for the full
+    round trip), then: a repeat check revalidates with a 304, and a restart within
+    UPDATE_CHECK_INTERVAL makes no request at all.
+    """
+    env.reset(latency=0.2)
+    env.config.not_modified = 0
+    cache_path = os.path.join(env.project_root, "update_check.json")
+    path = "/repos/draftwolf/draftwolf-blender-plugin/releases/latest"
+    os.environ[update.UPDATE_RELEASES_URL_ENV] = env.server.url + path
+    saved = update._cache_path, update.UPDATE_CHECK_INTERVAL
+    update._cache_path = lambda: cache_path
+    update.UPDATE_CHECK_INTERVAL = 3600
+
+    def wait_for_result(timeout=5.0):
+        end = time.monotonic() + timeout
+        while time.monotonic() < end:
+            bpy.app.timers.run_pending()
+            if not state.UpdateState.checking:
+                return True
+            time.sleep(0.005)
+        return False
+
+    try:
+        op = operators_update.object_ot_df_check_for_updates()
+        samples = []
+        statuses = []
+        for _ in range(env.iterations(5, 2)):
+            t0 = time.perf_counter()
+            op.execute(env.context)
+            samples.append(time.perf_counter() - t0)
+            wait_for_result()
+            statuses.append(env.config.request_counts.get(path, 0))
+        first_check_etag = update.load_cached_result().get("etag")
+        # A "restart": the periodic task sees a fresh persisted result and skips the network
+        before = env.config.request_counts.get(path, 0)
+        state.UpdateState.latest_version = None
+        next_due = update.run_update_check(False)
+        bpy.app.timers.run_pending()
+        restart_requests = env.config.request_counts.get(path, 0) - before
+    finally:
+        update._cache_path, update.UPDATE_CHECK_INTERVAL = saved
+        os.environ.pop(update.UPDATE_RELEASES_URL_ENV, None)
+    return summarize(samples, server_latency_s=0.2, checks=len(samples), requests=statuses[-1],
+                     not_modified=env.config.not_modified,
+                     etag=first_check_etag, restart_requests=restart_requests,
+                     restart_next_check_in_s=round(next_due or 0),
+                     restored_version=update.version_tuple_to_string(state.UpdateState.latest_version))
+
+
+def _draw_panel():
+    layout = bpy_stub.FakeLayout()
+    p = panel.df_pt_main_panel(layout)
+    p.draw(bpy.context)
+    return layout.element_count
+
+
+def _panel_bench(env, show_versions, warm_status):
+    env.reset(history_size=1_000)
+    state.StatusCache.app_running = True
+    state.StatusCache.is_logged_in = True
+    state.StatusCache.username = "bench"
+    state.SafeVersionList.show_versions = show_versions
+    state.SafeVersionList.current_filepath = env.blend_path
+    state.SafeVersionList.full_history = history.load_version_history(env.blend_path)
+    elements = _draw_panel()
+
+    def invalidate():
+        if not warm_status:
+            state.StatusCache.last_draw_time = 0
+            state.RootCache.cache.clear()
+
+    samples = measure(lambda: _draw_panel(), env.iterations(5_000, 500), setup=invalidate)
+    return summarize(samples, ui_elements=elements)
+
+
+@benchmark("panel.draw.collapsed_warm", "panel")
+def bench_panel_collapsed(env):
+    return _panel_bench(env, show_versions=False, warm_status=True)
+
+
+@benchmark("panel.draw.expanded_warm", "panel")
+def bench_panel_expanded(env):
+    return _panel_bench(env, show_versions=True, warm_status=True)
+
+
+@benchmark("panel.draw.expanded_cold_status", "panel")
+def bench_panel_cold(env):
+    return _panel_bench(env, show_versions=True, warm_status=False)
+
+
+@benchmark("panel.draw.profiling", "panel")
+def bench_panel_profiling(env):
+    """Expanded panel draw with profiling on; after disable() the original functions are back (no overhead)."""
+    originals = {name: getattr(panel, name) for name in vars(panel) if name.startswith("_draw_")}
+    draw = panel.df_pt_main_panel.draw
+    profiling.reset()
+    with quiet():
+        profiling.enable()
+    try:
+        result = _panel_bench(env, show_versions=True, warm_status=True)
+        with quiet():
+            profiling.start_capture(60.0, memory=True)
+            _draw_panel()
+            capture_paths = profiling.stop_capture(env.project_root)
+        trace_path = profiling.export_trace(env.project_root)
+        sections = profiling.stats()
+    finally:
+        with quiet():
+            profiling.disable()
+    restored = (panel.df_pt_main_panel.draw is draw
+                and all(getattr(panel, name) is fn for name, fn in originals.items()))
+    with open(trace_path, encoding="utf-8") as f:
+        events = len(json.load(f)["traceEvents"])
+    slowest = next(iter(sections), None)
+    result.update(sections_timed=len(sections), slowest_section=slowest, trace_events=events,
+                  capture_files=[os.path.basename(p) for p in capture_paths], originals_restored=restored)
+    return result
+
+
+@benchmark("operator.commit", "operators")
+def bench_commit(env):
+    """Commit with the panel's history already cached (the normal interactive case)."""
+    env.reset(history_size=1_000)
+    history.load_version_history(env.blend_path)
+
+    def call():
+        op = operators_commit.object_ot_df_commit()
+        op.label_input = "bench"
+        op.execute(env.context)
+
+    samples = measure(call, env.iterations(50, 5))
+    return summarize(samples, server_calls=dict(env.config.request_counts))
+
+
+def _scene_objects(count, size):
+    return [bpy.types.ID(f"Object.{i:03d}", size, [bpy.types.ID(f"Mesh.{i:03d}", size)]) for i in range(count)]
+
+
+@benchmark("operator.commit_scope", "operators")
+def bench_commit_scope(env):
+    """Full-file commit (save writes every object) vs partial commits of 5 selected objects / one collection."""
+    env.reset(history_size=1_000)
+    history.load_version_history(env.blend_path)
+    objects = _scene_objects(*((100, 128 * 1024) if env.quick else (200, 512 * 1024)))
+    bpy.ops.hooks["wm.save_mainfile"] = lambda **kw: bpy.data.libraries.write(env.blend_path, set(objects))
+    env.context.selected_objects = objects[:5]
+    env.context.collection = bpy.types.ID("Character", 0, objects[5:15])
+    results = {}
+    try:
+        for scope in ("FULL", "SELECTED", "COLLECTION"):
+            def call():
+                op = operators_commit.object_ot_df_commit()
+                op.label_input = "bench"
+                op.scope = scope
+                op.execute(env.context)
+            results[scope.lower()] = summarize(measure(call, env.iterations(10, 3)))
+    finally:
+        bpy.ops.hooks.pop("wm.save_mainfile", None)
+        env.context.selected_objects = []
+        env.context.collection = None
+    full, partial = results["full"]["mean_s"], results["selected"]["mean_s"]
+    return summarize([full], speedup_selected=full / partial if partial else None,
+                     full_bytes=os.path.getsize(env.blend_path), **results)
+
+
+@benchmark("operator.rename_version", "operators")
+def bench_rename(env):
+    env.reset(history_size=10_000)
+    history.load_version_history(env.blend_path)
+    counter = 0
+
+    def call():
+        nonlocal counter
+        counter += 1
+        op = operators_restore.object_ot_df_rename_version()
+        op.version_id = "ver-1"
+        op.new_label = f"renamed {counter}"
+        op.execute(env.context)
+
+    samples = measure(call, env.iterations(50, 5))
+    return summarize(samples, versions=10_000, server_calls=dict(env.config.request_counts))
+
+
+@benchmark("operator.batch_relabel_1k", "operators")
+def bench_batch_relabel(env):
+    """1,000 relabels: one rename dialog/request/cache update each, versus one batch request and cache update."""
+    count = env.iterations(1_000, 200)
+    env.reset(history_size=10_000)
+    state.SafeVersionList.full_history = history.load_version_history(env.blend_path)
+    targets = [v["id"] for v in state.SafeVersionList.full_history[:count]]
+
+    t0 = time.perf_counter()
+    for i, vid in enumerate(targets):
+        op = operators_restore.object_ot_df_rename_version()
+        op.version_id = vid
+        op.new_label = f"single {i}"
+        op.execute(env.context)
+    single_s = time.perf_counter() - t0
+    single_calls = env.config.request_counts.get("/draft/rename-version", 0)
+
+    state.SafeVersionList.selected = {vid: i for i, vid in enumerate(targets)}
+    op = operators_batch.object_ot_df_batch_versions()
+    op.action = 'RELABEL'
+    op.find = r"^single "
+    op.pattern = "Shot {i:04d} (was {label})"
+    t0 = time.perf_counter()
+    op.execute(env.context)
+    batch_s = time.perf_counter() - t0
+    state.SafeVersionList.selected = {}
+    cached = {v["id"]: v["label"] for v in history.get_file_history(env.blend_path, block=False)}
+    server = {v["id"]: v["label"] for v in env.config.history}
+    return summarize([batch_s], relabels=count, one_at_a_time_s=single_s, batch_s=batch_s,
+                     speedup=single_s / batch_s, rename_requests=single_calls,
+                     batch_requests=env.config.request_counts.get("/draft/batch", 0),
+                     first_label=cached[targets[0]], cache_matches_app=all(cached[v] == server[v] for v in targets),
+                     report=op.reports[-1][1] if op.reports else None)
+
+
+@benchmark("cli.commit_many", "cli")
+def bench_cli_commit(env):
+    """Headless commit of many files with 20 ms of app latency: one worker versus the default pool."""
+    count = env.iterations(64, 16)
+    env.reset(history_size=0, latency=0.02)
+    files = []
+    for i in range(count):
+        path = os.path.join(env.project_root, "scenes", f"shot_{i:03d}.blend")
+        with open(path, "wb") as f:
+            f.write(b"BLENDER-v402" + os.urandom(4096))
+        files.append(path)
+
+    def commit(jobs):
+        out = io.StringIO()
+        t0 = time.perf_counter()
+        with contextlib.redirect_stderr(io.StringIO()):
+            code = cli.main(["commit", "--format", "ndjson", "-j", str(jobs), "--verify", *files], stdout=out)
+        elapsed = time.perf_counter() - t0
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+        return elapsed, code, results
+
+    serial_s, _, _ = commit(1)
+    pooled_s, code, results = commit(cli.CLI_DEFAULT_JOBS)
+    for path in files:
+        os.remove(path)
+    return summarize([pooled_s], files=count, serial_s=serial_s, pooled_s=pooled_s, jobs=cli.CLI_DEFAULT_JOBS,
+                     speedup=serial_s / pooled_s, exit_code=code,
+                     verified=sum(1 for r in results if r.get("verified") and r["ok"]))
+
+
+@benchmark("legacy.import_tree", "history")
+def bench_legacy_import(env):
+    """
+    Back-fill a legacy tree (shot_v001.blend ... per asset): scan, parallel fingerprints and chunked
+    /draft/import. Then resume after a simulated interruption that lost the journal's second half.
+    """
+
+    assets, versions, size = env.iterations((8, 250, 256 * 1024), (4, 50, 64 * 1024))
+    env.reset(history_size=0)
+    legacy_dir = os.path.join(env.project_root, "legacy")
+    base = time.time() - versions * 3600
+    for a in range(assets):
+        shot_dir = os.path.join(legacy_dir, f"seq{a % 2}")
+        os.makedirs(shot_dir, exist_ok=True)
+        for v in range(1, versions + 1):
+            path = os.path.join(shot_dir, f"shot{a:02d}_v{v:03d}.blend")
+            with open(path, "wb") as f:
+                f.write(b"BLENDER-v402" + os.urandom(size))
+            os.utime(path, (base + v * 3600, base + v * 3600))
+
+    report = legacy_import.import_tree(legacy_dir, jobs=cli.CLI_DEFAULT_JOBS)
+    journal = os.path.join(env.project_root, legacy_import.LEGACY_IMPORT_JOURNAL)
+    with open(journal) as f:
+        lines = f.readlines()
+    with open(journal, "w") as f:
+        f.writelines(lines[:len(lines) // 2])
+    resumed = legacy_import.import_tree(legacy_dir, jobs=cli.CLI_DEFAULT_JOBS)
+
+    first = history.get_file_history(os.path.join(legacy_dir, "seq0", "shot00.blend"))
+    in_order = [int(v["label"].split("_v")[1].split(".")[0]) for v in first] == list(range(versions, 0, -1))
+    shutil.rmtree(legacy_dir)
+    os.remove(journal)
+    summary = report.summary()
+    return summarize([summary["seconds"]["total"]], files=assets * versions, mb=round(assets * versions * size / 1e6),
+                     imported=report.imported, import_requests=env.config.request_counts.get("/draft/import", 0),
+                     seconds=summary["seconds"], hash_mb_per_s=summary["hashMBps"],
+                     versions_per_s=summary["versionsPerSecond"], resume_skipped=resumed.resumed,
+                     resume_resent=resumed.imported, history_versions=len(env.config.history),
+                     history_in_order=in_order)
+
+
+@benchmark("handlers.idle_refresh", "history")
+def bench_handlers_idle_refresh(env):
+    """
+    An open panel left idle with status polls, compressed in time (history max_age 10 s -> 50 ms, poll
+    5 s -> 100 ms): history requests when caches expire by age versus when the app reports revisions.
+    Then a change made in the app, a file load (prefetch) and the depsgraph handler's per-edit cost.
+    """
+    duration = env.iterations(2.0, 0.5)
+
+    def idle(history_events):
+        env.reset(history_size=1_000)
+        env.config.history_events = history_events
+        state.SafeVersionList.show_versions = True
+        saved_max_age = state.HistoryStore.max_age
+        state.HistoryStore.max_age = 0.05
+        try:
+            with quiet():
+                state._poll_app_status()
+                _draw_panel()
+                time.sleep(0.05)
+                _draw_panel()
+                env.config.request_counts.clear()
+                end = time.monotonic() + duration
+                next_poll = 0.0
+                while time.monotonic() < end:
+                    if time.monotonic() >= next_poll:
+                        state._poll_app_status()
+                        next_poll = time.monotonic() + 0.1
+                    _draw_panel()
+                    bpy.app.timers.run_pending()
+                    time.sleep(0.01)
+        finally:
+            state.HistoryStore.max_age = saved_max_age
+        return env.config.request_counts.get("/draft/history", 0)
+
+    by_age = idle(False)
+    by_events = idle(True)
+
+    # A commit made in the app: one refetch at the next status poll
+    api.send_request('/draft/commit', {'projectRoot': env.project_root, 'label': "From the app",
+                                       'files': [env.blend_path]})
+    with quiet():
+        state._poll_app_status()
+    cached = history.get_file_history(env.blend_path, block=False) or []
+    refetches = env.config.request_counts.get("/draft/history", 0) - by_events
+
+    # Opening another file: the handler returns at once and the history is cached before the first draw
+    other = os.path.join(env.project_root, "scenes", "other.blend")
+    with open(other, "wb") as f:
+        f.write(b"BLENDER-v402")
+    state.HistoryStore.entries.clear()
+    state.RootCache.cache.clear()
+    bpy.data.filepath = other
+    t0 = time.perf_counter()
+    handlers.on_load_post()
+    handler_s = time.perf_counter() - t0
+    while env.project_root not in state.HistoryStore.entries and time.perf_counter() - t0 < 5:
+        time.sleep(0.001)
+    prefetched_s = time.perf_counter() - t0
+    bpy.data.filepath = env.blend_path
+    os.remove(other)
+
+    edits = measure(handlers.on_depsgraph_update_post, env.iterations(100_000, 10_000))
+    result = summarize(edits, idle_s=duration, history_requests_by_age=by_age,
+                       history_requests_by_events=by_events, app_change_refetches=refetches,
+                       app_change_visible=bool(cached) and cached[0].get("label") == "From the app",
+                       load_handler_s=handler_s, load_to_cached_history_s=prefetched_s)
+    return result
+
+
+@benchmark("retention.year_of_autosaves", "history")
+def bench_retention(env):
+    """
+    A year of versions every 10 minutes (mostly default labels): plan time over the whole history,
+    how many versions the default policy keeps, and history fetch time before and after pruning.
+    """
+    from datetime import datetime, timedelta, timezone
+    from mock_server import make_history
+
+    count = env.iterations(52_560, 10_000)
+    env.reset(history_size=0)
+    start = datetime.now(timezone.utc) - timedelta(minutes=10 * count)
+    env.config.history = make_history(count, other_every=0, start=start, step_seconds=600)
+    for i, v in enumerate(env.config.history):
+        if i % 500:
+            v["label"] = "New Version"
+
+    def fetch():
+        state.HistoryStore.entries.clear()
+        return history.get_file_history(env.blend_path)
+
+    fetch_before = statistics.fmean(measure(fetch, 3, warmup=0))
+    versions = fetch()
+    samples = measure(lambda: retention.plan(versions), env.iterations(10, 3))
+    plan = retention.plan(versions)
+
+    op = operators_batch.object_ot_df_plan_retention()
+    op.execute(env.context)
+    op = operators_batch.object_ot_df_apply_retention()
+    op.execute(env.context)
+    fetch_after = statistics.fmean(measure(fetch, 3, warmup=0))
+    return summarize(samples, versions=count, kept=len(plan.keep), pruned=len(plan.prune),
+                     kept_because=plan.summary()["kept_because"], history_after=len(env.config.history),
+                     fetch_before_s=fetch_before, fetch_after_s=fetch_after,
+                     report=op.reports[-1][1] if op.reports else None)
+
+
+@benchmark("operator.restore_quick", "operators")
+def bench_restore_quick(env):
+    env.reset(history_size=1_000)
+
+    def call():
+        op = operators_restore.object_ot_df_restore_quick()
+        op.version_id = "ver-1"
+        op.execute(env.context)
+
+    samples = measure(call, env.iterations(100, 10))
+    return summarize(samples, server_calls=dict(env.config.request_counts))
+
+
+@benchmark("operator.restore_verified", "operators")
+def bench_restore_verified(env):
+    """
+    Restore of a large file whose version carries a sha256: the operator returns while the file
+    is hashed on the integrity worker; a damaged file is then flagged.
+    """
+    import hashlib
+
+    env.reset(history_size=10)
+    size = (64 if env.quick else 256) * 1024 * 1024
+    with open(env.blend_path, "wb") as f:
+        block = os.urandom(1024 * 1024)
+        for _ in range(size // len(block)):
+            f.write(block)
+    with open(env.blend_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    env.config.history[-1]["files"] = {"scenes/scene.blend": {"size": size, "hash": f"sha256:{digest}"}}
+    history.load_version_history(env.blend_path, refresh=True)
+
+    def restore():
+        op = operators_restore.object_ot_df_restore_quick()
+        op.version_id = "ver-1"
+        t0 = time.perf_counter()
+        with quiet():    # no stored copy in the mock: the delta attempt falls back to a full restore
+            op.execute(env.context)
+        elapsed = time.perf_counter() - t0
+        with quiet():
+            while state.IntegrityState.pending:
+                bpy.app.timers.run_pending()
+                time.sleep(0.001)
+        return elapsed, state.IntegrityState.last_result
+
+    try:
+        samples, results = [], []
+        for _ in range(env.iterations(5, 2)):
+            elapsed, result = restore()
+            samples.append(elapsed)
+            results.append(result)
+        # A torn write: the last block never made it to disk
+        with open(env.blend_path, "r+b") as f:
+            f.truncate(size - 1024 * 1024)
+        _, damaged = restore()
+        flagged = bool(state.IntegrityState.failures)
+    finally:
+        with open(env.blend_path, "wb") as f:
+            f.write(b"BLENDER-v402" + b"\0" * 1024)
+    hash_s = statistics.fmean(r["seconds"] for r in results)
+    return summarize(samples, file_mb=size // (1024 * 1024), verified=all(r["ok"] for r in results),
+                     hash_s=hash_s, hash_mb_per_s=size / 1024 / 1024 / hash_s,
+                     damaged_detected=not damaged["ok"] and flagged)
+
+
+@benchmark("render.animation_versioned", "operators")
+def bench_render_versioning(env):
+    """
+    An animation render of an opted-in scene (each frame takes a few ms to "render", every fourth
+    frame holds the previous one): render_write handler cost, time from render_complete until the
+    version is committed, and the same render versioned afterwards with nothing hashed during it.
+    A second identical render stores no new frames; a still render is versioned from its Render Result.
+    """
+
+    frames, frame_mb, render_s = env.iterations((240, 8, 0.02), (48, 2, 0.005))
+    env.reset(history_size=10)
+    out_dir = os.path.join(env.project_root, "render")
+    os.makedirs(out_dir, exist_ok=True)
+    scene = env.context.scene
+    scene.render.filepath = out_dir + os.sep
+
+    images = []
+    for frame in range(frames):
+        images.append(os.urandom(frame_mb * 1024 * 1024) if frame % 4 != 3 else images[-1])
+
+    def render(opted_in):
+        scene.draftwolf_version_renders = opted_in
+        handler_s = []
+        for frame, pixels in enumerate(images, 1):
+            time.sleep(render_s)
+            scene.frame_current = frame
+            with open(scene.render.frame_path(frame=frame), "wb") as f:
+                f.write(pixels)
+            t0 = time.perf_counter()
+            handlers.on_render_write(scene)
+            handler_s.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        handlers.on_render_complete(scene)
+        return handler_s, t0
+
+    def wait(t0):
+        with quiet():
+            while state.RenderState.pending and time.perf_counter() - t0 < 60:
+                bpy.app.timers.run_pending()
+                time.sleep(0.001)
+        return time.perf_counter() - t0
+
+    try:
+        handler_s, t0 = render(True)
+        overlapped_s = wait(t0)
+        first = dict(state.RenderState.last_result or {})
+        opted_out_s, _ = render(False)
+        op = operators_commit.object_ot_df_version_last_render()
+        t0 = time.perf_counter()
+        op.execute(env.context)
+        at_end_s = wait(t0)
+        again = dict(state.RenderState.last_result or {})
+
+        state.RenderState.last = None
+        bpy.data.images.append(bpy_stub.Image("Render Result", os.urandom(frame_mb * 1024 * 1024)))
+        op.execute(env.context)
+        wait(time.perf_counter())
+        still = dict(state.RenderState.last_result or {})
+    finally:
+        scene.draftwolf_version_renders = False
+        state.RenderState.last = state.RenderState.last_result = None
+        bpy.data.images.clear()
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return summarize(handler_s, frames=frames, frame_mb=frame_mb, handler_opted_out_s=statistics.fmean(opted_out_s),
+                     unique=first.get("unique"),
+                     stored=first.get("stored"), complete_to_committed_s=overlapped_s,
+                     hashed_at_end_s=at_end_s, second_render_stored=again.get("stored"),
+                     second_render_reused=again.get("reused"), still_versioned="versionId" in still,
+                     errors=[r["error"] for r in (first, again, still) if r.get("error")])
+
+
+@benchmark("restore.delta_vs_full", "operators")
+def bench_restore_delta(env):
+    """
+    Restore a version of a large file that differs from the working copy in a few 1 MiB regions:
+    delta restore (fingerprint, plan, rebuild, swap) versus the whole file sent the same way (an
+    empty chunk list) and versus the app's full /draft/restore. Bytes are what the app sent.
+    """
+    import hashlib
+
+    size = (512 if not env.quick else 64) * 1024 * 1024
+    changed = 4
+    env.reset(history_size=10)
+    working = os.path.join(env.project_root, "working.blend")
+    stored = os.path.join(env.project_root, "stored.blend")
+    with open(stored, "wb") as f:
+        for _ in range(size // (1024 * 1024)):
+            f.write(os.urandom(1024 * 1024))
+    shutil.copyfile(stored, working)
+    with open(working, "r+b") as f:
+        for i in range(changed):
+            f.seek(i * size // changed + 12345)
+            f.write(os.urandom(1024 * 1024))
+    with open(stored, "rb") as f:
+        expected = hashlib.sha256(f.read()).hexdigest()
+    version_id = env.config.history[0]["id"]
+    env.config.history[0]["files"] = {env.blend_path: {"size": size}}
+    env.config.stored_files[version_id] = stored
+
+    def timed(fn):
+        shutil.copyfile(working, env.blend_path)
+        before = env.config.bytes_sent
+        t0 = time.perf_counter()
+        res = fn()
+        elapsed = time.perf_counter() - t0
+        with open(env.blend_path, "rb") as f:
+            ok = hashlib.sha256(f.read()).hexdigest() == expected
+        return elapsed, env.config.bytes_sent - before, ok, res
+
+    def whole_file():
+        plan = delta.request_plan(env.project_root, env.blend_path, version_id, [])
+        temp, _, _ = delta.rebuild(env.blend_path, plan["ops"])
+        os.replace(temp, env.blend_path)
+
+    try:
+        rounds = env.iterations(3, 2)
+        runs = [timed(lambda: delta.delta_restore(env.project_root, env.blend_path, version_id)) for _ in range(rounds)]
+        whole = [timed(whole_file) for _ in range(rounds)]
+        app = [timed(lambda: api.send_request('/draft/restore', {'projectRoot': env.project_root,
+                                                                 'versionId': version_id})) for _ in range(rounds)]
+        summary = runs[-1][3]["delta"]
+        with quiet():
+            # The operator's path: delta for a large file, and a full restore when the app has no plan
+            env.config.stored_files.pop(version_id)
+            shutil.copyfile(stored, env.blend_path)
+            fallback = delta.restore_version(env.project_root, env.blend_path, version_id)
+    finally:
+        for path in (working, stored):
+            os.remove(path)
+        with open(env.blend_path, "wb") as f:
+            f.write(b"BLENDER-v402" + b"\0" * 1024)
+    return summarize([r[0] for r in runs], file_mb=size // (1024 * 1024), changed_mb=changed,
+                     delta_bytes=runs[-1][1], whole_file_bytes=whole[-1][1],
+                     whole_file_s=statistics.fmean(r[0] for r in whole),
+                     app_full_restore_s=statistics.fmean(r[0] for r in app),
+                     fingerprint_s=summary["fingerprintSeconds"], bytes_copied=summary["bytesCopied"],
+                     correct=all(r[2] for r in runs + whole + app),
+                     fallback_ok=bool(fallback and fallback.get("success")) and "delta" not in fallback)
+
+
+@benchmark("snapshot.before_restore", "operators")
+def bench_snapshot(env):
+    """
+    Safety snapshot of a large working file before a restore: take() (reflink, or a hardlink on
+    filesystems without one) versus a sparse copy and a plain copy, with the disk space each uses.
+    Then a delta restore undone and redone, expiry, and a hardlinked snapshot kept intact by
+    unshare() when a full restore writes into the file.
+    """
+    import hashlib
+
+    size = (64 if env.quick else 256) * 1024 * 1024
+    env.reset(history_size=10)
+    path = env.blend_path
+    directory = snapshot.snapshot_dir(path)
+    stored = os.path.join(env.project_root, "stored.blend")
+
+    def sha(p):
+        with open(p, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def write(p, seed):
+        # A quarter of the file is holes, which a sparse copy keeps and a plain copy fills
+        with open(p, "wb") as f:
+            for i in range(size // (1024 * 1024)):
+                if i % 4 == 3:
+                    f.seek(1024 * 1024, os.SEEK_CUR)
+                else:
+                    f.write(os.urandom(1024 * 1024))
+            f.truncate()
+            f.seek(seed)
+            f.write(os.urandom(4096))
+
+    def fresh_dir():
+        shutil.rmtree(directory, ignore_errors=True)
+        state.SnapshotState.last = None
+
+    def disk_bytes(p):
+        return os.stat(p).st_blocks * 512
+
+    try:
+        write(path, 0)
+        original = sha(path)
+        rounds = env.iterations(5, 3)
+        take_s, sparse_s, copy_s = [], [], []
+        for _ in range(rounds):
+            fresh_dir()
+            t0 = time.perf_counter()
+            record = snapshot.take(path, "ver-1")
+            take_s.append(time.perf_counter() - t0)
+            method = record["method"]
+            # A linked or cloned snapshot adds no blocks; a copy adds its own
+            taken_disk = 0 if method in ("hardlink", "reflink") else disk_bytes(record["snapshot"])
+            target = os.path.join(directory, "sparse.tmp")
+            t0 = time.perf_counter()
+            snapshot.sparse_copy(path, target)
+            sparse_s.append(time.perf_counter() - t0)
+            sparse_disk = disk_bytes(target)
+            os.remove(target)
+            t0 = time.perf_counter()
+            shutil.copyfile(path, target)
+            copy_s.append(time.perf_counter() - t0)
+            copy_disk = disk_bytes(target)
+            os.remove(target)
+
+        # Restore a version (delta: the file is replaced), undo it, then undo the undo
+        fresh_dir()
+        write(stored, size // 2)
+        restored = sha(stored)
+        version_id = env.config.history[0]["id"]
+        env.config.history[0]["files"] = {path: {"size": size}}
+        env.config.stored_files[version_id] = stored
+        snapshot.take(path, version_id)
+        res = delta.restore_version(env.project_root, path, version_id)
+        after_restore = sha(path)
+        snapshot.undo(path)
+        after_undo = sha(path)
+        snapshot.undo(path)
+        after_redo = sha(path)
+        round_trip = (bool(res and res.get("success")) and after_restore == restored
+                      and after_undo == original and after_redo == restored)
+
+        # A full restore copies into the file: unshare() first keeps the hardlinked snapshot intact
+        fresh_dir()
+        write(path, 4096)
+        before_full = sha(path)
+        record = snapshot.take(path, version_id)
+        snapshot.unshare(path)
+        api.send_request('/draft/restore', {'projectRoot': env.project_root, 'versionId': version_id})
+        snapshot_intact = sha(record["snapshot"]) == before_full and sha(path) == restored
+
+        # Expiry: the newest SNAPSHOT_KEEP stay, and nothing older than SNAPSHOT_MAX_AGE
+        fresh_dir()
+        with open(path, "wb") as f:
+            f.write(b"BLENDER-v402" + b"\0" * 1024)
+        os.makedirs(directory)
+        old = os.path.join(directory, "scene@20000101-000000-000.blend")
+        shutil.copyfile(path, old)
+        for _ in range(constants.SNAPSHOT_KEEP + 3):
+            snapshot.take(path)
+            time.sleep(0.002)
+        kept = len(snapshot.snapshots_of(path))
+        old_removed = not os.path.exists(old)
+    finally:
+        fresh_dir()
+        if os.path.exists(stored):
+            os.remove(stored)
+        with open(path, "wb") as f:
+            f.write(b"BLENDER-v402" + b"\0" * 1024)
+    mb = 1024 * 1024
+    return summarize(take_s, file_mb=size // mb, method=method, snapshot_disk_mb=taken_disk / mb,
+                     sparse_copy_s=statistics.fmean(sparse_s), sparse_copy_disk_mb=sparse_disk / mb,
+                     plain_copy_s=statistics.fmean(copy_s), plain_copy_disk_mb=copy_disk / mb,
+                     undo_round_trip=round_trip, snapshot_intact_after_full_restore=snapshot_intact,
+                     kept=kept, keep_limit=constants.SNAPSHOT_KEEP, expired_by_age=old_removed)
+
+
+@benchmark("pull.material_from_version", "operators")
+def bench_pull_material(env):
+    """
+    Pull one material from a past version of a large file into the open, unsaved file: the first
+    fetch (the app exports the version into the pull cache), a second one served from the cache,
+    listing the file's datablocks and appending the material over the open file's copy.
+    """
+
+    env.reset(history_size=10)
+    size = (256 if not env.quick else 32) * 1024 * 1024
+    index = {"materials": [f"Mat_{i:03d}" for i in range(200)],
+             "objects": [f"Prop_{i:03d}" for i in range(500)], "meshes": [f"Mesh_{i:03d}" for i in range(500)]}
+    bpy_stub.write_blend(env.blend_path, index, size)
+    api.send_request('/draft/commit', {'projectRoot': env.project_root, 'label': "Lookdev pass",
+                                       'files': [env.blend_path]})
+    history.load_version_history(env.blend_path, refresh=True)
+    version_id = env.config.history[0]["id"]
+    old = bpy_stub.ID("Mat_007")
+    bpy.data.materials.append(old)
+    bpy.data.is_dirty = True
+    bpy.ops.calls.clear()
+
+    def fetch():
+        op = operators_restore.object_ot_df_pull_from_version()
+        op.version_id = version_id
+        t0 = time.perf_counter()
+        with quiet():
+            op.execute(env.context)
+            while state.PullState.pending and time.perf_counter() - t0 < 30:
+                bpy.app.timers.run_pending()
+                time.sleep(0.001)
+        return time.perf_counter() - t0
+
+    try:
+        first_s = fetch()
+        first_requests = env.config.request_counts.get("/draft/batch", 0)
+        cached = [fetch() for _ in range(env.iterations(10, 3))]
+        listing = state.PullState.listing or {}
+        list_s = statistics.fmean(measure(lambda: pull.list_datablocks(state.PullState.path), 5))
+
+        op = operators_restore.object_ot_df_pull_datablocks()
+        op.category = 'materials'
+        op.names = "Mat_007"
+        op.replace = True
+        t0 = time.perf_counter()
+        result = op.execute(env.context)
+        pull_s = time.perf_counter() - t0
+        new = bpy.data.materials.get("Mat_007")
+        replaced = result == {'FINISHED'} and new is not old and old.remapped_to is new
+        kept_open = bpy.data.is_dirty and not any(name in ("wm.open_mainfile", "wm.read_homefile")
+                                                  for name, _ in bpy.ops.calls)
+        cache_requests = env.config.request_counts.get("/draft/batch", 0) - first_requests
+    finally:
+        pull.clear()
+        shutil.rmtree(pull.cache_root(), ignore_errors=True)
+        bpy.data.materials.clear()
+        bpy.data.is_dirty = False
+        with open(env.blend_path, "wb") as f:
+            f.write(b"BLENDER-v402" + b"\0" * 1024)
+    return summarize(cached, file_mb=size // (1024 * 1024), first_fetch_s=first_s, first_fetch_requests=first_requests,
+                     cached_fetch_requests=cache_requests, listed={k: len(v) for k, v in listing.items()},
+                     list_s=list_s, pull_s=pull_s, replaced=replaced, open_file_kept=kept_open)
+
+
+@benchmark("operator.retrieve_invoke.cold", "operators")
+def bench_retrieve_invoke_cold(env):
+    env.reset(history_size=1_000)
+
+    def call():
+        op = operators_restore.object_ot_df_retrieve()
+        op.invoke(env.context, None)
+
+    samples = measure(call, env.iterations(50, 5), setup=state.HistoryStore.entries.clear)
+    return summarize(samples, server_calls=dict(env.config.request_counts))
+
+
+@benchmark("operator.retrieve_invoke.after_panel", "operators")
+def bench_retrieve_invoke_warm(env):
+    """Restore dialog opened right after the panel loaded history: should hit no network."""
+    env.reset(history_size=1_000)
+    history.load_version_history(env.blend_path)
+    env.config.request_counts.clear()
+
+    def call():
+        op = operators_restore.object_ot_df_retrieve()
+        op.invoke(env.context, None)
+
+    samples = measure(call, env.iterations(200, 20))
+    return summarize(samples, server_calls=dict(env.config.request_counts))
+
+
+@benchmark("startup.import_and_register", "startup")
+def bench_startup(env):
+    import startup
+    result = startup.sample(env.iterations(10, 3))
+    result["mean_s"] = result["import_mean_s"] + result["register_mean_s"]
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def _git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(selected, quick):
+    env = Env(quick)
+    results = {}
+    try:
+        for name, group, fn in BENCHMARKS:
+            if selected and not any(s in name for s in selected):
+                continue
+            t0 = time.perf_counter()
+            try:
+                result = fn(env)
+                result["group"] = group
+            except Exception as e:  # keep going; record the failure in the report
+                result = {"group": group, "error": f"{type(e).__name__}: {e}"}
+            result["wall_s"] = time.perf_counter() - t0
+            results[name] = result
+            mean = result.get("mean_s")
+            shown = f"{mean * 1e3:10.3f} ms" if mean is not None else result.get("error")
+            print(f"{name:45s} {shown}", file=sys.stderr)
+    finally:
+        env.close()
+    return results
+
+
+def compare(current, baseline_path, threshold):
+    """Print mean-time ratios against a previous results file. Returns number of regressions."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = 0
+    print(f"\n{'benchmark':45s} {'baseline':>12s} {'current':>12s} {'ratio':>8s}", file=sys.stderr)
+    for name, res in current.items():
+        old = baseline.get(name, {}).get("mean_s")
+        new = res.get("mean_s")
+        if not old or new is None:
+            continue
+        ratio = new / old
+        flag = ""
+        if ratio > 1.0 + threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{name:45s} {old * 1e3:10.3f}ms {new * 1e3:10.3f}ms {ratio:7.2f}x{flag}", file=sys.stderr)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-o", "--output", help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("-k", dest="select", action="append", default=[],
+                        help="Only run benchmarks whose name contains this substring (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations, for smoke runs")
+    parser.add_argument("--compare", metavar="BASELINE_JSON", help="Compare against an earlier results file")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown reported as a regression (default 0.10)")
+    parser.add_argument("--list", action="store_true", help="List benchmark names and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, group, _ in BENCHMARKS:
+            print(f"{group:12s} {name}")
+        return 0
+
+    results = run(args.select, args.quick)
+    report = {
+        "schema": 1,
+        "revision": _git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": args.quick,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Startup-cost harness: import and register() time of the addon in fresh interpreters.
+
+Each sample runs in a new subprocess (so module caches are cold), with the stub
+``bpy`` already imported, mirroring Blender where bpy is always loaded:
+
+    python benchmarks/startup.py -n 20 -o startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ADDON_DIR = os.path.join(os.path.dirname(BENCH_DIR), "DraftWolf_Control")
+
+# Modules whose presence after register() means implementation code was loaded eagerly
+WATCHED_MODULES = (
+    "urllib.request",
+    "http.client",
+    "draftwolf.api",
+    "draftwolf.history",
+    "draftwolf.path_utils",
+    "draftwolf.update",
+    "draftwolf.app_detection",
+    "draftwolf.shared_status",
+)
+
+
+def _child():
+    """Measure one cold import + register() and print a JSON line."""
+    sys.path.insert(0, BENCH_DIR)
+    sys.path.insert(0, ADDON_DIR)
+    import bpy_stub
+    bpy = bpy_stub.install()
+    before = set(sys.modules)
+
+    t0 = time.perf_counter()
+    import draftwolf
+    t1 = time.perf_counter()
+    draftwolf.register()
+    t2 = time.perf_counter()
+
+    loaded = set(sys.modules) - before
+    print(json.dumps({
+        "import_s": t1 - t0,
+        "register_s": t2 - t1,
+        "modules_loaded": len(loaded),
+        "eager_modules": sorted(m for m in WATCHED_MODULES if m in loaded),
+        "threads_started": int(bool(draftwolf.state.StatusCache.thread_running)),
+        "registered_classes": len(bpy.utils.registered),
+    }))
+    draftwolf.unregister()
+
+
+def sample(runs):
+    """Run ``runs`` cold subprocess samples and return a summary dict."""
+    rows = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child"],
+                             capture_output=True, text=True, check=True)
+        rows.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    imports = [r["import_s"] for r in rows]
+    registers = [r["register_s"] for r in rows]
+    return {
+        "runs": runs,
+        "import_mean_s": statistics.fmean(imports),
+        "import_median_s": statistics.median(imports),
+        "register_mean_s": statistics.fmean(registers),
+        "register_median_s": statistics.median(registers),
+        "modules_loaded": rows[-1]["modules_loaded"],
+        "eager_modules": rows[-1]["eager_modules"],
+        "threads_started_at_register": rows[-1]["threads_started"],
+        "registered_classes": rows[-1]["registered_classes"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--runs", type=int, default=10)
+    parser.add_argument("-o", "--output", help="Write JSON to this file (default: stdout)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        _child()
+        return 0
+    text = json.dumps(sample(args.runs), indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
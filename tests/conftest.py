@@ -0,0 +1,64 @@
+"""
+Shared fixtures: the stub bpy from benchmarks/, and the addon's API client pointed
+at an in-process MockDraftWolfServer.
+"""
+
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _p in (os.path.join(REPO_ROOT, "benchmarks"), os.path.join(REPO_ROOT, "DraftWolf_Control")):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+import bpy_stub  # noqa: E402
+
+bpy_stub.install()
+
+import bpy  # noqa: E402
+
+from draftwolf import policy, singleflight, transport  # noqa: E402
+from mock_server import MockConfig, MockDraftWolfServer  # noqa: E402
+
+
+@pytest.fixture
+def point_at(monkeypatch):
+    """point_at(url): send the addon's API calls to url for this test."""
+    def point(url):
+        tcp = transport.TcpTransport.from_url(url)
+        monkeypatch.setattr(transport, "_transport", tcp)
+        monkeypatch.setattr(transport, "_tcp_fallback", tcp)
+    return point
+
+
+@pytest.fixture
+def user_dirs(tmp_path, monkeypatch):
+    """Blender's user resource folders under tmp_path/user for this test; yields that folder."""
+    def user_resource(resource_type, path="", create=False):
+        directory = tmp_path / "user" / resource_type.lower() / path
+        if create:
+            directory.mkdir(parents=True, exist_ok=True)
+        return str(directory)
+
+    monkeypatch.setattr(bpy.utils, "user_resource", user_resource)
+    return tmp_path / "user"
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch, point_at):
+    """A running mock app serving tmp_path as the project; yields the server (its config is server.config)."""
+    # No discovery or coordination files from a real session
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+    monkeypatch.setattr(policy, "breaker", policy.CircuitBreaker())
+    monkeypatch.setattr(policy, "backoff_delay", lambda attempt: 0.0)
+    singleflight.single_flight.reset()
+    config = MockConfig()
+    config.project_root = str(tmp_path)
+    server = MockDraftWolfServer(config).start()
+    point_at(server.url)
+    try:
+        yield server
+    finally:
+        server.stop()
@@ -0,0 +1,84 @@
+"""Delta restore (delta.py) against the mock app: a correct rebuild, and wrong plans that must not be swapped in."""
+
+import base64
+import hashlib
+import os
+
+import pytest
+
+from draftwolf import delta
+
+CHUNK = 64 * 1024
+
+
+def _sha(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+@pytest.fixture
+def files(app, tmp_path):
+    """(working file, stored version id, stored file): the stored copy differs in one chunk."""
+    working = tmp_path / "scene.blend"
+    stored = tmp_path / "stored.blend"
+    data = bytearray(os.urandom(8 * CHUNK))
+    stored.write_bytes(bytes(data))
+    data[3 * CHUNK + 100:3 * CHUNK + 200] = os.urandom(100)
+    working.write_bytes(bytes(data))
+    app.config.history = [{'id': "ver-1", 'versionNumber': "1", 'files': {str(working): {}}}]
+    app.config.stored_files["ver-1"] = str(stored)
+    return str(working), "ver-1", str(stored)
+
+
+def _tampered_plan(monkeypatch, tamper):
+    real = delta.request_plan
+
+    def request_plan(*args, **kwargs):
+        res = real(*args, **kwargs)
+        tamper(res)
+        return res
+    monkeypatch.setattr(delta, "request_plan", request_plan)
+
+
+def _leftovers(path):
+    return [n for n in os.listdir(os.path.dirname(path)) if n.endswith(".draftwolf-delta")]
+
+
+def test_delta_restore_rebuilds_the_version(app, files):
+    working, version_id, stored = files
+    res = delta.delta_restore(app.config.project_root, working, version_id, chunk_size=CHUNK)
+    assert res['success'] is True
+    assert _sha(working) == _sha(stored)
+    summary = res['delta']
+    assert summary['verified'] is True
+    assert summary['bytesReceived'] == CHUNK
+    assert summary['bytesCopied'] == 7 * CHUNK
+    assert not _leftovers(working)
+
+
+@pytest.mark.parametrize("tamper", [
+    pytest.param(lambda res: res.update(size=res['size'] + 1), id="wrong size"),
+    pytest.param(lambda res: res.update(sha256="0" * 64), id="wrong digest"),
+    pytest.param(lambda res: next(op for op in res['ops'] if 'data' in op).update(
+        data=base64.b64encode(os.urandom(CHUNK)).decode("ascii")), id="bad chunk"),
+    pytest.param(lambda res: res['ops'].reverse(), id="ranges out of order"),
+])
+def test_wrong_plan_leaves_the_working_file(app, files, monkeypatch, tamper):
+    working, version_id, _ = files
+    before = _sha(working)
+    _tampered_plan(monkeypatch, tamper)
+    with pytest.raises(delta.DeltaError):
+        delta.delta_restore(app.config.project_root, working, version_id, chunk_size=CHUNK)
+    assert _sha(working) == before
+    assert not _leftovers(working)
+
+
+def test_failed_delta_falls_back_to_a_full_restore(app, files, monkeypatch, capsys):
+    working, version_id, stored = files
+    monkeypatch.setattr(delta, "DELTA_MIN_SIZE", CHUNK)
+    _tampered_plan(monkeypatch, lambda res: res.update(sha256="0" * 64))
+    res = delta.restore_version(app.config.project_root, working, version_id)
+    assert res['success'] is True and 'delta' not in res
+    assert app.config.request_counts['/draft/restore'] == 1
+    assert _sha(working) == _sha(stored)
+    assert "restoring the whole file" in capsys.readouterr().out
@@ -0,0 +1,74 @@
+"""Reconciling optimistic history updates with the app (history._reconcile)."""
+
+import threading
+import time
+
+import pytest
+
+from draftwolf import history, state
+from draftwolf.scheduler import scheduler
+from mock_server import make_history
+
+
+@pytest.fixture
+def project(app, tmp_path, monkeypatch):
+    """(root, filepath, checks): a cached 3-version history; reconcile checks are collected, not scheduled."""
+    root = str(tmp_path)
+    app.config.history = make_history(3, other_every=0)
+    monkeypatch.setattr(state.HistoryStore, "entries", {})
+    monkeypatch.setattr(state.HistoryStore, "inflight", {})
+    monkeypatch.setattr(state.HistoryStore, "reverted", None)
+    checks = []
+    monkeypatch.setattr(history, "_schedule_reconcile", lambda root, check: checks.append(check))
+    history.fetch_project_history(root)
+    return root, str(tmp_path / "scenes" / "scene.blend"), checks
+
+
+def _labels(root):
+    return {v['id']: v['label'] for v in state.HistoryStore.entries[root]['history']}
+
+
+def _reconcile(root, checks):
+    history._reconcile(root, checks)
+    scheduler.drain_main_thread_queue()
+
+
+def test_rejected_rename_is_rolled_back_and_reported(app, project):
+    root, filepath, checks = project
+    # A revalidation that started before the rename is still in flight when the reconcile runs
+    app.config.reply_delay['/draft/history'] = 0.3
+    stale = threading.Thread(target=history.fetch_project_history, args=(root,))
+    stale.start()
+    time.sleep(0.1)
+    history.record_rename(root, filepath, "ver-2", "Blocking pass")
+    assert _labels(root)["ver-2"] == "Blocking pass"
+
+    _reconcile(root, checks)
+    stale.join(5)
+
+    assert _labels(root)["ver-2"] == "Version 2"
+    assert state.HistoryStore.reverted['root'] == root
+    assert "Blocking pass" in state.HistoryStore.reverted['problems'][0]
+
+
+def test_applied_changes_are_kept_and_clear_an_earlier_report(app, project):
+    root, filepath, checks = project
+    state.HistoryStore.reverted = {'root': root, 'problems': ["an earlier rename"]}
+    app.config.history[1]['label'] = "Blocking pass"
+    history.record_rename(root, filepath, "ver-2", "Blocking pass")
+
+    _reconcile(root, checks)
+
+    assert _labels(root)["ver-2"] == "Blocking pass"
+    assert state.HistoryStore.reverted is None
+
+
+def test_partial_batch_reports_the_changes_the_app_missed(app, project):
+    root, filepath, checks = project
+    app.config.history[0]['label'] = "Final"
+    history.record_batch(root, filepath, {"ver-3": "Final", "ver-1": "First"}, {}, {"ver-2"})
+
+    _reconcile(root, checks)
+
+    assert _labels(root) == {"ver-3": "Final", "ver-2": "Version 2", "ver-1": "Version 1"}
+    assert state.HistoryStore.reverted['problems'] == ["2 batch change(s) were not applied by the app"]
@@ -0,0 +1,89 @@
+"""Circuit breaker state transitions and retries (policy.py), against the mock app and a hung socket."""
+
+import socket
+import time
+
+import pytest
+
+from draftwolf import api, policy
+
+
+def test_breaker_opens_after_threshold_and_rejects():
+    breaker = policy.CircuitBreaker(threshold=3, reset_timeout=60.0)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == policy.CLOSED
+    breaker.record_failure()
+    assert breaker.state == policy.OPEN
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+
+
+def test_breaker_half_open_lets_one_probe_through():
+    breaker = policy.CircuitBreaker(threshold=1, reset_timeout=0.05, max_reset_timeout=0.15)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == policy.HALF_OPEN
+    assert not breaker.allow()
+
+    # A failed probe reopens it for twice as long, up to the cap
+    breaker.record_failure()
+    assert breaker.state == policy.OPEN
+    assert breaker.reset_timeout == pytest.approx(0.1)
+    breaker.record_failure()
+    time.sleep(0.11)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.reset_timeout == pytest.approx(0.15)
+
+    time.sleep(0.16)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == policy.CLOSED
+    assert breaker.failures == 0
+    assert breaker.reset_timeout == pytest.approx(0.05)
+
+
+def test_hung_app_opens_breaker_then_recovers(app, point_at, monkeypatch):
+    breaker = policy.CircuitBreaker(threshold=2, reset_timeout=0.2)
+    monkeypatch.setattr(policy, "breaker", breaker)
+    hung = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    hung.bind(("127.0.0.1", 0))
+    hung.listen(8)    # accepts connections, never answers
+    try:
+        point_at(f"http://127.0.0.1:{hung.getsockname()[1]}")
+        for _ in range(2):
+            res = api.send_request('/health')
+            assert res['success'] is False
+        assert breaker.state == policy.OPEN
+
+        t0 = time.perf_counter()
+        res = api.send_request('/health')
+        assert time.perf_counter() - t0 < 0.1    # rejected without waiting for a timeout
+        assert res['success'] is False and "unavailable" in res['error']
+        assert breaker.rejected == 1
+    finally:
+        hung.close()
+
+    # The app is back: once the reset timeout passes, one probe closes the breaker
+    point_at(app.url)
+    time.sleep(0.25)
+    assert api.send_request('/health')['success'] is True
+    assert breaker.state == policy.CLOSED
+
+
+def test_retryable_status_is_retried_only_for_idempotent_endpoints(app):
+    app.config.fail_rate = 1.0
+    app.config.fail_status = 503
+    res = api.send_request('/draft/find-root', {'path': app.config.project_root})
+    assert res['success'] is False
+    assert app.config.request_counts['/draft/find-root'] == 1 + policy.policy_for('/draft/find-root').retries
+
+    res = api.send_request('/draft/commit', {'projectRoot': app.config.project_root, 'files': []})
+    assert res['success'] is False
+    assert app.config.request_counts['/draft/commit'] == 1
+    # The app answered: an HTTP error is not a connection failure
+    assert policy.breaker.state == policy.CLOSED
@@ -0,0 +1,70 @@
+"""The pull cache (pull.fetch_version_file): a private per-user folder whose copies are reused only if trusted."""
+
+import os
+import stat
+
+import pytest
+
+from draftwolf import api, pull
+
+
+@pytest.fixture
+def version(app, tmp_path, user_dirs):
+    """A committed version of tmp_path/scenes/scene.blend."""
+    blend = tmp_path / "scenes" / "scene.blend"
+    blend.parent.mkdir()
+    blend.write_bytes(b"BLENDER-v402" + b"\1" * 4096)
+    api.send_request('/draft/commit', {'projectRoot': str(tmp_path), 'label': "Lookdev",
+                                       'files': [str(blend)]})
+    return str(blend), app.config.history[0]
+
+
+def _exports(app):
+    return app.config.request_counts.get('/draft/batch', 0)
+
+
+def test_cache_is_private_to_the_user(app, tmp_path, user_dirs, version):
+    filepath, entry = version
+    path, error = pull.fetch_version_file(str(tmp_path), filepath, entry)
+
+    assert error is None
+    assert path.startswith(str(user_dirs))
+    assert stat.S_IMODE(os.stat(pull.cache_root()).st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700
+
+
+def test_unchanged_export_is_reused(app, tmp_path, version):
+    filepath, entry = version
+    first, _ = pull.fetch_version_file(str(tmp_path), filepath, entry)
+    second, error = pull.fetch_version_file(str(tmp_path), filepath, entry)
+
+    assert error is None
+    assert second == first
+    assert _exports(app) == 1
+
+
+def test_replaced_copy_of_the_same_size_is_exported_again(app, tmp_path, version):
+    filepath, entry = version
+    path, _ = pull.fetch_version_file(str(tmp_path), filepath, entry)
+    with open(path, "r+b") as f:
+        f.write(b"BLENDER-v402" + b"\2" * 4096)
+    os.utime(path, ns=(0, 0))
+
+    again, error = pull.fetch_version_file(str(tmp_path), filepath, entry)
+
+    assert error is None
+    assert _exports(app) == 2
+    with open(again, "rb") as f:
+        assert f.read() == b"BLENDER-v402" + b"\1" * 4096
+
+
+def test_copy_matching_the_manifest_digest_is_reused_without_a_stamp(app, tmp_path, version):
+    filepath, entry = version
+    path, _ = pull.fetch_version_file(str(tmp_path), filepath, entry)
+    os.remove(os.path.join(os.path.dirname(path), pull.EXPORT_STAMP))
+
+    again, error = pull.fetch_version_file(str(tmp_path), filepath, entry)
+
+    assert error is None
+    assert again == path
+    assert _exports(app) == 1
@@ -0,0 +1,86 @@
+"""Render versioning (render.py): nothing is requested in the render handler, and stills stay private."""
+
+import os
+import stat
+import time
+
+import bpy
+import bpy_stub
+import pytest
+
+from draftwolf import api, history, render, state
+from draftwolf.scheduler import scheduler
+
+
+@pytest.fixture
+def scene(app, tmp_path, user_dirs, monkeypatch):
+    """A scene that rendered one frame of a committed tmp_path/scenes/scene.blend, with nothing cached."""
+    blend = tmp_path / "scenes" / "scene.blend"
+    blend.parent.mkdir()
+    blend.write_bytes(b"BLENDER-v402")
+    api.send_request('/draft/commit', {'projectRoot': str(tmp_path), 'label': "Layout",
+                                       'files': [str(blend)]})
+    monkeypatch.setattr(bpy.data, "filepath", str(blend))
+    monkeypatch.setattr(state.RootCache, "cache", {})
+    monkeypatch.setattr(state.HistoryStore, "entries", {})
+    monkeypatch.setattr(state.HistoryStore, "inflight", {})
+    for name in ("last", "last_result"):
+        monkeypatch.setattr(state.RenderState, name, None)
+    monkeypatch.setattr(state.RenderState, "pending", False)
+    monkeypatch.setattr(state.RenderState, "hashes", {})
+    scene = bpy_stub.Scene()
+    scene.render.filepath = str(tmp_path / "render") + os.sep
+    os.makedirs(scene.render.filepath)
+    frame = scene.render.frame_path(frame=1)
+    with open(frame, "wb") as f:
+        f.write(os.urandom(4096))
+    monkeypatch.setattr(state.RenderState, "frames", [frame])
+    app.config.request_counts.clear()
+    try:
+        yield scene
+    finally:
+        render.shutdown()
+
+
+def _wait_for_commit(timeout=5.0):
+    end = time.monotonic() + timeout
+    while state.RenderState.pending and time.monotonic() < end:
+        scheduler.drain_main_thread_queue()
+        time.sleep(0.005)
+    return state.RenderState.last_result
+
+
+def test_handler_makes_no_requests_when_nothing_is_cached(app, scene):
+    render.render_finished(scene)
+
+    assert state.RenderState.last.blend_version_id is None
+    assert app.config.request_counts == {}
+
+
+def test_handler_takes_the_blend_version_from_the_cache(app, scene):
+    history.load_version_history(bpy.data.filepath)
+    app.config.request_counts.clear()
+    render.render_finished(scene)
+
+    assert state.RenderState.last.blend_version_id == "ver-1"
+    assert app.config.request_counts == {}
+
+
+def test_commit_worker_looks_up_what_the_handler_could_not(app, scene):
+    scene.draftwolf_version_renders = True
+    render.render_finished(scene)
+    result = _wait_for_commit()
+
+    assert result.get('versionId') == "ver-2"
+    assert app.config.history[0]["blendVersionId"] == "ver-1"
+
+
+def test_still_is_saved_to_a_private_folder(app, scene, user_dirs):
+    bpy.data.images.append(bpy_stub.Image("Render Result", b"pixels"))
+    try:
+        path = render.save_still(scene)
+    finally:
+        bpy.data.images.clear()
+
+    assert path.startswith(str(user_dirs))
+    assert stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700
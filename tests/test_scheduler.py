@@ -0,0 +1,73 @@
+"""Main-thread work queued through the scheduler: only Blender's main thread touches bpy.app.timers."""
+
+import threading
+
+import bpy
+import pytest
+
+from draftwolf import scheduler
+
+
+class _App:
+    """bpy.app stand-in recording the thread of every bpy.app.timers access."""
+
+    def __init__(self, app, timers):
+        self._app = app
+        self._timers = timers
+
+    @property
+    def timers(self):
+        self._timers.callers.append(threading.current_thread())
+        return self._timers
+
+    def __getattr__(self, name):
+        return getattr(self._app, name)
+
+
+class _Timers:
+    """bpy.app.timers stand-in recording the thread of every call."""
+
+    def __init__(self):
+        self.callers = []
+        self.registered = set()
+
+    def is_registered(self, function):
+        self.callers.append(threading.current_thread())
+        return function in self.registered
+
+    def register(self, function, first_interval=0.0, persistent=False):
+        self.callers.append(threading.current_thread())
+        self.registered.add(function)
+
+
+@pytest.fixture
+def timers(monkeypatch):
+    timers = _Timers()
+    monkeypatch.setattr(bpy, "app", _App(bpy.app, timers))
+    try:
+        yield timers
+    finally:
+        scheduler.scheduler.drain_main_thread_queue()
+
+
+def test_worker_threads_only_queue_main_thread_work(timers):
+    ran = []
+    worker = threading.Thread(target=scheduler.call_on_main_thread, args=(ran.append, "from a worker"))
+    worker.start()
+    worker.join(5)
+
+    assert timers.callers == []
+    assert ran == []
+    scheduler.scheduler.drain_main_thread_queue()
+    assert ran == ["from a worker"]
+
+
+def test_main_thread_posting_registers_the_drain_timer_once(timers):
+    ran = []
+    scheduler.call_on_main_thread(ran.append, 1)
+    scheduler.call_on_main_thread(ran.append, 2)
+
+    assert timers.registered == {scheduler._drain}
+    assert set(timers.callers) == {threading.main_thread()}
+    scheduler._drain()
+    assert ran == [1, 2]
@@ -0,0 +1,73 @@
+"""Followers of the shared status poller (state.status_task with a shared_status.StatusCoordinator)."""
+
+import time
+
+import pytest
+
+from draftwolf import history, shared_status, state
+from mock_server import make_history
+
+
+@pytest.fixture
+def coordinators(app, tmp_path, monkeypatch):
+    """(leader, follower) over one directory; this process's status task follows the leader."""
+    directory = tmp_path / "coordination"
+    directory.mkdir()
+    leader = shared_status.StatusCoordinator(str(directory))
+    follower = shared_status.StatusCoordinator(str(directory))
+    assert leader.try_lead()
+    monkeypatch.setattr(state.StatusCache, "coordinator", follower)
+    monkeypatch.setattr(state.StatusCache, "coordinator_checked", True)
+    monkeypatch.setattr(state.StatusCache, "history_events", False)
+    monkeypatch.setattr(state.StatusCache, "last_draw_time", 0)
+    monkeypatch.setattr(state.HistoryStore, "entries", {})
+    monkeypatch.setattr(state.HistoryStore, "inflight", {})
+    monkeypatch.setattr(state.HistoryStore, "revisions", None)
+    monkeypatch.setattr(state.RootCache, "cache", {})
+    try:
+        yield leader, follower
+    finally:
+        follower.release()
+        leader.release()
+
+
+def _follow(leader, revisions):
+    leader.publish(True, True, "user", revisions is not None, revisions)
+    state.status_task()
+
+
+def test_follower_refetches_a_project_only_it_has_cached(app, coordinators):
+    leader, follower = coordinators
+    root = app.config.project_root
+    app.config.history = make_history(3)
+    history.fetch_project_history(root)
+    _follow(leader, {root: 1})
+    assert state.StatusCache.history_events
+
+    app.config.history = make_history(4)
+    _follow(leader, {root: 2})
+
+    assert [v['id'] for v in state.HistoryStore.entries[root]['history']][0] == "ver-4"
+    assert app.config.request_counts.get('/draft/history') == 2
+    assert '/health' not in app.config.request_counts
+
+
+def test_follower_retries_failed_root_lookups_when_a_project_appears(app, coordinators):
+    leader, follower = coordinators
+    root = app.config.project_root
+    state.RootCache.cache["/elsewhere/scenes"] = {'root': None, 'time': time.time()}
+    state.StatusCache.last_draw_time = time.time()
+    _follow(leader, {root: 1})
+    _follow(leader, {root: 1, "/elsewhere": 1})
+
+    assert "/elsewhere/scenes" not in state.RootCache.cache
+    assert state.StatusCache.last_draw_time == 0
+
+
+def test_follower_keeps_short_ttls_without_the_leaders_revisions(app, coordinators):
+    leader, follower = coordinators
+    leader.publish(True, True, "user", True)
+    state.status_task()
+
+    assert state.StatusCache.app_running
+    assert not state.StatusCache.history_events
@@ -0,0 +1,110 @@
+"""Single-flight coalescing (singleflight.py): shared replies, errors, and detach after a mutation."""
+
+import threading
+import time
+
+import pytest
+
+from draftwolf import api, singleflight
+
+
+def _run_in_threads(count, fn):
+    results = [None] * count
+    errors = [None] * count
+
+    def run(i):
+        try:
+            results[i] = fn()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+        time.sleep(0.02)
+    for t in threads:
+        t.join(5)
+    return results, errors
+
+
+def test_concurrent_identical_calls_share_one_result():
+    flight = singleflight.SingleFlight(exempt=())
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {'success': True}
+
+    threading.Timer(0.15, release.set).start()
+    results, errors = _run_in_threads(3, lambda: flight.do('/draft/history', {'projectRoot': 'p'}, fetch))
+    assert errors == [None] * 3
+    assert len(calls) == 1
+    assert results[0] is results[1] is results[2]
+    assert flight.stats()['saved'] == 2
+
+
+def test_leader_exception_reaches_followers():
+    flight = singleflight.SingleFlight(exempt=())
+    release = threading.Event()
+
+    def fetch():
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    threading.Timer(0.15, release.set).start()
+    _, errors = _run_in_threads(3, lambda: flight.do('/draft/history', None, fetch))
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert errors[0] is errors[1] is errors[2]
+    # Nothing is left in flight: the next call goes out again
+    assert flight.stats()['in_flight'] == 0
+    assert flight.do('/draft/history', None, lambda: 'fresh') == 'fresh'
+
+
+def test_error_reply_is_shared_with_followers(app):
+    cfg = app.config
+    cfg.fail_rate = 1.0
+    cfg.fail_status = 500
+    cfg.reply_delay['/draft/history'] = 0.3
+    payload = {'projectRoot': cfg.project_root}
+    results, errors = _run_in_threads(3, lambda: api.send_request('/draft/history', payload))
+    assert errors == [None] * 3
+    assert results[0]['success'] is False
+    assert results[0] is results[1] is results[2]
+    assert cfg.request_counts['/draft/history'] == 1
+
+
+def test_read_after_a_commit_is_not_joined_to_an_older_one(app):
+    cfg = app.config
+    cfg.reply_delay['/draft/history'] = 0.5
+    payload = {'projectRoot': cfg.project_root}
+    results = {}
+
+    def read(name):
+        results[name] = api.send_request('/draft/history', payload)
+
+    before = threading.Thread(target=read, args=("before",))
+    joined = threading.Thread(target=read, args=("joined",))
+    before.start()
+    time.sleep(0.1)
+    joined.start()
+    time.sleep(0.1)
+    committed = api.send_request('/draft/commit', {'projectRoot': cfg.project_root, 'label': 'new', 'files': []})
+    assert committed['success'] is True
+    after = threading.Thread(target=read, args=("after",))
+    after.start()
+    for t in (before, joined, after):
+        t.join(5)
+
+    assert results["joined"] is results["before"]
+    assert results["after"] is not results["before"]
+    assert [v['id'] for v in results["after"]] == [committed['versionId']]
+    assert results["before"] == []
+    assert cfg.request_counts['/draft/history'] == 2
+    assert singleflight.single_flight.stats()['detached'] >= 1
+
+
+@pytest.mark.parametrize("endpoint", ['/draft/commit', '/draft/restore'])
+def test_mutating_calls_are_never_coalesced(endpoint):
+    assert not singleflight.single_flight.coalesces(endpoint)
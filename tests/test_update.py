@@ -0,0 +1,103 @@
+"""Background update checks (update.py) against the mock app's stand-in for GitHub's releases endpoint."""
+
+import json
+import time
+
+import pytest
+
+from draftwolf import state, update
+from draftwolf.scheduler import scheduler
+
+RELEASES_PATH = "/repos/draftwolf/draftwolf-blender-plugin/releases/latest"
+
+
+@pytest.fixture
+def releases(app, tmp_path, monkeypatch):
+    """The mock app serving releases, with the check's cache file under tmp_path; yields the cache path."""
+    cache_path = tmp_path / "update_check.json"
+    monkeypatch.setenv(update.UPDATE_RELEASES_URL_ENV, app.url + RELEASES_PATH)
+    monkeypatch.setattr(update, "_cache_path", lambda: str(cache_path))
+    monkeypatch.setattr(update, "UPDATE_CHECK_INTERVAL", 3600)
+    for name in ("latest_version", "release_url", "error_message"):
+        monkeypatch.setattr(state.UpdateState, name, None)
+    monkeypatch.setattr(state.UpdateState, "last_check_time", 0.0)
+    monkeypatch.setattr(state.UpdateState, "checking", True)
+    return cache_path
+
+
+def _requests(app):
+    return app.config.request_counts.get(RELEASES_PATH, 0)
+
+
+def _check(force):
+    next_due = update.run_update_check(force)
+    # Results reach UpdateState through the main-thread queue
+    scheduler.drain_main_thread_queue()
+    return next_due
+
+
+def test_first_check_publishes_and_persists_the_release(app, releases):
+    app.config.release_tag = "v99.1.0"
+    _check(False)
+
+    assert _requests(app) == 1
+    assert state.UpdateState.latest_version == (99, 1, 0)
+    assert state.UpdateState.update_available
+    assert not state.UpdateState.checking
+    saved = json.loads(releases.read_text())
+    assert saved["etag"] == '"v99.1.0"'
+    assert saved["latest_version"] == [99, 1, 0]
+    assert saved["release_url"].endswith("/v99.1.0")
+    assert "error" not in saved
+    assert update.load_cached_result() == saved
+
+
+def test_unchanged_release_reuses_the_cached_result(app, releases):
+    app.config.release_tag = "v99.1.0"
+    _check(True)
+    first = update.load_cached_result()
+    state.UpdateState.latest_version = None
+    time.sleep(0.01)
+    _check(True)
+
+    assert app.config.not_modified == 1
+    assert state.UpdateState.latest_version == (99, 1, 0)
+    again = update.load_cached_result()
+    assert again["checked_at"] > first["checked_at"]
+    assert {k: v for k, v in again.items() if k != "checked_at"} == \
+        {k: v for k, v in first.items() if k != "checked_at"}
+
+
+def test_check_inside_the_interval_is_skipped(app, releases):
+    checked_at = time.time() - 60
+    releases.write_text(json.dumps({"latest_version": [99, 2, 0], "release_url": "https://example.invalid/r",
+                                    "etag": '"v99.2.0"', "checked_at": checked_at}))
+    next_due = _check(False)
+
+    assert _requests(app) == 0
+    assert 3500 < next_due <= 3540
+    assert state.UpdateState.latest_version == (99, 2, 0)
+    assert state.UpdateState.last_check_time == checked_at
+
+
+def test_check_after_the_interval_revalidates_with_the_stored_etag(app, releases):
+    app.config.release_tag = "v99.2.0"
+    releases.write_text(json.dumps({"latest_version": [99, 2, 0], "release_url": "https://example.invalid/r",
+                                    "etag": '"v99.2.0"', "checked_at": time.time() - 7200}))
+    _check(False)
+
+    assert _requests(app) == 1
+    assert app.config.not_modified == 1
+    assert update.load_cached_result()["checked_at"] > time.time() - 60
+
+
+def test_failed_check_keeps_the_last_result(app, releases):
+    app.config.release_tag = "v99.1.0"
+    _check(True)
+    saved = releases.read_text()
+    app.config.fail_rate = 1.0
+    _check(True)
+
+    assert state.UpdateState.error_message
+    assert state.UpdateState.latest_version == (99, 1, 0)
+    assert releases.read_text() == saved